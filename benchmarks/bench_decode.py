@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Measure the cost of decoding a draft list response into Draft models.
+
+Compares the old path (``json.loads`` then ``Draft(**item)`` per draft)
+with validating straight from the response bytes through pydantic's
+TypeAdapter, which the client uses. Real list responses carry fields the
+model doesn't declare; ``--extra-fields`` pads each draft with some.
+
+    python benchmarks/bench_decode.py
+    python benchmarks/bench_decode.py --drafts 5000 --text-chars 1000
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_api import MockConfig, make_draft  # noqa: E402
+from typefully_mcp_server.types import DRAFT_LIST_ADAPTER, Draft  # noqa: E402
+
+Decoder = Callable[[bytes], List[Draft]]
+
+
+def build_payload(drafts: int, text_chars: int, extra_fields: int) -> bytes:
+    config = MockConfig(drafts=drafts, text_chars=text_chars)
+    items = []
+    for i in range(drafts):
+        item = make_draft(i, config, published=i % 2 == 0)
+        for j in range(extra_fields):
+            item[f"unused_field_{j}"] = {"value": f"{i}-{j}", "flags": [True, False]}
+        items.append(item)
+    return json.dumps(items).encode()
+
+
+def decoders() -> Dict[str, Decoder]:
+    found: Dict[str, Decoder] = {
+        "json.loads + Draft(**item)": lambda body: [Draft(**item) for item in json.loads(body)],
+        "json.loads + TypeAdapter.validate_python": lambda body: DRAFT_LIST_ADAPTER.validate_python(json.loads(body)),
+        "TypeAdapter.validate_json (client)": DRAFT_LIST_ADAPTER.validate_json,
+    }
+    try:
+        import orjson
+    except ImportError:
+        pass
+    else:
+        found["orjson.loads + TypeAdapter.validate_python"] = \
+            lambda body: DRAFT_LIST_ADAPTER.validate_python(orjson.loads(body))
+    return found
+
+
+def measure(decode: Decoder, body: bytes, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        decode(body)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    decode(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    return {"median": timings[len(timings) // 2], "best": timings[0], "peak_kib": peak / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drafts", type=int, default=1000, help="Drafts per response")
+    parser.add_argument("--text-chars", type=int, default=280, help="Characters per tweet")
+    parser.add_argument("--extra-fields", type=int, default=8, help="Undeclared fields added to each draft")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed decodes per decoder")
+    args = parser.parse_args()
+
+    body = build_payload(args.drafts, args.text_chars, args.extra_fields)
+    per_1k = 1000 / args.drafts
+    print(f"🧮 Decoding {args.drafts} drafts ({len(body) / 1024:.0f} KiB), median of {args.repeat} runs")
+    print()
+    header = f"{'decoder':<44} {'ms/1k drafts':>13} {'best ms/1k':>11} {'peak KiB':>9}"
+    print(header)
+    print("-" * len(header))
+    baseline = None
+    for name, decode in decoders().items():
+        result = measure(decode, body, args.repeat)
+        baseline = baseline or result["median"]
+        print(f"{name:<44} {result['median'] * 1000 * per_1k:>13.2f} {result['best'] * 1000 * per_1k:>11.2f} "
+              f"{result['peak_kib']:>9.0f}   {baseline / result['median']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
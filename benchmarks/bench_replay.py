@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Load test the MCP tools by replaying recorded Typefully API traffic.
+
+Runs in two phases. The record phase calls each tool in the mix a few
+times with the client's cassette recorder on (``TYPEFULLY_RECORD_CASSETTE``)
+and the response cache off, so every call reaches the API. It records
+against the local mock API by default, or the real API with ``--live``,
+which only records reads. It is skipped if the cassette already exists,
+unless ``--record`` is given.
+
+The replay phase serves the cassette (``TYPEFULLY_REPLAY_CASSETTE``)
+and drives ``server.call_tool`` with a weighted mix of tools from many
+concurrent workers, through the real code path: schema validation, rate
+limiter, response cache, retries, local index and formatting. Recorded
+latencies are scaled by ``--speedup``; 0 replays without delay. It
+reports per-tool latency percentiles and overall calls per second.
+
+    python benchmarks/bench_replay.py
+    python benchmarks/bench_replay.py --calls 20000 --concurrency 128 --speedup 0
+    python benchmarks/bench_replay.py --cassette typefully.cassette --record --live
+    python benchmarks/bench_replay.py --no-cache --speedup 10 --mix get_scheduled_drafts=1
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ.setdefault("TYPEFULLY_STORE_PATH", ":memory:")
+os.environ.setdefault("TYPEFULLY_DATA_DIR", tempfile.mkdtemp(prefix="typefully-bench-"))
+
+import httpx  # noqa: E402
+
+from bench_tools import percentile  # noqa: E402
+from mock_api import MockTypefullyAPI, add_mock_arguments, mock_config_from_args  # noqa: E402
+from typefully_mcp_server import server  # noqa: E402
+from typefully_mcp_server.config import Settings  # noqa: E402
+
+# Per-request INFO logs would dominate the measurements
+logging.getLogger().setLevel(logging.WARNING)
+
+DEFAULT_MIX = "get_scheduled_drafts=4,get_published_drafts=4,search_drafts=1,create_draft=1"
+# Tools that write; not recorded against the real API
+WRITE_TOOLS = ("create_draft",)
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def tool_arguments(name: str, n: int) -> dict:
+    if name == "create_draft":
+        return {"content": f"Load test draft {n} about benchmarks, latency and throughput"}
+    if name == "search_drafts":
+        return {"query": "benchmarks"}
+    return {}
+
+
+async def record(args: argparse.Namespace, mix: Dict[str, float]) -> None:
+    update = {"record_cassette": args.cassette, "cache_ttl_scheduled": 0.0, "cache_ttl_published": 0.0}
+    transport = None
+    if not args.live:
+        mock = MockTypefullyAPI(mock_config_from_args(args))
+        update["base_url"] = "http://mock.typefully.local/v1"
+        transport = httpx.ASGITransport(app=mock.app)
+    os.environ.setdefault("TYPEFULLY_API_KEY", "benchmark-key")
+    server.accounts.configure(Settings.from_env().model_copy(update=update), transport=transport)
+
+    tools = [name for name in mix if not (args.live and name in WRITE_TOOLS)]
+    print(f"🎙️  Recording {args.record_calls} call(s) of {', '.join(tools)} "
+          f"from the {'Typefully' if args.live else 'mock'} API to {args.cassette}")
+    for n in range(args.record_calls):
+        for name in tools:
+            result = await server.call_tool(name, tool_arguments(name, n))
+            if result[0].text.startswith("❌"):
+                print(f"   {name}: {result[0].text.splitlines()[0]}")
+    # Closes the recorder's file
+    await server.accounts.aclose()
+
+
+async def replay(args: argparse.Namespace, mix: Dict[str, float]) -> None:
+    update = {"replay_cassette": args.cassette, "replay_speedup": args.speedup, "rate_limit": args.rate_limit}
+    if not args.cache:
+        update.update(cache_ttl_scheduled=0.0, cache_ttl_published=0.0)
+    server.accounts.configure(Settings.from_env().model_copy(update=update))
+
+    rng = random.Random(args.seed)
+    schedule = rng.choices(list(mix), weights=list(mix.values()), k=args.calls)
+    latencies: Dict[str, List[float]] = {name: [] for name in mix}
+    errors: Dict[str, int] = {name: 0 for name in mix}
+    first_error: Dict[str, str] = {}
+    calls = iter(enumerate(schedule))
+
+    async def worker():
+        for n, name in calls:
+            started = time.perf_counter()
+            result = await server.call_tool(name, tool_arguments(name, n))
+            latencies[name].append(time.perf_counter() - started)
+            if result[0].text.startswith("❌"):
+                errors[name] += 1
+                first_error.setdefault(name, result[0].text.splitlines()[0])
+
+    print(f"🔁 Replaying {args.cassette}: {args.calls} calls, concurrency {args.concurrency}, "
+          f"speedup {args.speedup:g}, cache {'on' if args.cache else 'off'}")
+    print()
+    async with server.server_lifespan(server.app):
+        # Warm up the client and local index outside the measurement
+        for name in mix:
+            await server.call_tool(name, tool_arguments(name, -1))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - started
+
+    header = f"{'tool':<24} {'calls':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    print(header)
+    print("-" * len(header))
+    for name, values in latencies.items():
+        values.sort()
+        print(f"{name:<24} {len(values):>7} {percentile(values, 50) * 1000:>9.2f} "
+              f"{percentile(values, 95) * 1000:>9.2f} {percentile(values, 99) * 1000:>9.2f} {errors[name]:>7}")
+    print()
+    print(f"⚡ {args.calls / wall:,.0f} calls/s over {wall:.2f}s")
+    for name, message in first_error.items():
+        print(f"   {name}: {message}")
+
+
+async def run(args: argparse.Namespace) -> int:
+    mix = parse_mix(args.mix)
+    unknown = set(mix) - {tool.name for tool in server.TOOLS}
+    if unknown:
+        print(f"❌ Unknown tool(s) in --mix: {', '.join(sorted(unknown))}")
+        return 1
+    if args.record or not Path(args.cassette).exists():
+        if args.record and Path(args.cassette).exists():
+            Path(args.cassette).unlink()
+        await record(args, mix)
+    await replay(args, mix)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassette", default=str(Path(tempfile.gettempdir()) / "typefully-bench.cassette"),
+                        help="Cassette file to replay, recorded first if it doesn't exist")
+    parser.add_argument("--record", action="store_true", help="Record the cassette again even if it exists")
+    parser.add_argument("--live", action="store_true", help="Record from the real Typefully API (reads only)")
+    parser.add_argument("--record-calls", type=int, default=5, help="Calls of each tool while recording")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Tools to call and their weights, as name=weight,...")
+    parser.add_argument("--calls", type=int, default=5000, help="Tool calls to replay")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent tool calls")
+    parser.add_argument("--speedup", type=float, default=1.0, help="Replay recorded latencies this many times faster (0 for no delay)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Client rate limit during replay (0 disables)")
+    parser.add_argument("--no-cache", dest="cache", action="store_false", help="Turn off the client response cache during replay")
+    # Mock options apply to recording; --seed also orders the replayed calls
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Measure the per-call cost of tool schemas and response templates.
+
+Two paths, each compared with what the server did before:
+
+- input validation of a ``create_drafts`` call: the server's precompiled
+  validator vs the SDK's ``jsonschema.validate``, which builds a
+  validator from the schema on every call
+- rendering a page of drafts: the templates vs the hand-written
+  f-strings the list tools used before templates could be configured
+
+No API key or network is needed.
+
+    python benchmarks/bench_schema.py
+    python benchmarks/bench_schema.py --drafts 200 --repeat 500
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("TYPEFULLY_DATA_DIR", tempfile.mkdtemp(prefix="typefully-bench-"))
+
+import jsonschema  # noqa: E402
+
+from mock_api import MockConfig, make_draft  # noqa: E402
+from typefully_mcp_server import server  # noqa: E402
+from typefully_mcp_server.templates import Templates, draft_url  # noqa: E402
+from typefully_mcp_server.types import Draft  # noqa: E402
+
+
+def measure(run: Callable[[], object], repeat: int) -> float:
+    """Median seconds per call."""
+    run()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def validation_paths(batch: int) -> Dict[str, Callable[[], object]]:
+    arguments = {"drafts": [{"content": f"Draft {i}", "schedule_date": "next-free-slot"} for i in range(batch)]}
+    schema = next(tool.inputSchema for tool in server.TOOLS if tool.name == "create_drafts")
+    return {
+        f"create_drafts x{batch}, jsonschema.validate (before)": lambda: jsonschema.validate(arguments, schema),
+        f"create_drafts x{batch}, compiled validator": lambda: server.validate_arguments("create_drafts", arguments),
+    }
+
+
+def hand_written_scheduled(i: int, draft: Draft) -> str:
+    """How a scheduled draft was rendered before templates."""
+    account = f" ({draft.account})" if draft.account else ""
+    parts = [
+        f"**{i}. Draft ID {draft.id}**{account}\n",
+        f"   First tweet: {draft.text_first_tweet}\n",
+        f"   Total tweets: {draft.num_tweets}\n",
+    ]
+    if draft.scheduled_date:
+        parts.append(f"   Scheduled: {draft.scheduled_date}\n")
+    if draft.num_tweets > 1:
+        parts.append(f"   🧵 **View full thread:** {draft_url(draft)}\n")
+    else:
+        parts.append(f"   📝 **View tweet:** {draft_url(draft)}\n")
+    parts.append("\n")
+    return "".join(parts)
+
+
+def render_paths(drafts: int) -> Dict[str, Callable[[], object]]:
+    config = MockConfig(drafts=drafts)
+    page = [Draft(**make_draft(i, config, published=False)) for i in range(drafts)]
+    template = Templates()["scheduled"]
+    assert all(template.render(i, draft) == hand_written_scheduled(i, draft) for i, draft in enumerate(page, 1))
+    return {
+        f"{drafts} drafts, hand-written f-strings (before)": lambda: "".join(
+            hand_written_scheduled(i, draft) for i, draft in enumerate(page, 1)),
+        f"{drafts} drafts, scheduled template": lambda: "".join(
+            template.render(i, draft) for i, draft in enumerate(page, 1)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drafts", type=int, default=50, help="Drafts per rendered page")
+    parser.add_argument("--batch", type=int, default=10, help="Drafts in the validated create_drafts call")
+    parser.add_argument("--repeat", type=int, default=300, help="Timed calls per path")
+    args = parser.parse_args()
+
+    print(f"📐 Median of {args.repeat} calls per path, {len(server.TOOLS)} tools")
+    print()
+    header = f"{'path':<52} {'µs/call':>10}"
+    print(header)
+    print("-" * len(header))
+    for paths in (validation_paths(args.batch), render_paths(args.drafts)):
+        baseline = None
+        for name, run in paths.items():
+            median = measure(run, args.repeat)
+            baseline = baseline or median
+            print(f"{name:<52} {median * 1e6:>10.1f}   {baseline / median:.1f}x")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Measure cold start: time from spawning the server to its first tools/list response.
+
+MCP hosts spawn the server once per session, so this is latency every user
+pays. The server is started exactly like a host would (``python -m
+typefully_mcp_server.server`` over stdio) and driven through initialize and
+tools/list. Exits with status 1 if the median exceeds the budget.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --budget 1.5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def server_env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    env.setdefault("TYPEFULLY_STORE_PATH", ":memory:")
+    return env
+
+
+async def send(proc: asyncio.subprocess.Process, message: dict) -> None:
+    proc.stdin.write((json.dumps(message) + "\n").encode())
+    await proc.stdin.drain()
+
+
+async def receive(proc: asyncio.subprocess.Process, request_id: int) -> dict:
+    """Read messages until the response to ``request_id`` arrives."""
+    while True:
+        line = await proc.stdout.readline()
+        if not line:
+            raise RuntimeError("Server exited before responding")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+async def time_startup() -> dict:
+    """Spawn the server once and time each step of the handshake."""
+    started = time.perf_counter()
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "typefully_mcp_server.server",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+        env=server_env(),
+    )
+    try:
+        await send(proc, {
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {"name": "bench-startup", "version": "0"},
+            },
+        })
+        await receive(proc, 1)
+        initialized = time.perf_counter()
+        await send(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        await send(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        response = await receive(proc, 2)
+        listed = time.perf_counter()
+    finally:
+        proc.stdin.close()
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+    return {
+        "initialize": initialized - started,
+        "first_list_tools": listed - started,
+        "tools": len(response["result"]["tools"]),
+    }
+
+
+async def time_import() -> float:
+    """Time a bare ``import typefully_mcp_server.server`` in a fresh interpreter."""
+    started = time.perf_counter()
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", "import typefully_mcp_server.server", env=server_env(),
+    )
+    await proc.wait()
+    return time.perf_counter() - started
+
+
+async def run(args: argparse.Namespace) -> int:
+    print(f"🚀 Measuring cold start over {args.runs} run(s), budget {args.budget:.2f}s")
+    results = [await time_startup() for _ in range(args.runs)]
+    imports = [await time_import() for _ in range(args.runs)]
+
+    first_list = statistics.median(r["first_list_tools"] for r in results)
+    print(f"   interpreter + import:      {statistics.median(imports) * 1000:8.1f} ms (median)")
+    print(f"   initialize response:       {statistics.median(r['initialize'] for r in results) * 1000:8.1f} ms (median)")
+    print(f"   first tools/list response: {first_list * 1000:8.1f} ms (median), "
+          f"{max(r['first_list_tools'] for r in results) * 1000:.1f} ms (max), {results[0]['tools']} tools")
+
+    if first_list > args.budget:
+        print(f"❌ Time to first tools/list exceeds the {args.budget:.2f}s budget")
+        return 1
+    print("✅ Within budget")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts to measure")
+    parser.add_argument("--budget", type=float, default=2.0, help="Maximum median seconds to first tools/list")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Benchmark the MCP tools and TypefullyClient against a local mock API.
+
+No API key or network access is needed. Each scenario is run end to end
+(``server.call_tool`` or ``TypefullyClient`` -> httpx -> mock API) and
+reported as p50/p95/p99 latency, throughput and memory allocated per call.
+
+    python benchmarks/bench_tools.py
+    python benchmarks/bench_tools.py --transport tcp --latency-ms 50 --concurrency 8
+    python benchmarks/bench_tools.py --save baseline.json
+    python benchmarks/bench_tools.py --compare baseline.json --tolerance 0.25
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+# Run against the source tree without installing, and never touch a real key or index
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ.setdefault("TYPEFULLY_API_KEY", "benchmark-key")
+os.environ.setdefault("TYPEFULLY_STORE_PATH", ":memory:")
+os.environ.setdefault("TYPEFULLY_DATA_DIR", tempfile.mkdtemp(prefix="typefully-bench-"))
+
+import httpx  # noqa: E402
+
+from mock_api import MockTypefullyAPI, add_mock_arguments, mock_config_from_args  # noqa: E402
+from typefully_mcp_server import server  # noqa: E402
+from typefully_mcp_server.config import Settings  # noqa: E402
+from typefully_mcp_server.types import CreateDraftRequest  # noqa: E402
+
+Scenario = Callable[[], Awaitable[bool]]
+
+# Per-request INFO logs would dominate the measurements
+logging.getLogger().setLevel(logging.WARNING)
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def start_tcp_mock(mock: MockTypefullyAPI) -> str:
+    """Serve the mock over loopback TCP from a background thread; return its base URL."""
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    config = uvicorn.Config(mock.app, host="127.0.0.1", port=port, log_level="warning")
+    uv_server = uvicorn.Server(config)
+    thread = threading.Thread(target=uv_server.run, daemon=True)
+    thread.start()
+    while not uv_server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/v1"
+
+
+def tool_scenario(name: str, arguments: dict) -> Scenario:
+    async def run() -> bool:
+        result = await server.call_tool(name, arguments)
+        return not result[0].text.startswith("❌")
+    return run
+
+
+def build_scenarios(batch_size: int) -> Dict[str, Scenario]:
+    async def client_scheduled() -> bool:
+        client = await server.shared_client.get()
+        await client.get_scheduled_drafts()
+        return True
+
+    async def client_published() -> bool:
+        client = await server.shared_client.get()
+        await client.get_published_drafts()
+        return True
+
+    async def client_create() -> bool:
+        client = await server.shared_client.get()
+        await client.create_draft(CreateDraftRequest(content="Benchmark draft"))
+        return True
+
+    batch = [{"content": f"Benchmark batch draft {i}"} for i in range(batch_size)]
+    return {
+        "client.get_scheduled_drafts": client_scheduled,
+        "client.get_published_drafts": client_published,
+        "client.create_draft": client_create,
+        "tool get_scheduled_drafts": tool_scenario("get_scheduled_drafts", {}),
+        "tool get_scheduled_drafts compact": tool_scenario("get_scheduled_drafts", {"format": "compact", "limit": 0}),
+        "tool get_published_drafts": tool_scenario("get_published_drafts", {}),
+        "tool create_draft": tool_scenario("create_draft", {"content": "Benchmark draft"}),
+        f"tool create_drafts x{batch_size}": tool_scenario("create_drafts", {"drafts": batch}),
+        "tool search_drafts": tool_scenario("search_drafts", {"query": "benchmarks latency"}),
+    }
+
+
+async def call(scenario: Scenario) -> bool:
+    """Run a scenario once, treating exceptions (e.g. injected failures) as errors."""
+    try:
+        return await scenario()
+    except Exception:
+        return False
+
+
+async def measure(scenario: Scenario, iterations: int, concurrency: int) -> dict:
+    """Run ``iterations`` calls from ``concurrency`` workers and summarize latency."""
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(iterations))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            ok = await call(scenario)
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "calls": iterations,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput": iterations / wall if wall else 0.0,
+    }
+
+
+async def measure_allocations(scenario: Scenario, iterations: int) -> float:
+    """Mean peak memory allocated per call, in KiB, measured with tracemalloc."""
+    if iterations <= 0:
+        return 0.0
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await call(scenario)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+    return sum(peaks) / len(peaks) / 1024
+
+
+def compare(results: Dict[str, dict], baseline_path: str, tolerance: float) -> List[str]:
+    """Return a description of every scenario that regressed beyond ``tolerance``."""
+    baseline = json.loads(Path(baseline_path).read_text())["results"]
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if result["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {before['p50_ms']:.2f}ms -> {result['p50_ms']:.2f}ms")
+        if result["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput']:.1f}/s -> {result['throughput']:.1f}/s")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> int:
+    mock = MockTypefullyAPI(mock_config_from_args(args))
+    if args.transport == "tcp":
+        base_url, transport = start_tcp_mock(mock), None
+    else:
+        base_url, transport = "http://mock.typefully.local/v1", httpx.ASGITransport(app=mock.app)
+
+    update = {"base_url": base_url, "rate_limit": args.rate_limit, "retry_backoff_base": 0.01}
+    if not args.cache:
+        update.update(cache_ttl_scheduled=0.0, cache_ttl_published=0.0)
+    settings = Settings.from_env().model_copy(update=update)
+    server.accounts.configure(settings, transport=transport)
+
+    scenarios = build_scenarios(args.batch_size)
+    if args.only:
+        scenarios = {name: fn for name, fn in scenarios.items() if any(part in name for part in args.only)}
+
+    print(f"🏁 Benchmarking {len(scenarios)} scenario(s) over {args.transport} "
+          f"({args.iterations} calls, concurrency {args.concurrency}, mock latency {args.latency_ms}ms)")
+    print()
+    header = f"{'scenario':<36} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'calls/s':>9} {'KiB/call':>9} {'errors':>7}"
+    print(header)
+    print("-" * len(header))
+
+    results = {}
+    async with server.server_lifespan(server.app):
+        # Populate the local index so search_drafts has something to search
+        client = await server.shared_client.get()
+        await client.get_scheduled_drafts()
+        await client.get_published_drafts()
+        for name, scenario in scenarios.items():
+            for _ in range(args.warmup):
+                await call(scenario)
+            result = await measure(scenario, args.iterations, args.concurrency)
+            result["alloc_kib"] = await measure_allocations(scenario, args.alloc_iterations)
+            results[name] = result
+            print(f"{name:<36} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                  f"{result['throughput']:>9.1f} {result['alloc_kib']:>9.1f} {result['errors']:>7}")
+
+    print()
+    print(f"Mock API served {mock.requests} request(s), injected {mock.injected_errors} error(s) and {mock.injected_429s} 429(s)")
+
+    if args.save:
+        Path(args.save).write_text(json.dumps({"args": vars(args), "results": results}, indent=2, default=str))
+        print(f"💾 Saved results to {args.save}")
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print(f"✅ No regressions beyond {args.tolerance:.0%} compared to {args.compare}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transport", choices=["asgi", "tcp"], default="asgi",
+                        help="asgi: in-process, no sockets; tcp: real loopback HTTP server")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent calls per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed calls before each scenario")
+    parser.add_argument("--alloc-iterations", type=int, default=20, help="Calls traced with tracemalloc (0 to skip)")
+    parser.add_argument("--batch-size", type=int, default=10, help="Drafts per create_drafts call")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Client rate limit (0 disables)")
+    parser.add_argument("--cache", action="store_true", help="Keep the client response cache enabled")
+    parser.add_argument("--only", nargs="*", help="Only run scenarios whose name contains one of these")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Local mock of the Typefully API for benchmarks.
+
+Serves ``POST /v1/drafts/``, ``GET /v1/drafts/recently-scheduled/`` and
+``GET /v1/drafts/recently-published/`` with configurable latency, payload
+size and error / 429 injection. Use it in-process through
+``httpx.ASGITransport`` or run it as a real HTTP server:
+
+    python benchmarks/mock_api.py --port 8765 --drafts 200 --latency-ms 40
+"""
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import random
+from dataclasses import dataclass
+from typing import List
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+@dataclass
+class MockConfig:
+    """Behaviour of the mock API."""
+    latency_ms: float = 20.0
+    jitter_ms: float = 5.0
+    drafts: int = 50
+    text_chars: int = 280
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: str = "0.05"
+    etags: bool = True
+    seed: int = 0
+
+
+def make_draft(i: int, config: MockConfig, published: bool) -> dict:
+    words = f"Draft {i} about benchmarks, latency and throughput. "
+    text = (words * (config.text_chars // len(words) + 1))[:config.text_chars]
+    num_tweets = 1 + i % 4
+    draft = {
+        "id": (2 if published else 1) * 1_000_000 + i,
+        "text": "\n\n\n\n".join([text] * num_tweets),
+        "text_first_tweet": text,
+        "num_tweets": num_tweets,
+        "share_url": None,
+    }
+    if published:
+        draft["published_on"] = f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:00:00Z"
+        draft["twitter_url"] = f"https://x.com/example/status/{draft['id']}"
+        if i % 3 == 0:
+            draft["linkedin_url"] = f"https://www.linkedin.com/feed/update/{draft['id']}"
+    else:
+        draft["scheduled_date"] = f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:30:00Z"
+    return draft
+
+
+class MockTypefullyAPI:
+    """Starlette app implementing the Typefully draft endpoints."""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.ids = itertools.count(3_000_000)
+        self.requests = 0
+        self.injected_errors = 0
+        self.injected_429s = 0
+        self.lists = {
+            "scheduled": self._encode([make_draft(i, config, False) for i in range(config.drafts)]),
+            "published": self._encode([make_draft(i, config, True) for i in range(config.drafts)]),
+        }
+        self.app = Starlette(routes=[
+            Route("/v1/drafts/", self.create_draft, methods=["POST"]),
+            Route("/v1/drafts/recently-scheduled/", self.scheduled, methods=["GET"]),
+            Route("/v1/drafts/recently-published/", self.published, methods=["GET"]),
+        ])
+
+    @staticmethod
+    def _encode(drafts: List[dict]) -> tuple:
+        body = json.dumps(drafts).encode()
+        return body, '"' + hashlib.sha1(body).hexdigest() + '"'
+
+    async def _delay_or_fail(self):
+        self.requests += 1
+        config = self.config
+        delay = max(0.0, config.latency_ms + self.random.uniform(-config.jitter_ms, config.jitter_ms))
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        roll = self.random.random()
+        if roll < config.rate_limit_rate:
+            self.injected_429s += 1
+            return JSONResponse({"detail": "Too many requests"}, status_code=429,
+                                headers={"Retry-After": config.retry_after})
+        if roll < config.rate_limit_rate + config.error_rate:
+            self.injected_errors += 1
+            return JSONResponse({"detail": "Injected failure"}, status_code=503)
+        return None
+
+    async def _list(self, request: Request, kind: str):
+        failure = await self._delay_or_fail()
+        if failure is not None:
+            return failure
+        body, etag = self.lists[kind]
+        if self.config.etags and request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        headers = {"ETag": etag} if self.config.etags else {}
+        return Response(body, media_type="application/json", headers=headers)
+
+    async def scheduled(self, request: Request):
+        return await self._list(request, "scheduled")
+
+    async def published(self, request: Request):
+        return await self._list(request, "published")
+
+    async def create_draft(self, request: Request):
+        failure = await self._delay_or_fail()
+        if failure is not None:
+            return failure
+        payload = await request.json()
+        content = payload.get("content", "")
+        tweets = content.split("\n\n\n\n")
+        return JSONResponse({
+            "id": next(self.ids),
+            "text": content,
+            "text_first_tweet": tweets[0],
+            "num_tweets": len(tweets),
+            "scheduled_date": payload.get("schedule-date"),
+            "share_url": "https://typefully.com/t/mock" if payload.get("share") else None,
+        })
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the MockConfig options to an argument parser."""
+    defaults = MockConfig()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="Mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms, help="Latency jitter (+/-)")
+    parser.add_argument("--drafts", type=int, default=defaults.drafts, help="Drafts per list response")
+    parser.add_argument("--text-chars", type=int, default=defaults.text_chars, help="Characters per tweet")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Fraction of 503 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate, help="Fraction of 429 responses")
+    parser.add_argument("--retry-after", default=defaults.retry_after, help="Retry-After header sent with 429s")
+    parser.add_argument("--no-etags", dest="etags", action="store_false", help="Don't send ETags")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def mock_config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(**{name: getattr(args, name) for name in MockConfig.__dataclass_fields__})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    import uvicorn
+    mock = MockTypefullyAPI(mock_config_from_args(args))
+    print(f"🧪 Mock Typefully API on http://{args.host}:{args.port}/v1")
+    uvicorn.run(mock.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
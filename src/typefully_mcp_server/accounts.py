@@ -0,0 +1,199 @@
+"""Named Typefully accounts, each with its own pooled client and rate limit."""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from pydantic import BaseModel, Field
+
+from .client import SharedClient, TypefullyClient
+from .config import Settings
+from .store import DEFAULT_ACCOUNT, normalize_date
+from .sync import SCHEDULED
+from .types import Draft
+
+logger = logging.getLogger(__name__)
+
+# Pass as ``account`` to the list tools to read from every account at once
+ALL_ACCOUNTS = "*"
+
+
+class Account(BaseModel):
+    """One entry of the accounts file."""
+    name: str
+    api_key: Optional[str] = Field(None, description="The account's API key")
+    api_key_env: Optional[str] = Field(None, description="Environment variable holding the API key")
+    rate_limit: Optional[float] = Field(None, description="Requests per second for this account (default: TYPEFULLY_RATE_LIMIT)")
+    rate_limit_burst: Optional[int] = Field(None, description="Burst size for this account (default: TYPEFULLY_RATE_LIMIT_BURST)")
+    max_connections: Optional[int] = Field(None, description="Connection pool size for this account (default: TYPEFULLY_MAX_CONNECTIONS)")
+
+    def resolve_api_key(self) -> Optional[str]:
+        if self.api_key:
+            return self.api_key
+        if self.api_key_env:
+            return os.getenv(self.api_key_env) or None
+        return None
+
+    def settings_for(self, base: Settings) -> Settings:
+        """``base`` with this account's overrides applied."""
+        update = {
+            name: getattr(self, name)
+            for name in ("rate_limit", "rate_limit_burst", "max_connections")
+            if getattr(self, name) is not None
+        }
+        if "max_connections" in update:
+            update["max_keepalive_connections"] = min(base.max_keepalive_connections, update["max_connections"])
+        return base.model_copy(update=update) if update else base
+
+
+def load_accounts(path: str) -> List[Account]:
+    """Read the accounts file.
+
+    The file is a JSON object mapping account names either to an API key or
+    to an object with ``api_key`` / ``api_key_env`` and optional limits::
+
+        {
+            "brand-a": {"api_key_env": "BRAND_A_TYPEFULLY_KEY", "rate_limit": 5},
+            "brand-b": "tf_live_..."
+        }
+    """
+    with open(os.path.expanduser(path)) as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"Accounts file {path} must contain a JSON object of account names")
+    accounts = []
+    for name, entry in data.items():
+        if name == ALL_ACCOUNTS:
+            raise ValueError(f"'{ALL_ACCOUNTS}' is reserved and can't be used as an account name")
+        if isinstance(entry, str):
+            entry = {"api_key": entry}
+        accounts.append(Account(name=name, **entry))
+    return accounts
+
+
+class AccountRegistry:
+    """Maps account names to SharedClients.
+
+    Every account has its own connection pool, response cache, rate limiter
+    and retry budget, so a busy account can't use up another's API quota.
+    The "default" account is the server's ``shared_client``; an entry named
+    "default" in the accounts file replaces its key and limits. If another
+    account is made the default and the file has no "default" entry, the
+    built-in account is left out.
+    """
+
+    def __init__(self, settings: Settings, default_client: SharedClient,
+                 accounts: Optional[List[Account]] = None, default_account: str = DEFAULT_ACCOUNT):
+        self.settings = settings
+        self.accounts: Dict[str, Account] = {DEFAULT_ACCOUNT: Account(name=DEFAULT_ACCOUNT)}
+        self.clients: Dict[str, SharedClient] = {DEFAULT_ACCOUNT: default_client}
+        for account in accounts or []:
+            api_key = account.resolve_api_key()
+            if account.name == DEFAULT_ACCOUNT:
+                default_client.api_key = api_key or default_client.api_key
+                default_client.settings = account.settings_for(settings)
+            elif not api_key:
+                logger.warning(f"Skipping account '{account.name}': no API key configured")
+                continue
+            else:
+                self.clients[account.name] = SharedClient(account.settings_for(settings), api_key=api_key)
+            self.accounts[account.name] = account
+        if default_account not in self.clients:
+            raise ValueError(f"Default account '{default_account}' is not configured")
+        if default_account != DEFAULT_ACCOUNT and not any(a.name == DEFAULT_ACCOUNT for a in accounts or []):
+            del self.clients[DEFAULT_ACCOUNT]
+        self.default_account = default_account
+
+    @classmethod
+    def from_settings(cls, settings: Settings, default_client: SharedClient) -> "AccountRegistry":
+        accounts = load_accounts(settings.accounts_file) if settings.accounts_file else []
+        return cls(settings, default_client, accounts, settings.default_account)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.clients)
+
+    def resolve(self, name: Optional[str] = None) -> str:
+        """The account ``name`` refers to, or the default account."""
+        name = name or self.default_account
+        if name not in self.clients:
+            raise ValueError(f"Unknown account '{name}'. Configured accounts: {', '.join(self.names)}")
+        return name
+
+    async def get(self, name: Optional[str] = None) -> TypefullyClient:
+        """Return the client for an account, opening it on first use."""
+        return await self.clients[self.resolve(name)].get()
+
+    @property
+    def default_client(self) -> SharedClient:
+        return self.clients[self.default_account]
+
+    async def gather(self, fetch: Callable[[str], Awaitable[Any]],
+                     on_done: Optional[Callable[[str, Any, Optional[Exception]], Awaitable[None]]] = None
+                     ) -> Tuple[Dict[str, Any], Dict[str, Exception]]:
+        """Run ``await fetch(name)`` for every account concurrently.
+
+        Each account is limited by its own rate limiter, so the calls don't
+        queue behind each other.
+
+        Args:
+            fetch: Called with each account name
+            on_done: Awaited with ``(name, result, error)`` as soon as each
+                     account's fetch completes, e.g. to report progress
+
+        Returns:
+            Results and errors, each keyed by account name
+        """
+        async def run(name: str) -> Any:
+            try:
+                result = await fetch(name)
+            except Exception as e:
+                if on_done is not None:
+                    await on_done(name, None, e)
+                raise
+            if on_done is not None:
+                await on_done(name, result, None)
+            return result
+
+        outcomes = await asyncio.gather(*(run(name) for name in self.names), return_exceptions=True)
+        results: Dict[str, Any] = {}
+        errors: Dict[str, Exception] = {}
+        for name, outcome in zip(self.names, outcomes):
+            if isinstance(outcome, Exception):
+                errors[name] = outcome
+            else:
+                results[name] = outcome
+        return results, errors
+
+    def configure(self, settings: Settings,
+                  transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        """Change the settings used the next time each account's client is opened."""
+        self.settings = settings
+        for name, shared in self.clients.items():
+            shared.configure(self.accounts[name].settings_for(settings), transport)
+
+    async def aclose(self) -> None:
+        """Close every account's client."""
+        await asyncio.gather(*(shared.aclose() for shared in self.clients.values()))
+
+
+def merge_drafts(by_account: Dict[str, List[Draft]], kind: str) -> List[Draft]:
+    """Merge per-account draft lists into one, labelled with their account.
+
+    Scheduled drafts are ordered soonest first and published drafts most
+    recent first, like the API's own lists.
+    """
+    merged = [
+        draft.model_copy(update={"account": name})
+        for name, drafts in by_account.items()
+        for draft in drafts
+    ]
+    if kind == SCHEDULED:
+        # Drafts without a date sort last
+        merged.sort(key=lambda draft: normalize_date(draft.scheduled_date) or "~")
+    else:
+        merged.sort(key=lambda draft: normalize_date(draft.published_on) or "", reverse=True)
+    return merged
@@ -0,0 +1,154 @@
+"""Aggregate statistics over the drafts in the local store.
+
+All counting happens in SQLite, with one GROUP BY over the stored drafts.
+Time-based groupings (hour, weekday, day, ISO week, month) are computed in
+SQL from each draft's UTC date, shifted by the requested time zone's UTC
+offset. The offsets in effect over the drafts' date range are found in
+Python, from the zone's daylight saving transitions, and passed to SQLite
+as a CASE over date ranges, so only one row per group reaches Python.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from .planner import WEEKDAYS
+from .store import GROUP_EXPRESSIONS, LOCAL_TIME_EXPRESSIONS, DraftStore
+
+# Derived from each draft's published (or scheduled) time, in the requested time zone
+TIME_DIMENSIONS = tuple(LOCAL_TIME_EXPRESSIONS)
+COLUMN_DIMENSIONS = tuple(GROUP_EXPRESSIONS)
+DIMENSIONS = TIME_DIMENSIONS + COLUMN_DIMENSIONS
+
+# Label for drafts without a date, in time-based groupings
+UNDATED = "undated"
+
+# Step when scanning a time zone for offset changes; no zone changes twice within it
+OFFSET_SCAN_STEP = timedelta(days=1)
+
+
+def _parse_stored_date(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+
+def utc_offsets(zone: ZoneInfo, start: datetime, end: datetime) -> List[Tuple[datetime, int]]:
+    """UTC offsets of ``zone``, in minutes, between ``start`` and ``end``.
+
+    Returns:
+        ``(from, minutes)`` pairs, oldest first; the first starts at ``start``
+    """
+    def offset(seconds: int) -> int:
+        moment = datetime.fromtimestamp(seconds, timezone.utc)
+        return int(moment.astimezone(zone).utcoffset().total_seconds()) // 60
+
+    step = int(OFFSET_SCAN_STEP.total_seconds())
+    lo = int(start.timestamp())
+    end_seconds = int(end.timestamp())
+    offsets = [(lo, offset(lo))]
+    while lo < end_seconds:
+        hi = min(lo + step, end_seconds)
+        if offset(hi) != offsets[-1][1]:
+            # Bisect to the first second with the new offset
+            low, high = lo, hi
+            while high - low > 1:
+                middle = (low + high) // 2
+                if offset(middle) == offsets[-1][1]:
+                    low = middle
+                else:
+                    high = middle
+            offsets.append((high, offset(high)))
+        lo = hi
+    return [(datetime.fromtimestamp(seconds, timezone.utc), minutes) for seconds, minutes in offsets]
+
+
+@dataclass
+class StatsGroup:
+    """Totals for one combination of group values."""
+    key: Tuple[str, ...]
+    drafts: int = 0
+    tweets: int = 0
+
+
+@dataclass
+class DraftStats:
+    """Result of ``draft_stats``."""
+    group_by: List[str]
+    groups: List[StatsGroup]
+    drafts: int
+    tweets: int
+
+
+def _sort_key(dimension: str, value: str):
+    if dimension == "weekday" and value != UNDATED:
+        return (0, WEEKDAYS.index(value.lower()))
+    if dimension == "num_tweets":
+        return (0, int(value))
+    # Undated groups go last
+    return (1 if value == UNDATED else 0, value)
+
+
+def _label(dimension: str, value) -> str:
+    if value is None:
+        return UNDATED if dimension in TIME_DIMENSIONS else "none"
+    if dimension == "weekday":
+        # SQLite numbers weekdays from Sunday
+        return WEEKDAYS[(int(value) + 6) % 7].capitalize()
+    return str(value)
+
+
+def draft_stats(store: DraftStore, group_by: List[str], tz: str = "UTC", status: Optional[str] = None,
+                since: Optional[str] = None, until: Optional[str] = None,
+                account: Optional[str] = None) -> DraftStats:
+    """Count drafts and tweets in the local store, grouped by ``group_by``.
+
+    Args:
+        store: The local draft store
+        group_by: Names from ``DIMENSIONS``, e.g. ``["week", "kind"]``
+        tz: IANA time zone for the time-based groupings
+        status: Only "scheduled", "published" or "draft" drafts
+        since: Only drafts scheduled/published at or after this ISO date
+        until: Only drafts scheduled/published before this ISO date
+        account: Only drafts of this account; all accounts if None
+
+    Returns:
+        The groups, ordered by their values, and overall totals
+
+    Raises:
+        ValueError: For an unknown grouping or time zone
+    """
+    group_by = list(dict.fromkeys(group_by))
+    for name in group_by:
+        if name not in DIMENSIONS:
+            raise ValueError(f"Can't group by {name!r}; use {', '.join(DIMENSIONS)}")
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone {tz!r}; use an IANA name such as 'Europe/Prague' or 'UTC'")
+
+    offsets: List[Tuple[str, int]] = []
+    if any(name in TIME_DIMENSIONS for name in group_by):
+        first, last = store.date_range(status=status, since=since, until=until, account=account)
+        try:
+            span = (_parse_stored_date(first), _parse_stored_date(last))
+        except (TypeError, ValueError):
+            # No dated drafts, or dates the store couldn't normalize; those stay undated
+            span = (datetime.now(timezone.utc),) * 2
+        offsets = [
+            (when.strftime("%Y-%m-%dT%H:%M:%SZ"), minutes) for when, minutes in utc_offsets(zone, *span)
+        ]
+    rows = store.aggregate(group_by, status=status, since=since, until=until, account=account,
+                           utc_offsets=offsets)
+
+    groups: List[StatsGroup] = []
+    total_drafts = total_tweets = 0
+    for row in rows:
+        *values, drafts, tweets = row
+        tweets = tweets or 0
+        total_drafts += drafts
+        total_tweets += tweets
+        key = tuple(_label(name, value) for name, value in zip(group_by, values))
+        groups.append(StatsGroup(key=key, drafts=drafts, tweets=tweets))
+
+    groups.sort(key=lambda group: tuple(_sort_key(name, value) for name, value in zip(group_by, group.key)))
+    return DraftStats(group_by=group_by, groups=groups, drafts=total_drafts, tweets=total_tweets)
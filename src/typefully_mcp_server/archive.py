@@ -0,0 +1,428 @@
+"""Append-only, compressed archive of every version of every draft seen.
+
+The API only lists recently scheduled and recently published drafts, so
+anything older drops out of view. The archive keeps each draft the server
+observes, deduplicated by ``id`` and with a new version whenever it
+changes. The file is a sequence of blocks, one per ``append``:
+
+    header    magic, row count, body length, CRC-32 of the body,
+              earliest and latest scheduled/published date in the block
+    ids       row count little-endian int64 draft ids
+    digests   row count uint64 digests of each version
+    bases     row count uint64 digests of each version without ``text``
+    payload   zlib-compressed JSON object with one list per field
+
+Opening the archive memory-maps the file and reads only the headers and
+the id and digest columns, to learn where the latest version of each
+draft is. Payloads are decompressed when a lookup needs them, and blocks
+outside a query's date range are skipped by their header, so the history
+is never loaded into memory as a whole.
+
+Several server processes can share one archive. Each append holds an
+exclusive ``flock`` on the file, first indexes any blocks other
+processes appended since it last looked, and writes its block at the
+current end of the file. Lookups pick up new blocks under a shared lock.
+A block torn by a crash at the end of the file is truncated, but only by
+a process holding the exclusive lock, so a block another process is
+still writing is never mistaken for one.
+"""
+
+import heapq
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from hashlib import blake2b
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process per archive
+    fcntl = None
+
+from .store import DEFAULT_ACCOUNT, DRAFT_COLUMNS, normalize_date
+from .types import Draft
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TFA1"
+HEADER = struct.Struct("<4sIII20s20s")
+# Fields stored in the compressed payload; ids live in their own column, and
+# ``sort_date`` is the normalized scheduled/published date queries filter on
+PAYLOAD_COLUMNS = [column for column in DRAFT_COLUMNS if column != "id"] + ["account", "observed_at", "sort_date"]
+# Decompressed payloads kept for repeated lookups
+BLOCK_CACHE_SIZE = 8
+# Length of a normalized ``YYYY-MM-DDTHH:MM:SSZ`` date
+DATE_LENGTH = 20
+
+
+@dataclass
+class DraftVersion:
+    """One archived version of a draft."""
+    draft: Draft
+    account: str
+    observed_at: float
+    version: int
+
+
+@dataclass
+class _Block:
+    offset: int
+    count: int
+    length: int
+    min_date: str
+    max_date: str
+
+    @property
+    def keys_offset(self) -> int:
+        return self.offset + HEADER.size
+
+    @property
+    def payload_offset(self) -> int:
+        return self.keys_offset + 24 * self.count
+
+    @property
+    def end(self) -> int:
+        return self.keys_offset + self.length
+
+
+def _digest(values: Iterable) -> int:
+    encoded = json.dumps(list(values), separators=(",", ":"), ensure_ascii=False).encode()
+    return int.from_bytes(blake2b(encoded, digest_size=8).digest(), "little")
+
+
+def _digests(draft: Draft, account: str) -> Tuple[int, int]:
+    """Digests of a draft with and without its ``text``."""
+    values = [getattr(draft, column) for column in DRAFT_COLUMNS] + [account]
+    base = [value for column, value in zip(DRAFT_COLUMNS + ["account"], values) if column != "text"]
+    return _digest(values), _digest(base)
+
+
+def _status(published_on: Optional[str], scheduled_date: Optional[str]) -> str:
+    """``draft_status`` from the two payload columns it depends on."""
+    return "published" if published_on else "scheduled" if scheduled_date else "draft"
+
+
+def _is_date(value: Optional[str]) -> bool:
+    return bool(value) and len(value) == DATE_LENGTH and value.endswith("Z")
+
+
+@contextmanager
+def _locked(path: str, mode: str, exclusive: bool) -> Iterator[BinaryIO]:
+    """The file opened with ``mode``, under a shared or exclusive lock until closed."""
+    with open(path, mode) as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield f
+
+
+class DraftArchive:
+    """Versioned on-disk history of the drafts the server has observed."""
+
+    def __init__(self, path: str):
+        """Initialize the archive. The file is opened on first use.
+
+        Args:
+            path: Archive file; created with its directory if missing
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._opened = False
+        self._blocks: List[_Block] = []
+        # Per draft id: digests of the latest version, and (block, row) of every version
+        self._latest: Dict[int, Tuple[int, int]] = {}
+        self._locations: Dict[int, List[Tuple[int, int]]] = {}
+        self._map: Optional[mmap.mmap] = None
+        self._mapped_size = 0
+        # End of the last indexed block
+        self._size = 0
+        self._payloads: "OrderedDict[int, Dict[str, list]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        """Number of distinct drafts archived."""
+        with self._lock:
+            self._open()
+            return len(self._locations)
+
+    @property
+    def versions(self) -> int:
+        """Number of draft versions archived."""
+        with self._lock:
+            self._open()
+            return sum(block.count for block in self._blocks)
+
+    @property
+    def size(self) -> int:
+        """Size of the archive file in bytes."""
+        with self._lock:
+            self._open()
+            return self._size
+
+    def _open(self) -> None:
+        """Create the file on first use, and index any blocks appended since the last call."""
+        if not self._opened:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            if not os.path.exists(self.path):
+                open(self.path, "ab").close()
+            self._opened = True
+        if os.path.getsize(self.path) == self._size:
+            return
+        with _locked(self.path, "rb", exclusive=False) as f:
+            torn = self._scan(f, exclusive=False)
+        if torn:
+            with _locked(self.path, "ab", exclusive=True) as f:
+                self._scan(f, exclusive=True)
+
+    def _scan(self, f: BinaryIO, exclusive: bool) -> bool:
+        """Index the blocks past the last indexed one, with ``f`` locked.
+
+        Incomplete data at the end of the file is truncated when the lock is
+        exclusive; otherwise it is left alone.
+
+        Returns:
+            Whether incomplete data was left at the end of the file
+        """
+        size = os.fstat(f.fileno()).st_size
+        if size < self._size:
+            logger.warning(f"Draft archive {self.path} shrank from {self._size} to {size} bytes, reading it again")
+            self._reset()
+        if size == self._size:
+            return False
+        started = time.perf_counter()
+        opening = not self._blocks
+        mapped = self._mapping(size)
+        offset = self._size
+        torn = False
+        while offset < size:
+            block = self._read_block(mapped, offset, size)
+            if block is None:
+                if exclusive:
+                    logger.warning(f"Truncating {size - offset} byte(s) of incomplete archive data at offset {offset} in {self.path}")
+                    self._close_map()
+                    f.truncate(offset)
+                else:
+                    torn = True
+                break
+            self._index_block(block, mapped)
+            offset = block.end
+        self._size = offset
+        if opening:
+            logger.info(f"Opened draft archive with {len(self._locations)} draft(s) in {time.perf_counter() - started:.2f}s")
+        return torn
+
+    def _mapping(self, size: Optional[int] = None) -> mmap.mmap:
+        """A read-only map of the first ``size`` bytes of the file, by default
+        the indexed blocks; remapped when it is too short."""
+        size = size or self._size
+        if self._map is None or self._mapped_size < size:
+            self._close_map()
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            self._mapped_size = size
+        return self._map
+
+    def _close_map(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._mapped_size = 0
+
+    def _read_block(self, mapped: mmap.mmap, offset: int, size: int) -> Optional[_Block]:
+        """The block at ``offset`` in a file of ``size`` bytes, or None if it is incomplete or corrupt."""
+        if offset + HEADER.size > size:
+            return None
+        magic, count, body_length, crc, min_date, max_date = HEADER.unpack_from(mapped, offset)
+        body_start = offset + HEADER.size
+        if magic != MAGIC or body_start + body_length > size or body_length < 24 * count:
+            return None
+        if zlib.crc32(mapped[body_start:body_start + body_length]) != crc:
+            return None
+        return _Block(offset=offset, count=count, length=body_length, min_date=min_date.rstrip(b"\0").decode(),
+                      max_date=max_date.rstrip(b"\0").decode())
+
+    def _index_block(self, block: _Block, mapped: mmap.mmap) -> None:
+        number = len(self._blocks)
+        self._blocks.append(block)
+        start = block.keys_offset
+        ids = array("q", mapped[start:start + 8 * block.count])
+        digests = array("Q", mapped[start + 8 * block.count:start + 16 * block.count])
+        bases = array("Q", mapped[start + 16 * block.count:start + 24 * block.count])
+        for row, draft_id in enumerate(ids):
+            self._latest[draft_id] = (digests[row], bases[row])
+            self._locations.setdefault(draft_id, []).append((number, row))
+
+    def _reset(self) -> None:
+        self._close_map()
+        self._size = 0
+        self._blocks.clear()
+        self._latest.clear()
+        self._locations.clear()
+        self._payloads.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self._reset()
+            self._opened = False
+
+    def _payload(self, number: int) -> Dict[str, list]:
+        columns = self._payloads.get(number)
+        if columns is not None:
+            self._payloads.move_to_end(number)
+            return columns
+        block = self._blocks[number]
+        columns = json.loads(zlib.decompress(self._mapping()[block.payload_offset:block.end]))
+        self._payloads[number] = columns
+        if len(self._payloads) > BLOCK_CACHE_SIZE:
+            self._payloads.popitem(last=False)
+        return columns
+
+    def _version(self, draft_id: int, index: int) -> DraftVersion:
+        number, row = self._locations[draft_id][index]
+        columns = self._payload(number)
+        values = {column: columns[column][row] for column in PAYLOAD_COLUMNS}
+        observed_at = values.pop("observed_at")
+        del values["sort_date"]
+        draft = Draft(id=draft_id, **values)
+        return DraftVersion(draft=draft, account=draft.account, observed_at=observed_at,
+                            version=index % len(self._locations[draft_id]) + 1)
+
+    def append(self, drafts: Iterable[Draft], account: str = DEFAULT_ACCOUNT) -> int:
+        """Archive the drafts that are new or changed since their latest version.
+
+        A draft seen without its ``text`` (list responses may omit it) that
+        is otherwise unchanged is skipped; if something else changed, the
+        new version keeps the text of the previous one.
+
+        Args:
+            drafts: Drafts as returned by the API
+            account: Name of the account the drafts belong to
+
+        Returns:
+            The number of versions written
+        """
+        drafts = list(drafts)
+        with self._lock:
+            self._open()
+            with _locked(self.path, "ab", exclusive=True) as f:
+                # Other processes may have appended since; dedupe against their versions too
+                self._scan(f, exclusive=True)
+                return self._append(f, drafts, account)
+
+    def _append(self, f: BinaryIO, drafts: List[Draft], account: str) -> int:
+        rows: Dict[int, Tuple[Draft, int, int]] = {}
+        for draft in drafts:
+            digest, base = _digests(draft, account)
+            latest = self._latest.get(draft.id)
+            if latest is not None and (digest == latest[0] or (draft.text is None and base == latest[1])):
+                continue
+            if draft.text is None and latest is not None:
+                previous = self._version(draft.id, -1).draft
+                if previous.text is not None:
+                    draft = draft.model_copy(update={"text": previous.text})
+                    digest = _digests(draft, account)[0]
+            rows[draft.id] = (draft, digest, base)
+        if not rows:
+            return 0
+        self._write_block(f, list(rows.values()), account)
+        return len(rows)
+
+    def _write_block(self, f: BinaryIO, rows: List[Tuple[Draft, int, int]], account: str) -> None:
+        """Write a block at the end of ``f``, which is locked exclusively and fully indexed."""
+        now = time.time()
+        columns: Dict[str, list] = {column: [] for column in PAYLOAD_COLUMNS}
+        dates = []
+        for draft, _, _ in rows:
+            for column in DRAFT_COLUMNS[1:]:
+                columns[column].append(getattr(draft, column))
+            columns["account"].append(account)
+            columns["observed_at"].append(now)
+            date = normalize_date(draft.published_on or draft.scheduled_date)
+            columns["sort_date"].append(date)
+            if _is_date(date):
+                dates.append(date)
+        payload = zlib.compress(json.dumps(columns, separators=(",", ":"), ensure_ascii=False).encode())
+        body = b"".join([
+            array("q", [draft.id for draft, _, _ in rows]).tobytes(),
+            array("Q", [digest for _, digest, _ in rows]).tobytes(),
+            array("Q", [base for _, _, base in rows]).tobytes(),
+            payload,
+        ])
+        header = HEADER.pack(MAGIC, len(rows), len(body), zlib.crc32(body),
+                             min(dates, default="").encode(), max(dates, default="").encode())
+        offset = f.seek(0, os.SEEK_END)
+        f.write(header + body)
+        f.flush()
+        self._size = offset + len(header) + len(body)
+        block = _Block(offset=offset, count=len(rows), length=len(body), min_date=min(dates, default=""), max_date=max(dates, default=""))
+        number = len(self._blocks)
+        self._blocks.append(block)
+        for row, (draft, digest, base) in enumerate(rows):
+            self._latest[draft.id] = (digest, base)
+            self._locations.setdefault(draft.id, []).append((number, row))
+
+    def history(self, draft_id: int) -> List[DraftVersion]:
+        """Every archived version of a draft, oldest first."""
+        with self._lock:
+            self._open()
+            return [self._version(draft_id, i) for i in range(len(self._locations.get(draft_id, ())))]
+
+    def latest(self, draft_id: int) -> Optional[DraftVersion]:
+        """The latest archived version of a draft."""
+        with self._lock:
+            self._open()
+            return self._version(draft_id, -1) if draft_id in self._locations else None
+
+    def query(self, text: Optional[str] = None, status: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None,
+              account: Optional[str] = None, limit: int = 20) -> List[DraftVersion]:
+        """Search the latest version of every archived draft.
+
+        Args:
+            text: Words that must all appear in the draft text, ignoring case
+            status: Only "scheduled", "published" or "draft" drafts
+            since: Only drafts scheduled/published at or after this ISO date
+            until: Only drafts scheduled/published before this ISO date
+            account: Only drafts of this account; all accounts if None
+            limit: Maximum number of results
+
+        Returns:
+            Matching drafts, most recently scheduled/published first, undated last
+        """
+        terms = text.lower().split() if text else []
+        since, until = normalize_date(since), normalize_date(until)
+        matches = []
+        with self._lock:
+            self._open()
+            for number, block in enumerate(self._blocks):
+                if since or until:
+                    if not block.max_date or (since and block.max_date < since) or (until and block.min_date >= until):
+                        continue
+                columns = None
+                start = block.keys_offset
+                ids = array("q", self._mapping()[start:start + 8 * block.count])
+                for row, draft_id in enumerate(ids):
+                    if self._locations[draft_id][-1] != (number, row):
+                        continue
+                    columns = columns or self._payload(number)
+                    if account and columns["account"][row] != account:
+                        continue
+                    date = columns["sort_date"][row]
+                    if (since and not (date and date >= since)) or (until and not (date and date < until)):
+                        continue
+                    if status and _status(columns["published_on"][row], columns["scheduled_date"][row]) != status:
+                        continue
+                    if terms:
+                        haystack = f"{columns['text'][row] or ''} {columns['text_first_tweet'][row]}".lower()
+                        if not all(term in haystack for term in terms):
+                            continue
+                    matches.append(((1, date, draft_id) if date else (0, "", draft_id), draft_id))
+            return [self._version(draft_id, -1) for _, draft_id in heapq.nlargest(limit, matches)]
@@ -0,0 +1,119 @@
+"""In-process response cache for the Typefully list endpoints."""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+@dataclass
+class CacheEntry:
+    """A cached response with its HTTP validators."""
+    value: Any
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class CacheStats:
+    """Counters describing how the cache has been used."""
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class ResponseCache:
+    """A bounded LRU cache with per-endpoint TTLs.
+
+    Keys are ``(path, *params)`` tuples; the TTL is looked up by ``path``.
+    Expired entries are kept (until evicted) so they can be revalidated with
+    ETag / Last-Modified instead of being downloaded again.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 0.0,
+                 max_entries: int = 64):
+        """Initialize the cache.
+
+        Args:
+            ttls: Seconds to keep responses fresh, per endpoint path
+            default_ttl: TTL for paths not listed in ``ttls``. 0 disables caching.
+            max_entries: Maximum number of entries before the least recently
+                         used one is evicted
+        """
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[Tuple[Hashable, ...], CacheEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, path: str) -> float:
+        return self.ttls.get(path, self.default_ttl)
+
+    def enabled_for(self, path: str) -> bool:
+        return self.max_entries > 0 and self.ttl_for(path) > 0
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[CacheEntry]:
+        """Return the entry for ``key``, fresh or stale, without counting a hit."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: Tuple[Hashable, ...], value: Any, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        """Store a response, evicting the least recently used entries if full."""
+        path = key[0]
+        if not self.enabled_for(path):
+            return
+        self._entries[key] = CacheEntry(
+            value=value,
+            expires_at=time.monotonic() + self.ttl_for(path),
+            etag=etag,
+            last_modified=last_modified,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def refresh(self, key: Tuple[Hashable, ...]) -> Optional[CacheEntry]:
+        """Mark an entry fresh again after a ``304 Not Modified``."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.expires_at = time.monotonic() + self.ttl_for(key[0])
+            self.stats.revalidations += 1
+        return entry
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop every entry for ``path``, or the whole cache if no path is given."""
+        if path is None:
+            dropped = len(self._entries)
+            self._entries.clear()
+        else:
+            keys = [key for key in self._entries if key[0] == path]
+            for key in keys:
+                del self._entries[key]
+            dropped = len(keys)
+        self.stats.invalidations += dropped
@@ -1,35 +1,73 @@
 """Typefully API client."""
 
-import os
-from typing import List, Optional, Dict, Any
+import asyncio
+import importlib.util
+import logging
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterator, List, Optional, Dict, Any
 import httpx
-from .types import Draft, CreateDraftRequest
-from .keychain import get_api_key
+from .cache import ResponseCache
+from .config import Settings
+from .deadline import DeadlineExceeded, remaining, within_deadline
+from .ratelimit import RETRY_STATUSES, LatencyWindow, RetryBudget, RetryPolicy, TokenBucket, parse_retry_after
+from .types import DRAFT_LIST_ADAPTER, BatchCreateResult, BatchItemResult, Draft, CreateDraftRequest
+from .keychain import get_api_key, get_api_key_async
+from .metrics import metrics
+from .preflight import PreflightError, preflight
+from .replay import REDACTED, RecordingTransport, ReplayTransport
+
+logger = logging.getLogger(__name__)
+
+# A read still running after this quantile of recent read latencies is hedged
+HEDGE_QUANTILE = 0.95
+
+# Sent without a configured key when replaying a cassette, which has the real key redacted
+REPLAY_API_KEY = REDACTED
+
+MISSING_API_KEY_MESSAGE = (
+    "API key not found. Please either:\n"
+    "1. Set TYPEFULLY_API_KEY environment variable,\n"
+    "2. Set TYPEFULLY_API_KEY_FILE to a file containing the key, or\n"
+    "3. Store in macOS Keychain using Keychain Access app:\n"
+    "   - Service: typefully-mcp-server\n"
+    "   - Account: api_key\n"
+    "   - Password: your_api_key_here"
+)
+
+
+class UnconfirmedDraftError(ValueError):
+    """The API accepted a draft, but its response couldn't be read."""
 
 
 class TypefullyClient:
     """Client for interacting with the Typefully API."""
     
     BASE_URL = "https://api.typefully.com/v1"
+    DRAFTS_PATH = "/drafts/"
+    SCHEDULED_PATH = "/drafts/recently-scheduled/"
+    PUBLISHED_PATH = "/drafts/recently-published/"
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, settings: Optional[Settings] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
         """Initialize the Typefully client.
         
         Args:
             api_key: The Typefully API key. If not provided, will look for:
                      1. TYPEFULLY_API_KEY environment variable
                      2. macOS Keychain (if available)
+            settings: Connection settings. Defaults to ``Settings.from_env()``.
+            transport: Optional httpx transport, e.g. for testing against a mock API
         """
-        self.api_key = api_key or get_api_key()
+        self.settings = settings or Settings.from_env()
+        self.transport = transport
+        # Keys we resolved ourselves may be re-resolved after a 401 (e.g. a rotated key)
+        self.refresh_key_on_401 = api_key is None
+        with metrics.phase("key_lookup"):
+            self.api_key = api_key or get_api_key() or (REPLAY_API_KEY if self.settings.replay_cassette else None)
         if not self.api_key:
-            raise ValueError(
-                "API key not found. Please either:\n"
-                "1. Set TYPEFULLY_API_KEY environment variable, or\n"
-                "2. Store in macOS Keychain using Keychain Access app:\n"
-                "   - Service: typefully-mcp-server\n"
-                "   - Account: api_key\n"
-                "   - Password: your_api_key_here"
-            )
+            raise ValueError(MISSING_API_KEY_MESSAGE)
         
         self.headers = {
             "X-API-KEY": f"Bearer {self.api_key}",
@@ -37,75 +75,600 @@ class TypefullyClient:
             "Accept": "application/json"
         }
         self.client = None
+        self.cache = ResponseCache(
+            ttls={
+                self.SCHEDULED_PATH: self.settings.cache_ttl_scheduled,
+                self.PUBLISHED_PATH: self.settings.cache_ttl_published,
+            },
+            max_entries=self.settings.cache_max_entries,
+        )
+        self.limiter = TokenBucket(self.settings.rate_limit, self.settings.rate_limit_burst)
+        self.retry_policy = RetryPolicy(
+            max_attempts=self.settings.retry_max_attempts,
+            backoff_base=self.settings.retry_backoff_base,
+            backoff_max=self.settings.retry_backoff_max,
+            max_retry_after=self.settings.retry_max_wait,
+        )
+        self.retry_budget = RetryBudget(ratio=self.settings.retry_budget_ratio)
+        self.retries = 0
+        # Shared fetches of the list endpoints, so concurrent identical GETs make one request
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        # Callers waiting on each shared fetch; it is cancelled when the last one gives up
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self.coalesced = 0
+        self.latency = LatencyWindow()
+        self.hedges = 0
+        # Called with every list of drafts freshly received from the API
+        self.observers: List[Callable[[List[Draft]], None]] = []
+        # Called with every draft before it is created; raising refuses the draft
+        self.validators: List[Callable[[CreateDraftRequest], None]] = []
     
-    async def __aenter__(self):
-        self.client = httpx.AsyncClient(base_url=self.BASE_URL, headers=self.headers)
+    def open(self) -> "TypefullyClient":
+        """Create the underlying connection pool. Safe to call more than once."""
+        if self.client is None:
+            settings = self.settings
+            http2 = settings.http2
+            if http2 and importlib.util.find_spec("h2") is None:
+                logger.warning("HTTP/2 requested but 'h2' is not installed - install with: pip install 'httpx[http2]'")
+                http2 = False
+            limits = httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive_connections,
+                keepalive_expiry=settings.keepalive_expiry,
+            )
+            transport = self.transport
+            if settings.replay_cassette:
+                logger.info(f"Replaying API responses from {settings.replay_cassette} (speedup {settings.replay_speedup:g})")
+                transport = ReplayTransport(settings.replay_cassette, speedup=settings.replay_speedup)
+            elif settings.record_cassette:
+                logger.info(f"Recording API requests and responses to {settings.record_cassette}")
+                # A custom transport replaces the client's own, so the pool limits go on the wrapped one
+                transport = RecordingTransport(
+                    transport or httpx.AsyncHTTPTransport(limits=limits, http2=http2), settings.record_cassette
+                )
+            self.client = httpx.AsyncClient(
+                base_url=settings.base_url or self.BASE_URL,
+                headers=self.headers,
+                limits=limits,
+                http2=http2,
+                timeout=httpx.Timeout(settings.request_timeout, connect=settings.connect_timeout),
+                transport=transport,
+            )
         return self
     
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
+    async def aclose(self) -> None:
+        """Close the connection pool."""
         if self.client:
-            await self.client.aclose()
+            client, self.client = self.client, None
+            await client.aclose()
     
-    async def create_draft(self, request: CreateDraftRequest) -> Draft:
+    async def __aenter__(self):
+        return self.open()
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+    
+    async def create_draft(self, request: CreateDraftRequest, checked: bool = False) -> Draft:
         """Create a new draft.
         
         Args:
             request: The draft creation request
+            checked: The request already passed preflight, e.g. when it was
+                     queued in the outbox, so it is not checked again
             
         Returns:
             The created draft
+            
+        Raises:
+            PreflightError: If the draft fails local validation; nothing is sent
+            ValueError: If a validator refuses the draft
         """
         if not self.client:
             raise RuntimeError("Client not initialized. Use async with statement.")
+        
+        if self.settings.preflight and not checked:
+            with metrics.phase("preflight"):
+                checked = preflight(request, self.settings.tweet_max_length)
+            if not checked.ok:
+                metrics.count("preflight_rejected")
+                raise PreflightError(checked)
+        for validator in self.validators:
+            validator(request)
             
         # Convert the request to dict and handle the schedule-date field
         payload = request.model_dump(exclude_none=True, by_alias=True)
         
-        response = await self.client.post("/drafts/", json=payload)
+        # Not idempotent: only retried when the API cannot have created the draft
+        response = await self._request("POST", self.DRAFTS_PATH, idempotent=False, json=payload)
         response.raise_for_status()
         
-        return Draft(**response.json())
+        # The new draft may now be in the scheduled list
+        self.cache.invalidate(self.SCHEDULED_PATH)
+        # A list request already in flight may predate the new draft; don't let later callers join it
+        for key in [key for key in self._inflight if key[0] == self.SCHEDULED_PATH]:
+            del self._inflight[key]
+        
+        with metrics.phase("parse"):
+            try:
+                draft = Draft.model_validate_json(response.content)
+            except ValueError as e:
+                # The draft exists; sending it again would create a second one
+                raise UnconfirmedDraftError(f"The draft was created, but the API response could not be read: {e}") from e
+        self._notify([draft])
+        return draft
     
-    async def get_scheduled_drafts(self, content_filter: Optional[str] = None) -> List[Draft]:
-        """Get recently scheduled drafts.
+    async def create_drafts(self, requests: List[CreateDraftRequest],
+                            max_concurrency: Optional[int] = None,
+                            on_result: Optional[Callable[[BatchItemResult], Awaitable[None]]] = None
+                            ) -> BatchCreateResult:
+        """Create many drafts over the shared connection pool.
+        
+        A failed draft does not abort the batch; its error is reported in the
+        matching result instead.
         
         Args:
-            content_filter: Optional filter for "threads" or "tweets"
+            requests: The draft creation requests
+            max_concurrency: Maximum number of requests in flight at once.
+                             Defaults to the ``batch_concurrency`` setting.
+            on_result: Awaited with each draft's result as soon as it completes,
+                       e.g. to report progress
             
         Returns:
-            List of scheduled drafts
+            Per-draft results, in the same order as ``requests``, plus timing
         """
         if not self.client:
             raise RuntimeError("Client not initialized. Use async with statement.")
-            
-        params = {}
-        if content_filter:
-            params["content_filter"] = content_filter
         
-        response = await self.client.get("/drafts/recently-scheduled/", params=params)
-        response.raise_for_status()
+        max_concurrency = max(1, max_concurrency or self.settings.batch_concurrency)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def submit(index: int, request: CreateDraftRequest) -> BatchItemResult:
+            started = time.perf_counter()
+            async with semaphore:
+                try:
+                    draft = await self.create_draft(request)
+                    result = BatchItemResult(index=index, draft=draft, elapsed=time.perf_counter() - started)
+                except Exception as e:
+                    logger.warning(f"Batch item {index} failed: {e}")
+                    result = BatchItemResult(index=index, error=str(e), elapsed=time.perf_counter() - started)
+            if on_result is not None:
+                try:
+                    await on_result(result)
+                except Exception as e:
+                    logger.warning(f"Batch result callback failed: {e}")
+            return result
         
-        drafts_data = response.json()
-        return [Draft(**draft) for draft in drafts_data]
+        started = time.perf_counter()
+        results = await asyncio.gather(*(submit(i, request) for i, request in enumerate(requests)))
+        return BatchCreateResult(
+            results=list(results),
+            elapsed=time.perf_counter() - started,
+            max_concurrency=max_concurrency,
+        )
     
-    async def get_published_drafts(self, content_filter: Optional[str] = None) -> List[Draft]:
+    async def get_scheduled_drafts(self, content_filter: Optional[str] = None,
+                                   refresh: bool = False) -> List[Draft]:
+        """Get recently scheduled drafts.
+        
+        Args:
+            content_filter: Optional filter for "threads" or "tweets"
+            refresh: Revalidate with the API even if a fresh cached copy exists
+            
+        Returns:
+            List of scheduled drafts
+        """
+        return await self._get_drafts(self.SCHEDULED_PATH, content_filter, refresh)
+    
+    async def get_published_drafts(self, content_filter: Optional[str] = None,
+                                   refresh: bool = False) -> List[Draft]:
         """Get recently published drafts.
         
         Args:
             content_filter: Optional filter for "threads" or "tweets"
+            refresh: Revalidate with the API even if a fresh cached copy exists
             
         Returns:
             List of published drafts
         """
+        return await self._get_drafts(self.PUBLISHED_PATH, content_filter, refresh)
+    
+    async def _get_drafts(self, path: str, content_filter: Optional[str], refresh: bool) -> List[Draft]:
+        """Fetch a draft list, serving it from the response cache when possible.
+        
+        Concurrent calls for the same list share one upstream request. Each
+        caller waits on it through ``asyncio.shield`` and until its own
+        deadline, so a cancelled caller doesn't cancel the request for the
+        others; once every caller has given up, the request is cancelled.
+        The request runs under the deadline of the caller that started it;
+        if that runs out, callers with time left start a new one.
+        """
         if not self.client:
             raise RuntimeError("Client not initialized. Use async with statement.")
-            
+        
+        key = (path, content_filter)
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh and not refresh:
+            self.cache.stats.hits += 1
+            metrics.count("cache", result="hit")
+            return list(entry.value)
+        
+        while True:
+            fetch = self._inflight.get(key)
+            if fetch is not None:
+                self.coalesced += 1
+                metrics.count("coalesced", path=path)
+            else:
+                fetch = asyncio.ensure_future(self._fetch_drafts(key))
+                self._inflight[key] = fetch
+                fetch.add_done_callback(lambda done: self._fetch_done(key, done))
+            self._waiters[fetch] = self._waiters.get(fetch, 0) + 1
+            try:
+                return list(await within_deadline(asyncio.shield(fetch)))
+            except DeadlineExceeded:
+                if not (fetch.done() and not fetch.cancelled() and isinstance(fetch.exception(), DeadlineExceeded)):
+                    raise
+                # The request ran out of its starter's time; retry if we have time left
+                remaining()
+            finally:
+                self._waiters[fetch] -= 1
+                if not self._waiters[fetch]:
+                    del self._waiters[fetch]
+                    if not fetch.done():
+                        fetch.cancel()
+    
+    def _fetch_done(self, key: tuple, fetch: asyncio.Future) -> None:
+        if self._inflight.get(key) is fetch:
+            del self._inflight[key]
+        # Retrieve the error so it isn't logged as unhandled when every waiter was cancelled
+        if not fetch.cancelled():
+            fetch.exception()
+    
+    async def _fetch_drafts(self, key: tuple) -> List[Draft]:
+        """Request a draft list, revalidating the cached copy if there is one."""
+        path, content_filter = key
+        entry = self.cache.get(key)
         params = {}
         if content_filter:
             params["content_filter"] = content_filter
+        headers = entry.validators() if entry is not None else {}
         
-        response = await self.client.get("/drafts/recently-published/", params=params)
+        response = await self._request("GET", path, params=params, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self.cache.refresh(key)
+            self.cache.stats.hits += 1
+            metrics.count("cache", result="revalidated")
+            return entry.value
         response.raise_for_status()
+        self.cache.stats.misses += 1
+        metrics.count("cache", result="miss")
+        
+        with metrics.phase("parse"):
+            drafts = DRAFT_LIST_ADAPTER.validate_json(response.content)
+        # Detached by create_draft: the list may predate the new draft, so don't cache it
+        if self._inflight.get(key) is asyncio.current_task():
+            self.cache.set(
+                key,
+                drafts,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        self._notify(drafts)
+        return drafts
+    
+    def _set_api_key(self, api_key: str) -> None:
+        self.api_key = api_key
+        self.headers["X-API-KEY"] = f"Bearer {api_key}"
+        if self.client is not None:
+            self.client.headers["X-API-KEY"] = self.headers["X-API-KEY"]
+    
+    async def _refresh_api_key(self) -> bool:
+        """Resolve the API key again after a 401. Returns True if it changed."""
+        with metrics.phase("key_lookup"):
+            api_key = await get_api_key_async(refresh=True)
+        if not api_key or api_key == self.api_key:
+            return False
+        logger.info("API key changed; retrying with the new key")
+        self._set_api_key(api_key)
+        return True
+    
+    @staticmethod
+    def _connection_trace() -> Callable:
+        """Build an httpx trace hook that times TCP connects and TLS handshakes for one request."""
+        started: Dict[str, float] = {}
+        
+        async def trace(event: str, info: Dict[str, Any]) -> None:
+            name, _, stage = event.rpartition(".")
+            if name in ("connection.connect_tcp", "connection.start_tls"):
+                if stage == "started":
+                    started[name] = time.perf_counter()
+                elif stage == "complete" and name in started:
+                    phase = "connect" if name.endswith("tcp") else "tls_handshake"
+                    metrics.observe(phase, time.perf_counter() - started.pop(name))
+        
+        return trace
+    
+    def _notify(self, drafts: List[Draft]) -> None:
+        """Pass freshly fetched drafts to the observers. Observer errors are logged, not raised."""
+        for observer in self.observers:
+            try:
+                observer(drafts)
+            except Exception as e:
+                logger.warning(f"Draft observer {observer!r} failed: {e}")
+    
+    def _with_deadline_timeout(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """``kwargs`` with connect/read/write timeouts shortened to the time left before the deadline."""
+        left = remaining()
+        settings = self.settings
+        if left is None or left >= max(settings.request_timeout, settings.connect_timeout):
+            return kwargs
+        timeout = httpx.Timeout(min(settings.request_timeout, left), connect=min(settings.connect_timeout, left))
+        return {**kwargs, "timeout": timeout}
+    
+    @staticmethod
+    def _fits_deadline(delay: float) -> bool:
+        """Whether a retry after ``delay`` seconds could still finish before the deadline."""
+        left = remaining()
+        return left is None or delay < left
+    
+    async def _send(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send one attempt of a request, hedging slow reads if ``hedge_reads`` is on.
+        
+        A GET still running after the recent 95th percentile latency gets a
+        second, identical request if the rate limiter and retry budget allow
+        it right away. The first successful response wins and the other
+        request is cancelled.
+        """
+        if not (self.settings.hedge_reads and method == "GET"):
+            return await self.client.request(method, path, **kwargs)
+        
+        attempts: Dict[asyncio.Future, float] = {}
+        
+        def launch() -> asyncio.Future:
+            attempt = asyncio.ensure_future(self.client.request(method, path, **kwargs))
+            # Retrieve the error of an attempt nobody waits for, so it isn't logged as unhandled
+            attempt.add_done_callback(lambda done: done.cancelled() or done.exception())
+            attempts[attempt] = time.perf_counter()
+            return attempt
+        
+        first = launch()
+        try:
+            delay = self.latency.quantile(HEDGE_QUANTILE)
+            if delay is not None:
+                await asyncio.wait({first}, timeout=max(delay, self.settings.hedge_min_delay))
+                if not first.done() and self.limiter.try_acquire() and self.retry_budget.try_spend():
+                    self.hedges += 1
+                    metrics.count("hedges")
+                    launch()
+            while True:
+                for attempt, started in attempts.items():
+                    if attempt.done() and attempt.exception() is None:
+                        self.latency.record(time.perf_counter() - started)
+                        if attempt is not first:
+                            metrics.count("hedge_wins")
+                        return attempt.result()
+                pending = [attempt for attempt in attempts if not attempt.done()]
+                if not pending:
+                    # Every attempt failed; report the first one's error
+                    return first.result()
+                await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+    
+    async def _request(self, method: str, path: str, idempotent: bool = True, **kwargs) -> httpx.Response:
+        """Send a request through the rate limiter, retrying transient failures.
+        
+        Idempotent requests are retried on 429, 5xx and transport errors.
+        Non-idempotent requests are only retried when the API provably did not
+        process them: on 429, and when the connection could not be established.
+        The last response is returned as-is; callers still ``raise_for_status``.
+        
+        Every wait is bounded by the current deadline (see ``deadline``):
+        each attempt's timeouts are shortened to the time left, and no retry
+        is made whose backoff would outlast it.
         
-        drafts_data = response.json()
-        return [Draft(**draft) for draft in drafts_data] 
\ No newline at end of file
+        Raises:
+            DeadlineExceeded: If the deadline passes while waiting
+        """
+        policy = self.retry_policy
+        self.retry_budget.record_request()
+        attempt = 0
+        key_refreshed = False
+        if metrics.enabled:
+            kwargs["extensions"] = {**kwargs.get("extensions", {}), "trace": self._connection_trace()}
+        while True:
+            with metrics.phase("rate_limit_wait"):
+                await within_deadline(self.limiter.acquire())
+            try:
+                with metrics.phase("http"):
+                    response = await within_deadline(self._send(method, path, **self._with_deadline_timeout(kwargs)))
+            except httpx.TransportError as e:
+                metrics.count("http_errors", error=type(e).__name__)
+                retryable = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if not retryable or attempt + 1 >= policy.max_attempts:
+                    raise
+                delay = policy.backoff(attempt)
+                if not self._fits_deadline(delay) or not self.retry_budget.try_spend():
+                    raise
+                reason = type(e).__name__
+            else:
+                status = response.status_code
+                if metrics.enabled:
+                    metrics.count("http_responses", method=method, status=str(status))
+                    metrics.count("payload_bytes", direction="out", value=len(response.request.content))
+                    metrics.count("payload_bytes", direction="in", value=len(response.content))
+                if status == 401 and self.refresh_key_on_401 and not key_refreshed:
+                    key_refreshed = True
+                    if await self._refresh_api_key():
+                        await response.aclose()
+                        continue
+                if status not in RETRY_STATUSES:
+                    return response
+                if not (idempotent or status == 429) or attempt + 1 >= policy.max_attempts:
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                delay = retry_after if retry_after is not None else policy.backoff(attempt)
+                if delay > policy.max_retry_after or not self._fits_deadline(delay) or not self.retry_budget.try_spend():
+                    return response
+                await response.aclose()
+                reason = f"HTTP {status}"
+                if status == 429:
+                    # Hold back every request from this client, not just this one
+                    self.limiter.pause(delay)
+                    delay = 0.0
+            attempt += 1
+            self.retries += 1
+            metrics.count("retries", reason=reason)
+            logger.info(f"Retrying {method} {path} after {reason} (attempt {attempt + 1}/{policy.max_attempts})")
+            if delay:
+                await asyncio.sleep(delay)
+
+
+class SharedClient:
+    """A lazily opened TypefullyClient shared by every tool call in the process.
+    
+    The client (and its connection pool) is created on first use and reused
+    until ``aclose`` is called, so tool calls don't pay for key lookup and a
+    fresh TCP + TLS handshake each time.
+    
+    Without ``api_key`` the key is resolved like ``get_api_key`` does, and
+    looked up again after a 401.
+    """
+    
+    def __init__(self, settings: Optional[Settings] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 api_key: Optional[str] = None):
+        self.settings = settings
+        self.transport = transport
+        self.api_key = api_key
+        self.observers: List[Callable[[List[Draft]], None]] = []
+        self.validators: List[Callable[[CreateDraftRequest], None]] = []
+        self._client: Optional[TypefullyClient] = None
+        self._lock = asyncio.Lock()
+    
+    def configure(self, settings: Optional[Settings] = None,
+                  transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        """Change the settings used the next time the client is opened."""
+        self.settings = settings
+        self.transport = transport
+    
+    @property
+    def current(self) -> Optional[TypefullyClient]:
+        """The shared client if it is open, without opening it."""
+        return self._client
+    
+    async def get(self) -> TypefullyClient:
+        """Return the shared client, opening it on first use."""
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    api_key = self.api_key
+                    if api_key is None:
+                        # Resolve the key off the event loop; the keyring may block on D-Bus
+                        with metrics.phase("key_lookup"):
+                            api_key = await get_api_key_async()
+                    if not api_key and self.settings is not None and self.settings.replay_cassette:
+                        api_key = REPLAY_API_KEY
+                    if not api_key:
+                        raise ValueError(MISSING_API_KEY_MESSAGE)
+                    client = TypefullyClient(api_key=api_key, settings=self.settings, transport=self.transport)
+                    client.refresh_key_on_401 = self.api_key is None
+                    client.observers = self.observers
+                    client.validators = self.validators
+                    self._client = client.open()
+        return self._client
+    
+    async def aclose(self) -> None:
+        """Close the shared client. It is reopened on the next ``get``."""
+        async with self._lock:
+            if self._client is not None:
+                client, self._client = self._client, None
+                await client.aclose()
+
+
+class ClientPool:
+    """One SharedClient per API key, for HTTP sessions that bring their own key.
+    
+    Each key gets its own connection pool, response cache and rate limiter,
+    so one account's cached responses are never served to another.
+    
+    The pool is bounded: whenever a client is requested, clients unused for
+    ``session_client_idle_ttl`` seconds are closed, and so are the least
+    recently used ones beyond ``session_clients_max``. A key held by a
+    running tool call (see ``hold``) is never closed.
+    """
+    
+    def __init__(self, settings: Optional[Settings] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.settings = settings
+        self.transport = transport
+        self.evicted = 0
+        # Least recently used first
+        self._clients: "OrderedDict[str, SharedClient]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._holds: Counter = Counter()
+    
+    def configure(self, settings: Optional[Settings] = None,
+                  transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        """Change the settings used by clients opened from now on."""
+        self.settings = settings
+        self.transport = transport
+    
+    @contextmanager
+    def hold(self, api_key: Optional[str]) -> Iterator[None]:
+        """Keep the client for ``api_key`` open until the block exits."""
+        if not api_key:
+            yield
+            return
+        self._holds[api_key] += 1
+        try:
+            yield
+        finally:
+            self._holds[api_key] -= 1
+            if not self._holds[api_key]:
+                del self._holds[api_key]
+            if api_key in self._clients:
+                self._clients.move_to_end(api_key)
+                self._last_used[api_key] = time.monotonic()
+    
+    async def get(self, api_key: str) -> TypefullyClient:
+        """Return the client for ``api_key``, opening it on first use."""
+        shared = self._clients.get(api_key)
+        if shared is None:
+            shared = self._clients[api_key] = SharedClient(self.settings, self.transport, api_key=api_key)
+        else:
+            self._clients.move_to_end(api_key)
+        self._last_used[api_key] = time.monotonic()
+        await self._evict()
+        return await shared.get()
+    
+    async def _evict(self) -> None:
+        """Close idle clients, and the least recently used ones over the limit."""
+        settings = self.settings or Settings.from_env()
+        idle_before = time.monotonic() - settings.session_client_idle_ttl
+        excess = len(self._clients) - settings.session_clients_max if settings.session_clients_max else 0
+        evicted = []
+        # The most recently requested client is last, and never evicted here
+        for api_key in list(self._clients)[:-1]:
+            if api_key in self._holds:
+                continue
+            idle = settings.session_client_idle_ttl > 0 and self._last_used[api_key] < idle_before
+            if not idle and excess <= 0:
+                continue
+            evicted.append(self._clients.pop(api_key))
+            del self._last_used[api_key]
+            excess -= 1
+        if evicted:
+            self.evicted += len(evicted)
+            logger.info(f"Closing {len(evicted)} client(s) for session API keys; {len(self._clients)} open")
+            await asyncio.gather(*(shared.aclose() for shared in evicted))
+    
+    def __len__(self) -> int:
+        return len(self._clients)
+    
+    async def aclose(self) -> None:
+        """Close every client in the pool."""
+        clients, self._clients = list(self._clients.values()), OrderedDict()
+        self._last_used.clear()
+        await asyncio.gather(*(shared.aclose() for shared in clients))
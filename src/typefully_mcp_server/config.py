@@ -0,0 +1,96 @@
+"""Runtime configuration for the Typefully MCP server."""
+
+import os
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+ENV_PREFIX = "TYPEFULLY_"
+
+
+class Settings(BaseModel):
+    """Server and client settings.
+
+    Every field can be overridden with an environment variable named
+    ``TYPEFULLY_<FIELD_NAME>``, e.g. ``TYPEFULLY_MAX_CONNECTIONS=20``.
+    """
+    base_url: str = Field("https://api.typefully.com/v1", description="Typefully API base URL")
+    max_connections: int = Field(20, description="Maximum number of open connections to the API")
+    max_keepalive_connections: int = Field(20, description="Maximum number of idle connections kept alive")
+    keepalive_expiry: float = Field(30.0, description="Seconds an idle connection is kept alive")
+    http2: bool = Field(False, description="Use HTTP/2 (requires the 'h2' package)")
+    cache_ttl_scheduled: float = Field(30.0, description="Seconds to cache the recently scheduled list (0 disables)")
+    cache_ttl_published: float = Field(120.0, description="Seconds to cache the recently published list (0 disables)")
+    cache_max_entries: int = Field(64, description="Maximum number of cached list responses")
+    rate_limit: float = Field(10.0, description="Maximum requests per second sent to the API (0 disables)")
+    rate_limit_burst: int = Field(20, description="Maximum requests sent back to back before rate limiting applies")
+    retry_max_attempts: int = Field(4, description="Total attempts per request, including the first")
+    retry_backoff_base: float = Field(0.5, description="Backoff in seconds before the first retry; doubles per attempt")
+    retry_backoff_max: float = Field(30.0, description="Upper bound for a single backoff")
+    retry_max_wait: float = Field(60.0, description="Give up instead of honoring a longer Retry-After")
+    retry_budget_ratio: float = Field(0.2, description="Retries allowed per request, averaged over time")
+    connect_timeout: float = Field(5.0, description="Seconds to wait for a connection to the API")
+    request_timeout: float = Field(30.0, description="Seconds to wait for each read or write of an API request")
+    tool_timeout: float = Field(60.0, description="Default end-to-end seconds for a tool call, including retries and rate limit waits (0 for none)")
+    hedge_reads: bool = Field(False, description="Send a second copy of a list read that is slower than the recent 95th percentile")
+    hedge_min_delay: float = Field(0.05, description="Minimum seconds to wait before hedging a list read")
+    record_cassette: str = Field("", description="Append every API request and response to this cassette file, with credentials redacted")
+    replay_cassette: str = Field("", description="Serve API responses from this cassette file instead of calling the API")
+    replay_speedup: float = Field(1.0, description="Replay recorded response times this many times faster (0 for no delay)")
+    batch_concurrency: int = Field(5, description="Default number of drafts submitted at once by create_drafts")
+    list_page_size: int = Field(50, description="Default number of drafts per page in the list tools (0 for all)")
+    output_max_chars: int = Field(20000, description="Default character budget for list tool responses (0 for no limit)")
+    templates_file: str = Field("", description="JSON file of format strings replacing the built-in templates for drafts in list responses")
+    metrics: bool = Field(False, description="Record per-phase timings and counters for get_server_stats")
+    metrics_textfile: str = Field("", description="Write metrics to this file in Prometheus text format (implies metrics)")
+    metrics_export_interval: float = Field(15.0, description="Seconds between metrics textfile writes")
+    metrics_otel: bool = Field(False, description="Emit an OpenTelemetry span per phase (implies metrics)")
+    data_dir: str = Field("~/.cache/typefully-mcp-server", description="Directory for local data files")
+    store_path: str = Field("", description="SQLite file for the local draft index (default: <data_dir>/drafts.sqlite3, ':memory:' keeps it in memory)")
+    sync_interval: float = Field(0.0, description="Seconds between background syncs of the draft lists (0 disables)")
+    sync_max_staleness: float = Field(0.0, description="Oldest synced snapshot, in seconds, served to tool calls (default: twice the interval)")
+    accounts_file: str = Field("", description="JSON file of named accounts and their API keys, for managing several accounts")
+    default_account: str = Field("default", description="Account used when a tool call doesn't name one")
+    transport: str = Field("stdio", description="'stdio' for one client per process, or 'http' to serve Streamable HTTP and SSE")
+    http_host: str = Field("127.0.0.1", description="Interface the HTTP transport listens on")
+    http_port: int = Field(8000, description="Port the HTTP transport listens on")
+    drain_timeout: float = Field(30.0, description="Seconds to let running tool calls finish when the HTTP server shuts down")
+    session_clients_max: int = Field(64, description="Most API clients kept open for session API keys; the least recently used are closed beyond this (0 for no limit)")
+    session_client_idle_ttl: float = Field(600.0, description="Seconds a session API key's client is kept open without tool calls (0 keeps it open)")
+    preflight: bool = Field(True, description="Validate drafts locally and reject invalid ones before calling the API")
+    tweet_max_length: int = Field(280, description="Weighted characters per tweet beyond which the preflight check warns (0 disables the length check)")
+    schedule_timezone: str = Field("UTC", description="Time zone of the posting times used by plan_schedule")
+    schedule_times: str = Field("09:00,13:00,17:00", description="Comma-separated local posting times used by plan_schedule")
+    schedule_days: str = Field("mon,tue,wed,thu,fri,sat,sun", description="Comma-separated weekdays plan_schedule posts on")
+    schedule_min_gap_minutes: float = Field(60.0, description="Minimum minutes between a planned post and any other scheduled post")
+    duplicate_check: str = Field("warn", description="'warn' to flag new drafts that nearly duplicate existing ones, 'block' to refuse them, or 'off'")
+    duplicate_threshold: float = Field(0.8, description="Similarity, from 0 to 1, at which a new draft counts as a near-duplicate")
+    outbox: bool = Field(False, description="Queue created drafts in a local outbox and send them in the background")
+    outbox_path: str = Field("", description="SQLite file for the outbox (default: <data_dir>/outbox.sqlite3)")
+    outbox_max_attempts: int = Field(10, description="Attempts to send a queued draft before marking it failed")
+    outbox_backoff_base: float = Field(5.0, description="Backoff in seconds before resending a queued draft; doubles per attempt")
+    outbox_backoff_max: float = Field(600.0, description="Upper bound for a single outbox backoff")
+    archive: bool = Field(False, description="Keep every version of every draft seen in an append-only archive, beyond the API's recent window")
+    archive_path: str = Field("", description="Draft archive file (default: <data_dir>/drafts.archive)")
+
+    def data_path(self, filename: str) -> str:
+        """Resolve ``filename`` inside ``data_dir``."""
+        return os.path.join(os.path.expanduser(self.data_dir), filename)
+
+    @classmethod
+    def from_env(cls, environ: Optional[dict] = None) -> "Settings":
+        """Build settings from ``TYPEFULLY_*`` environment variables.
+
+        Args:
+            environ: Mapping to read from. Defaults to ``os.environ``.
+
+        Returns:
+            The settings, with defaults for every variable that is not set
+        """
+        environ = os.environ if environ is None else environ
+        values = {}
+        for name in cls.model_fields:
+            value = environ.get(f"{ENV_PREFIX}{name.upper()}")
+            if value not in (None, ""):
+                values[name] = value
+        return cls(**values)
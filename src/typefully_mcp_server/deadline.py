@@ -0,0 +1,87 @@
+"""End-to-end deadlines for tool calls.
+
+A deadline is set once per tool call and checked wherever the call waits:
+the rate limiter, each HTTP attempt, the backoff between retries and
+shared list fetches. It lives in a context variable, so it follows the
+call into the tasks it starts without being passed around.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# When the current call must finish (monotonic clock), and the seconds it was given
+_deadline: ContextVar[Optional[Tuple[float, float]]] = ContextVar("typefully_deadline", default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """A tool call ran out of time."""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"Timed out after {seconds:g}s waiting for the Typefully API; try again or pass a longer timeout")
+        self.seconds = seconds
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Give the code inside ``seconds`` to finish.
+
+    None or 0 means no limit. A nested deadline can shorten the current one
+    but never extend it.
+    """
+    current = _deadline.get()
+    if not seconds or seconds <= 0 or (current is not None and current[0] <= time.monotonic() + seconds):
+        yield
+        return
+    token = _deadline.set((time.monotonic() + seconds, seconds))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one.
+
+    Raises:
+        DeadlineExceeded: If the deadline has passed
+    """
+    current = _deadline.get()
+    if current is None:
+        return None
+    left = current[0] - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded(current[1])
+    return left
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """Await ``awaitable``, cancelling it if the current deadline passes first.
+
+    Raises:
+        DeadlineExceeded: If the deadline passed
+    """
+    try:
+        left = remaining()
+    except DeadlineExceeded:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise
+    if left is None:
+        return await awaitable
+    try:
+        if hasattr(asyncio, "timeout"):
+            # Python 3.11+: cancels the current task in place instead of wrapping the awaitable in a new one
+            async with asyncio.timeout(left):
+                return await awaitable
+        return await asyncio.wait_for(awaitable, left)
+    except asyncio.TimeoutError as e:
+        at, seconds = _deadline.get()
+        # A timeout of the awaitable's own, not ours
+        if isinstance(e, DeadlineExceeded) or at > time.monotonic():
+            raise
+        raise DeadlineExceeded(seconds) from None
@@ -0,0 +1,120 @@
+"""Output formatting for the draft list tools."""
+
+import json
+from typing import Dict, List, Optional, get_args
+
+from .templates import Templates
+from .types import Draft, ListFormat
+
+FORMATS = get_args(ListFormat)
+
+# The built-in templates, used unless the server passes its own
+BUILTIN_TEMPLATES = Templates()
+
+# Room kept free for the header and footer when applying the character budget
+HEADER_RESERVE = 80
+FOOTER_RESERVE = 120
+
+
+def format_preview(drafts: List[Draft], limit: int = 10, templates: Optional[Templates] = None) -> str:
+    """The first ``limit`` drafts, one line each, for progress messages."""
+    compact = (templates or BUILTIN_TEMPLATES)["compact"]
+    lines = [compact.render(i + 1, draft) for i, draft in enumerate(drafts[:limit])]
+    if len(drafts) > limit:
+        lines.append(f"… and {len(drafts) - limit} more\n")
+    return "".join(lines).rstrip("\n")
+
+
+# Header emoji and "full" format template of each list
+LIST_KINDS: Dict[str, Dict[str, str]] = {
+    "scheduled": {"emoji": "📅", "template": "scheduled"},
+    "published": {"emoji": "✅", "template": "published"},
+}
+
+
+def page_bounds(total: int, cursor: Optional[str], limit: Optional[int]) -> tuple:
+    """Resolve a cursor (an offset into the list) and limit to ``(start, end)``."""
+    try:
+        start = max(0, int(cursor)) if cursor else 0
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    end = total if not limit else min(total, start + limit)
+    return min(start, total), end
+
+
+def format_draft_list(drafts: List[Draft], kind: str, cursor: Optional[str] = None,
+                      limit: Optional[int] = None, output_format: str = "full",
+                      max_chars: Optional[int] = None, templates: Optional[Templates] = None) -> str:
+    """Render one page of a draft list within a character budget.
+
+    Args:
+        drafts: The full draft list
+        kind: "scheduled" or "published"
+        cursor: Where to start, as returned in a previous page's footer
+        limit: Maximum number of drafts on this page
+        output_format: "full" (markdown), "compact" (one line per draft) or "json"
+        max_chars: Character budget for the whole response. Drafts that don't
+                   fit are left for the next page.
+        templates: Templates for the drafts; the built-in ones by default
+
+    Returns:
+        The formatted page, with a cursor for the next page if there is one
+    """
+    if output_format not in FORMATS:
+        raise ValueError(f"Unknown format: {output_format!r}")
+    total = len(drafts)
+    start, end = page_bounds(total, cursor, limit)
+    budget = max_chars or None
+
+    if output_format == "json":
+        return _format_json(drafts, kind, start, end, budget)
+
+    if start >= total:
+        return f"No more {kind} drafts (total {total})."
+
+    template = (templates or BUILTIN_TEMPLATES)[LIST_KINDS[kind]["template"] if output_format == "full" else "compact"]
+    parts: List[str] = [""]  # header, filled in once we know how many drafts fit
+    size = HEADER_RESERVE
+    shown = start
+    for i in range(start, end):
+        entry = template.render(i + 1, drafts[i])
+        if budget and size + len(entry) + FOOTER_RESERVE > budget:
+            if shown == start:
+                # Always show something, even if a single draft is over budget
+                parts.append(entry[:max(0, budget - size - FOOTER_RESERVE)] + "…\n")
+                shown += 1
+            break
+        parts.append(entry)
+        size += len(entry)
+        shown += 1
+
+    header = f"{LIST_KINDS[kind]['emoji']} Found {total} {kind} draft(s)"
+    if start > 0 or shown < total:
+        header += f", showing {start + 1}-{shown}"
+    parts[0] = header + (":\n\n" if output_format == "full" else ":\n")
+
+    if shown < total:
+        parts.append(f"\n… {total - shown} more draft(s) not shown. Call again with cursor=\"{shown}\" for the next page.")
+    elif kind == "scheduled" and output_format == "full":
+        thread_count = sum(1 for draft in drafts if draft.num_tweets > 1)
+        if thread_count > 0:
+            parts.append(f"\n💡 **Note:** Found {thread_count} thread(s). Click the links above to view the full content on Typefully.")
+    return "".join(parts)
+
+
+def _format_json(drafts: List[Draft], kind: str, start: int, end: int, budget: Optional[int]) -> str:
+    items: List[str] = []
+    size = 0
+    shown = start
+    for i in range(start, end):
+        item = drafts[i].model_dump_json(exclude_none=True)
+        if budget and items and size + len(item) + FOOTER_RESERVE > budget:
+            break
+        items.append(item)
+        size += len(item) + 1
+        shown += 1
+    next_cursor = json.dumps(str(shown)) if shown < len(drafts) else "null"
+    return (
+        f'{{"kind": "{kind}", "total": {len(drafts)}, "offset": {start}, '
+        f'"next_cursor": {next_cursor}, "drafts": [{",".join(items)}]}}'
+    )
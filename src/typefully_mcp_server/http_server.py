@@ -0,0 +1,124 @@
+"""Serve the MCP server over HTTP so one long-lived instance can be shared.
+
+Streamable HTTP is served at ``/mcp`` and the older SSE transport at ``/sse``
+(with messages posted to ``/messages/``). Every session shares the pooled
+API client, response cache, background sync and local draft index of this
+process. Clients may send their own key in the ``X-Typefully-Api-Key``
+header; otherwise the server's key is used.
+"""
+
+import logging
+import socket
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+import uvicorn
+from mcp.server.sse import SseServerTransport
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from sse_starlette.sse import AppStatus
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+from starlette.types import Receive, Scope, Send
+
+from . import __version__
+from . import server
+
+logger = logging.getLogger(__name__)
+
+STREAMABLE_HTTP_PATH = "/mcp"
+SSE_PATH = "/sse"
+MESSAGES_PATH = "/messages/"
+
+# Once running tool calls have drained, seconds to wait for open streams before closing them
+STREAM_CLOSE_TIMEOUT = 2.0
+
+
+class StreamableHTTPEndpoint:
+    """ASGI app handing requests to the session manager.
+
+    A class rather than a function, so Starlette routes raw ASGI calls to it.
+    """
+
+    def __init__(self, session_manager: StreamableHTTPSessionManager):
+        self.session_manager = session_manager
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.session_manager.handle_request(scope, receive, send)
+
+
+def create_http_app() -> Starlette:
+    """Build the Starlette app serving ``server.app`` over Streamable HTTP and SSE."""
+    session_manager = StreamableHTTPSessionManager(app=server.app)
+    sse = SseServerTransport(MESSAGES_PATH)
+
+    async def handle_sse(request: Request) -> Response:
+        async with sse.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+            await server.app.run(read_stream, write_stream, server.app.create_initialization_options())
+        return Response()
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse({
+            "status": "draining" if server.inflight.draining else "ok",
+            "version": __version__,
+            "inflight_calls": server.inflight.count,
+        }, status_code=503 if server.inflight.draining else 200)
+
+    @asynccontextmanager
+    async def lifespan(starlette_app: Starlette) -> AsyncIterator[None]:
+        # Hold a session of our own so the shared resources outlive every client session
+        async with server.server_lifespan(server.app):
+            async with session_manager.run():
+                yield
+
+    return Starlette(
+        routes=[
+            Route(STREAMABLE_HTTP_PATH, endpoint=StreamableHTTPEndpoint(session_manager)),
+            Route(SSE_PATH, endpoint=handle_sse, methods=["GET"]),
+            Mount(MESSAGES_PATH, app=sse.handle_post_message),
+            Route("/healthz", endpoint=health, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+class DrainingServer(uvicorn.Server):
+    """A uvicorn server that lets running tool calls finish before shutting down.
+
+    On SIGTERM / SIGINT it stops accepting connections, answers new tool calls
+    on open sessions with an error, and waits up to ``drain_timeout`` for the
+    running ones before closing sessions and the shared API clients.
+    """
+
+    def __init__(self, config: uvicorn.Config, drain_timeout: float):
+        super().__init__(config)
+        self.drain_timeout = drain_timeout
+        # sse-starlette ends every event stream as soon as the signal arrives, which
+        # would cut off responses still being streamed. Streams left open after the
+        # drain are closed by uvicorn after STREAM_CLOSE_TIMEOUT instead.
+        if hasattr(AppStatus, "disable_automatic_graceful_drain"):
+            AppStatus.disable_automatic_graceful_drain()
+
+    async def shutdown(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        for listener in self.servers:
+            listener.close()
+        if server.inflight.count:
+            logger.info(f"Waiting up to {self.drain_timeout:g}s for {server.inflight.count} tool call(s) to finish")
+        if not await server.inflight.drain(self.drain_timeout):
+            logger.warning(f"{server.inflight.count} tool call(s) still running after {self.drain_timeout:g}s; cancelling them")
+        await super().shutdown(sockets)
+
+
+async def run_http(host: str, port: int) -> None:
+    """Serve the MCP protocol over HTTP until the process is asked to stop."""
+    config = uvicorn.Config(
+        create_http_app(),
+        host=host,
+        port=port,
+        log_level="info",
+        timeout_graceful_shutdown=STREAM_CLOSE_TIMEOUT,
+    )
+    logger.info(f"Serving MCP over Streamable HTTP at http://{host}:{port}{STREAMABLE_HTTP_PATH} "
+                f"and SSE at http://{host}:{port}{SSE_PATH}")
+    await DrainingServer(config, server.settings.drain_timeout).serve()
@@ -1,14 +1,14 @@
 """Keychain utilities for secure API key storage."""
 
+import asyncio
+import importlib.util
 import os
 import logging
 from typing import Optional
 
-try:
-    import keyring
-    KEYRING_AVAILABLE = True
-except ImportError:
-    KEYRING_AVAILABLE = False
+# keyring probes its backends (D-Bus / Secret Service on Linux) when imported,
+# so it is only imported when a lookup actually needs it.
+KEYRING_AVAILABLE = importlib.util.find_spec("keyring") is not None
 
 logger = logging.getLogger(__name__)
 
@@ -16,34 +16,113 @@ logger = logging.getLogger(__name__)
 SERVICE_NAME = "typefully-mcp-server"
 KEY_NAME = "api_key"
 
+# Seconds to wait for the keyring backend before giving up
+KEYRING_TIMEOUT = 5.0
 
-def get_api_key() -> Optional[str]:
-    """Get API key from keychain, environment variable, or return None.
-    
-    Priority order:
-    1. Environment variable TYPEFULLY_API_KEY
-    2. macOS Keychain (if available)
-    3. None
-    
-    Returns:
-        The API key if found, None otherwise
-    """
-    # First try environment variable (for compatibility)
+# The key resolved for this process; lookups after the first do no I/O
+_cached_api_key: Optional[str] = None
+
+
+def _from_env_or_file() -> Optional[str]:
+    """Look up the key in TYPEFULLY_API_KEY, then in the file named by TYPEFULLY_API_KEY_FILE."""
     api_key = os.getenv("TYPEFULLY_API_KEY")
     if api_key:
         logger.info("Using API key from environment variable")
         return api_key
-    
-    # Then try keychain if available
-    if KEYRING_AVAILABLE:
+
+    key_file = os.getenv("TYPEFULLY_API_KEY_FILE")
+    if key_file:
         try:
-            api_key = keyring.get_password(SERVICE_NAME, KEY_NAME)
-            if api_key:
-                logger.info("Using API key from macOS Keychain")
-                return api_key
-        except Exception as e:
-            logger.warning(f"Failed to retrieve API key from keychain: {e}")
-    else:
+            with open(os.path.expanduser(key_file)) as f:
+                api_key = f.read().strip()
+        except OSError as e:
+            logger.warning(f"Failed to read API key file {key_file}: {e}")
+            return None
+        if api_key:
+            logger.info("Using API key from file")
+            return api_key
+    return None
+
+
+def _keyring_enabled() -> bool:
+    if os.getenv("TYPEFULLY_DISABLE_KEYRING", "").lower() in ("1", "true", "yes"):
+        return False
+    if not KEYRING_AVAILABLE:
         logger.warning("Keyring not available - install with: pip install keyring")
-    
-    return None 
\ No newline at end of file
+        return False
+    return True
+
+
+def _from_keyring() -> Optional[str]:
+    """Blocking keyring lookup; may talk to D-Bus or the macOS Keychain."""
+    try:
+        import keyring
+        api_key = keyring.get_password(SERVICE_NAME, KEY_NAME)
+        if api_key:
+            logger.info("Using API key from macOS Keychain")
+            return api_key
+    except Exception as e:
+        logger.warning(f"Failed to retrieve API key from keychain: {e}")
+    return None
+
+
+def get_api_key(refresh: bool = False) -> Optional[str]:
+    """Get API key from environment variable, key file, keychain, or return None.
+
+    The key is resolved once per process and cached.
+
+    Priority order:
+    1. Environment variable TYPEFULLY_API_KEY
+    2. File named by TYPEFULLY_API_KEY_FILE
+    3. macOS Keychain (if available and not disabled with TYPEFULLY_DISABLE_KEYRING)
+    4. None
+
+    Args:
+        refresh: Ignore the cached key and look it up again, e.g. after a 401
+
+    Returns:
+        The API key if found, None otherwise
+    """
+    global _cached_api_key
+    if _cached_api_key and not refresh:
+        return _cached_api_key
+
+    api_key = _from_env_or_file()
+    if not api_key and _keyring_enabled():
+        api_key = _from_keyring()
+    _cached_api_key = api_key
+    return api_key
+
+
+async def get_api_key_async(refresh: bool = False, timeout: float = KEYRING_TIMEOUT) -> Optional[str]:
+    """Like ``get_api_key``, but runs the keyring lookup in a worker thread.
+
+    Environment variables and key files are read directly; only the keyring
+    backend, which can block on D-Bus, is moved off the event loop.
+
+    Args:
+        refresh: Ignore the cached key and look it up again
+        timeout: Seconds to wait for the keyring before giving up
+
+    Returns:
+        The API key if found, None otherwise
+    """
+    global _cached_api_key
+    if _cached_api_key and not refresh:
+        return _cached_api_key
+
+    api_key = _from_env_or_file()
+    if not api_key and _keyring_enabled():
+        try:
+            api_key = await asyncio.wait_for(asyncio.to_thread(_from_keyring), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Keychain lookup timed out after {timeout:g}s")
+            api_key = None
+    _cached_api_key = api_key
+    return api_key
+
+
+def clear_cached_api_key() -> None:
+    """Forget the cached key so the next lookup resolves it again."""
+    global _cached_api_key
+    _cached_api_key = None
@@ -0,0 +1,175 @@
+"""Lightweight per-phase timing and counters for the client and tools."""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Shared no-op context manager handed out when metrics are disabled
+_NULL_PHASE = nullcontext()
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Timing:
+    """Running summary of one phase, with a bounded sample for percentiles."""
+
+    def __init__(self, sample_size: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=sample_size)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Metrics:
+    """Phase timings and counters.
+
+    When disabled, ``phase`` returns a shared no-op context manager and
+    ``count`` / ``observe`` return immediately, so instrumented code paths
+    cost one attribute check.
+    """
+
+    def __init__(self, enabled: bool = False, otel: bool = False):
+        self.enabled = enabled
+        self.timings: Dict[str, Timing] = {}
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.started_at = time.time()
+        self._tracer = None
+        if otel:
+            self.enable_otel()
+
+    def configure(self, enabled: bool, otel: bool = False) -> None:
+        self.enabled = enabled
+        if otel:
+            self.enable_otel()
+
+    def enable_otel(self) -> None:
+        """Also emit an OpenTelemetry span per phase, if opentelemetry is installed."""
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            logger.warning("OpenTelemetry requested but not installed - install with: pip install opentelemetry-api")
+            return
+        self._tracer = trace.get_tracer("typefully_mcp_server")
+
+    def phase(self, name: str):
+        """Time a block of code as ``name``."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        span = self._tracer.start_as_current_span(name) if self._tracer else nullcontext()
+        started = time.perf_counter()
+        try:
+            with span:
+                yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def observe(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = Timing()
+        timing.add(seconds)
+
+    def count(self, name: str, value: float = 1, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def reset(self) -> None:
+        self.timings.clear()
+        self.counters.clear()
+        self.started_at = time.time()
+
+    def summary(self) -> str:
+        """Human-readable summary of every phase and counter."""
+        lines = [f"Uptime: {time.time() - self.started_at:.0f}s", ""]
+        if self.timings:
+            lines.append(f"{'phase':<28} {'count':>7} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+            for name in sorted(self.timings):
+                t = self.timings[name]
+                lines.append(
+                    f"{name:<28} {t.count:>7} {t.total / t.count * 1000:>9.2f} {t.quantile(0.5) * 1000:>9.2f} "
+                    f"{t.quantile(0.95) * 1000:>9.2f} {t.max * 1000:>9.2f}"
+                )
+            lines.append("")
+        for (name, labels), value in sorted(self.counters.items()):
+            label_text = ",".join(f"{k}={v}" for k, v in labels)
+            lines.append(f"{name}{'{' + label_text + '}' if label_text else ''}: {value:g}")
+        return "\n".join(lines)
+
+    def prometheus(self, extra: Optional[Dict[str, float]] = None) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP typefully_phase_seconds Time spent per phase of a tool call",
+            "# TYPE typefully_phase_seconds summary",
+        ]
+        for name in sorted(self.timings):
+            t = self.timings[name]
+            for q in (0.5, 0.95, 0.99):
+                lines.append(f'typefully_phase_seconds{{phase="{name}",quantile="{q}"}} {t.quantile(q):.6f}')
+            lines.append(f'typefully_phase_seconds_sum{{phase="{name}"}} {t.total:.6f}')
+            lines.append(f'typefully_phase_seconds_count{{phase="{name}"}} {t.count}')
+        seen = set()
+        for (name, labels), value in sorted(self.counters.items()):
+            metric = f"typefully_{name}_total"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+            lines.append(f"{metric}{{{label_text}}} {value:g}" if label_text else f"{metric} {value:g}")
+        for name, value in sorted((extra or {}).items()):
+            lines.append(f"# TYPE typefully_{name} gauge")
+            lines.append(f"typefully_{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str, extra: Optional[Dict[str, float]] = None) -> None:
+        """Atomically write the Prometheus text format for node_exporter's textfile collector."""
+        path = os.path.expanduser(path)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.prometheus(extra))
+        os.replace(tmp_path, path)
+
+    async def export_periodically(self, path: str, interval: float,
+                                  gauges: Optional[Callable[[], Dict[str, float]]] = None) -> None:
+        """Rewrite the textfile every ``interval`` seconds until cancelled, and once more on the way out."""
+        try:
+            while True:
+                self._export(path, gauges)
+                await asyncio.sleep(interval)
+        finally:
+            self._export(path, gauges)
+
+    def _export(self, path: str, gauges: Optional[Callable[[], Dict[str, float]]]) -> None:
+        try:
+            self.write_textfile(path, gauges() if gauges else None)
+        except Exception as e:
+            logger.warning(f"Failed to write metrics to {path}: {e}")
+
+
+# Process-wide metrics, configured by the server from settings
+metrics = Metrics()
@@ -0,0 +1,489 @@
+"""Durable on-disk queue of drafts waiting to be sent to the Typefully API.
+
+With the outbox enabled, ``create_draft`` stores the draft in a local SQLite
+file and returns at once; a background worker sends it, retrying with
+backoff while the API is slow or down. Entries survive restarts, and a
+draft that was being sent when the process died is looked up in the
+scheduled list before it is sent again, so it isn't created twice.
+Drafts are checked with preflight when they are queued, not again when
+sent, so a schedule date that passes during an outage is left to the API.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from pydantic import BaseModel
+
+from .client import TypefullyClient, UnconfirmedDraftError
+from .config import Settings
+from .preflight import TWEET_SEPARATOR, PreflightError, parse_schedule_date, split_tweets
+from .ratelimit import RetryPolicy
+from .similarity import DuplicateDraftError
+from .store import DEFAULT_ACCOUNT
+from .types import CreateDraftRequest, Draft
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+OUTBOX_STATUSES = (PENDING, SENDING, SENT, FAILED)
+
+# An identical draft queued again within this many seconds is not sent twice
+DEDUPE_WINDOW = 24 * 3600
+# Sent and failed entries are deleted after this many seconds
+RETENTION = 7 * 24 * 3600
+# A claimed entry not reported back within this many seconds was left by a crashed worker
+CLAIM_LEASE = 300.0
+# Longest the worker sleeps between checks, to pick up entries queued by other processes
+POLL_INTERVAL = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account TEXT NOT NULL,
+    request TEXT NOT NULL,
+    dedupe_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    maybe_sent INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    claimed_by TEXT,
+    claimed_at REAL,
+    draft_id INTEGER,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS outbox_dedupe ON outbox (dedupe_key, created_at);
+"""
+
+ENTRY_COLUMNS = (
+    "id, account, request, status, attempts, maybe_sent, next_attempt_at, "
+    "draft_id, last_error, created_at, updated_at"
+)
+
+
+def dedupe_key(request: CreateDraftRequest, account: str) -> str:
+    """Hash identifying identical drafts for the same account."""
+    payload = request.model_dump_json(exclude_none=True)
+    return hashlib.sha256(f"{account}\n{payload}".encode()).hexdigest()
+
+
+class OutboxEntry(BaseModel):
+    """A queued draft and its delivery state."""
+    id: int
+    account: str
+    request: CreateDraftRequest
+    status: str
+    attempts: int
+    maybe_sent: bool
+    next_attempt_at: float
+    draft_id: Optional[int] = None
+    last_error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "OutboxEntry":
+        values = dict(row)
+        values["request"] = CreateDraftRequest.model_validate_json(values["request"])
+        return cls(**values)
+
+
+class Outbox:
+    """SQLite queue of drafts to create.
+
+    Several server processes may share one file: entries are claimed
+    atomically, so each is sent by one worker at a time.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """Initialize the outbox. The database is opened on first use.
+
+        Args:
+            path: SQLite database file, or ":memory:" for a per-process queue
+        """
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path != ":memory:":
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def enqueue(self, request: CreateDraftRequest, account: str = DEFAULT_ACCOUNT,
+                now: Optional[float] = None) -> Tuple[OutboxEntry, bool]:
+        """Queue a draft, unless an identical one was queued recently and hasn't failed.
+
+        Returns:
+            The entry, and whether it was newly queued (False for a duplicate)
+        """
+        now = time.time() if now is None else now
+        key = dedupe_key(request, account)
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                f"SELECT {ENTRY_COLUMNS} FROM outbox WHERE dedupe_key = ? AND status != ? AND created_at >= ? "
+                "ORDER BY id DESC LIMIT 1",
+                (key, FAILED, now - DEDUPE_WINDOW),
+            ).fetchone()
+            if row is not None:
+                return OutboxEntry.from_row(row), False
+            cursor = self.conn.execute(
+                "INSERT INTO outbox (account, request, dedupe_key, status, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (account, request.model_dump_json(exclude_none=True), key, PENDING, now, now, now),
+            )
+            row = self.conn.execute(f"SELECT {ENTRY_COLUMNS} FROM outbox WHERE id = ?", (cursor.lastrowid,)).fetchone()
+        return OutboxEntry.from_row(row), True
+
+    def claim(self, limit: int, worker_id: str, now: Optional[float] = None) -> List[OutboxEntry]:
+        """Mark up to ``limit`` due entries as being sent by ``worker_id`` and return them.
+
+        Entries claimed by a worker that stopped reporting back more than
+        ``CLAIM_LEASE`` seconds ago are taken over and flagged as possibly sent.
+        """
+        now = time.time() if now is None else now
+        with self._lock, self.conn:
+            # Takes the write lock before reading, so no other process can claim the
+            # same entries between the SELECT and the UPDATE (no RETURNING before SQLite 3.35)
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute(
+                "UPDATE outbox SET status = ?, maybe_sent = 1, claimed_by = NULL, updated_at = ? "
+                "WHERE status = ? AND claimed_at < ?",
+                (PENDING, now, SENDING, now - CLAIM_LEASE),
+            )
+            ids = [row[0] for row in self.conn.execute(
+                "SELECT id FROM outbox WHERE status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at, id LIMIT ?",
+                (PENDING, now, limit),
+            )]
+            if not ids:
+                return []
+            placeholders = ", ".join("?" * len(ids))
+            self.conn.execute(
+                f"UPDATE outbox SET status = ?, claimed_by = ?, claimed_at = ?, attempts = attempts + 1, updated_at = ? "
+                f"WHERE id IN ({placeholders})",
+                (SENDING, worker_id, now, now, *ids),
+            )
+            rows = self.conn.execute(
+                f"SELECT {ENTRY_COLUMNS} FROM outbox WHERE id IN ({placeholders}) ORDER BY id", ids
+            ).fetchall()
+        return [OutboxEntry.from_row(row) for row in rows]
+
+    def _update(self, entry_id: int, **values) -> None:
+        values["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in values)
+        with self._lock, self.conn:
+            self.conn.execute(f"UPDATE outbox SET {assignments} WHERE id = ?", (*values.values(), entry_id))
+
+    def mark_sent(self, entry_id: int, draft_id: int) -> None:
+        self._update(entry_id, status=SENT, draft_id=draft_id, claimed_by=None, last_error=None)
+
+    def mark_unconfirmed(self, entry_id: int, error: str) -> None:
+        """Mark an entry sent without a draft id: the API accepted it, but its response couldn't be read."""
+        self._update(entry_id, status=SENT, draft_id=None, claimed_by=None, last_error=error)
+
+    def mark_failed(self, entry_id: int, error: str) -> None:
+        self._update(entry_id, status=FAILED, claimed_by=None, last_error=error)
+
+    def retry_later(self, entry_id: int, delay: float, error: Optional[str], maybe_sent: bool) -> None:
+        """Return an entry to the queue, to be sent again in ``delay`` seconds."""
+        values = dict(status=PENDING, claimed_by=None, next_attempt_at=time.time() + delay, last_error=error)
+        if maybe_sent:
+            values["maybe_sent"] = 1
+        self._update(entry_id, **values)
+
+    def get(self, entry_id: int) -> Optional[OutboxEntry]:
+        with self._lock:
+            row = self.conn.execute(f"SELECT {ENTRY_COLUMNS} FROM outbox WHERE id = ?", (entry_id,)).fetchone()
+        return OutboxEntry.from_row(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 20) -> List[OutboxEntry]:
+        """Entries, most recently queued first."""
+        sql = f"SELECT {ENTRY_COLUMNS} FROM outbox"
+        params: list = []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [OutboxEntry.from_row(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of entries per status."""
+        with self._lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        counts = dict.fromkeys(OUTBOX_STATUSES, 0)
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def next_due(self) -> Optional[float]:
+        """When the next pending entry is due, or None if nothing is pending."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = ?", (PENDING,)
+            ).fetchone()[0]
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Delete sent and failed entries older than ``RETENTION``."""
+        now = time.time() if now is None else now
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM outbox WHERE status IN (?, ?) AND updated_at < ?", (SENT, FAILED, now - RETENTION)
+            )
+        return cursor.rowcount
+
+
+def same_instant(a: str, b: Optional[str]) -> bool:
+    """Whether two ISO 8601 dates are the same time. Dates without a zone are taken as UTC."""
+    if not b:
+        return False
+    try:
+        first, second = parse_schedule_date(a), parse_schedule_date(b)
+    except ValueError:
+        return False
+    utc = [date.replace(tzinfo=timezone.utc) if date.tzinfo is None else date for date in (first, second)]
+    return utc[0] == utc[1]
+
+
+def schedule_passed(request: CreateDraftRequest, now: Optional[datetime] = None) -> bool:
+    """Whether the draft's schedule date is already in the past."""
+    if not request.schedule_date or request.schedule_date == "next-free-slot":
+        return False
+    try:
+        date = parse_schedule_date(request.schedule_date)
+    except ValueError:
+        return False
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date < (now or datetime.now(timezone.utc))
+
+
+class AmbiguousDraftError(Exception):
+    """A scheduled draft may be the one an interrupted attempt created, but can't be told apart."""
+
+
+def classify_error(e: Exception) -> Tuple[bool, bool]:
+    """Whether a failed send is worth retrying, and whether the API may have created the draft anyway.
+
+    Only drafts refused before sending and 4xx responses fail for good;
+    anything else may be transient.
+    """
+    if isinstance(e, (PreflightError, DuplicateDraftError)):
+        return False, False
+    if isinstance(e, httpx.HTTPStatusError):
+        status = e.response.status_code
+        if status == 429:
+            return True, False
+        if 400 <= status < 500:
+            return False, False
+        return True, status >= 500
+    if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+        return True, False
+    if isinstance(e, httpx.TransportError):
+        return True, True
+    return True, True
+
+
+class OutboxWorker:
+    """Drains the outbox in the background.
+
+    Due entries are sent up to ``batch_concurrency`` at a time through each
+    account's client. Transient failures are retried with jittered
+    exponential backoff for up to ``outbox_max_attempts`` attempts; drafts
+    the API rejects are marked failed at once.
+    """
+
+    def __init__(self, outbox: Outbox, get_client: Callable[[str], Awaitable[TypefullyClient]],
+                 settings: Settings, on_sent: Optional[Callable[[OutboxEntry, Draft], None]] = None):
+        """Initialize the worker.
+
+        Args:
+            outbox: The queue to drain
+            get_client: Returns the client for an account name
+            settings: Supplies the concurrency and retry settings
+            on_sent: Called with each entry and the draft created for it
+        """
+        self.outbox = outbox
+        self.get_client = get_client
+        self.settings = settings
+        self.on_sent = on_sent
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.retry_policy = RetryPolicy(
+            max_attempts=settings.outbox_max_attempts,
+            backoff_base=settings.outbox_backoff_base,
+            backoff_max=settings.outbox_backoff_max,
+        )
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def wake(self) -> None:
+        """Check for due entries now, e.g. after queueing one."""
+        self._wake.set()
+
+    async def drain_once(self) -> int:
+        """Send every entry that is due now.
+
+        Returns:
+            The number of entries attempted
+        """
+        entries = self.outbox.claim(max(1, self.settings.batch_concurrency), self.worker_id)
+        if entries:
+            await asyncio.gather(*(self._send(entry) for entry in entries))
+        return len(entries)
+
+    async def _find_created(self, client: TypefullyClient, entry: OutboxEntry) -> Optional[Draft]:
+        """Look for a draft an interrupted attempt may already have created.
+
+        Only scheduled drafts can be found, as there is no list of unscheduled ones.
+        A draft matches if its first tweet is exactly the queued first tweet and it
+        is scheduled for the queued date. A draft with the same first tweet whose
+        date can't be compared, because the entry asked for the next free slot,
+        raises ``AmbiguousDraftError`` rather than being taken for this entry.
+
+        Raises:
+            AmbiguousDraftError: If a draft may or may not be this entry's
+        """
+        request = entry.request
+        if not request.schedule_date:
+            return None
+        tweets = (split_tweets(request.content, True) if request.threadify
+                  else request.content.strip().split(TWEET_SEPARATOR))
+        first_tweet = tweets[0].strip() if tweets else ""
+        candidates = [
+            draft for draft in await client.get_scheduled_drafts(refresh=True)
+            if first_tweet and draft.text_first_tweet.strip() == first_tweet
+        ]
+        if request.schedule_date == "next-free-slot":
+            if candidates:
+                raise AmbiguousDraftError(
+                    f"Scheduled draft {candidates[0].id} has the same first tweet and may have been created by an "
+                    f"interrupted attempt, so this draft was not sent again. Check it and queue the draft again if needed."
+                )
+            return None
+        for draft in candidates:
+            if same_instant(request.schedule_date, draft.scheduled_date):
+                return draft
+        return None
+
+    async def _send(self, entry: OutboxEntry) -> None:
+        posted = False
+        try:
+            client = await self.get_client(entry.account)
+            draft = await self._find_created(client, entry) if entry.maybe_sent else None
+            if draft is not None:
+                logger.info(f"Outbox entry {entry.id} was already created as draft {draft.id}")
+            else:
+                posted = True
+                # Checked when it was queued; a schedule date that has passed since is left to the API
+                draft = await client.create_draft(entry.request, checked=True)
+        except asyncio.CancelledError:
+            # Shutting down mid-send; the next worker checks before sending again
+            self.outbox.retry_later(entry.id, 0.0, "Interrupted by shutdown", maybe_sent=posted)
+            raise
+        except AmbiguousDraftError as e:
+            self.outbox.mark_unconfirmed(entry.id, str(e))
+            self.sent += 1
+            logger.warning(f"Outbox entry {entry.id} was not sent again: {e}")
+            return
+        except UnconfirmedDraftError as e:
+            self.outbox.mark_unconfirmed(entry.id, str(e).splitlines()[0])
+            self.sent += 1
+            logger.warning(f"Outbox entry {entry.id} was sent, but the created draft is unknown: {e}")
+            return
+        except Exception as e:
+            self._handle_failure(entry, e, posted)
+            return
+        self.outbox.mark_sent(entry.id, draft.id)
+        self.sent += 1
+        logger.info(f"Outbox entry {entry.id} sent as draft {draft.id}")
+        if self.on_sent is not None:
+            try:
+                self.on_sent(entry, draft)
+            except Exception as e:
+                logger.warning(f"Outbox callback failed: {e}")
+
+    def _handle_failure(self, entry: OutboxEntry, e: Exception, posted: bool) -> None:
+        error = str(e).splitlines()[0] if str(e) else type(e).__name__
+        retryable, maybe_sent = classify_error(e)
+        if not retryable and schedule_passed(entry.request):
+            error = f"schedule_date {entry.request.schedule_date} passed while the draft was waiting to be sent: {error}"
+        if not retryable or entry.attempts >= self.retry_policy.max_attempts:
+            self.outbox.mark_failed(entry.id, error)
+            self.failed += 1
+            logger.warning(f"Outbox entry {entry.id} failed after {entry.attempts} attempt(s): {error}")
+            return
+        delay = self.retry_policy.backoff(entry.attempts - 1)
+        self.outbox.retry_later(entry.id, delay, error, maybe_sent and posted)
+        self.retried += 1
+        logger.info(f"Outbox entry {entry.id} will be retried in {delay:.0f}s: {error}")
+
+    async def run(self) -> None:
+        """Drain the outbox until cancelled."""
+        self.outbox.prune()
+        while True:
+            self._wake.clear()
+            try:
+                if await self.drain_once():
+                    continue
+                next_due = self.outbox.next_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Outbox drain failed: {e}")
+                next_due = None
+            timeout = POLL_INTERVAL if next_due is None else min(POLL_INTERVAL, max(0.0, next_due - time.time()))
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="typefully-outbox")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
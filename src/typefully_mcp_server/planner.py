@@ -0,0 +1,186 @@
+"""Plan explicit schedule dates for a batch of drafts.
+
+Posting slots come from a cadence (local posting times on chosen weekdays
+in a time zone). Slots too close to an already-scheduled post are skipped
+using an index of merged intervals around the scheduled times, so planning
+``n`` drafts around ``m`` scheduled posts takes O((n + m) log m).
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Iterator, List, Optional, Set
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from .config import Settings
+from .preflight import parse_schedule_date
+from .types import CreateDraftRequest
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+NEXT_FREE_SLOT = "next-free-slot"
+
+# How far ahead to look for free slots before giving up
+MAX_PLAN_DAYS = 366
+
+
+def to_utc(value: str) -> datetime:
+    """Parse an ISO date, taking naive dates to be UTC."""
+    parsed = parse_schedule_date(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def format_utc(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class IntervalIndex:
+    """Blocked time ranges around scheduled posts, merged and sorted for binary search."""
+
+    def __init__(self, times: Iterable[datetime], gap: timedelta):
+        """Build the index.
+
+        Args:
+            times: When posts are already scheduled
+            gap: Minimum distance a new post must keep from each of them
+        """
+        # At least a second, so a slot at exactly a scheduled time is always blocked
+        radius = max(gap.total_seconds(), 1.0)
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+        for point in sorted(t.timestamp() for t in times):
+            if self.ends and point - radius < self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], point + radius)
+            else:
+                self.starts.append(point - radius)
+                self.ends.append(point + radius)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def blocks(self, when: datetime) -> bool:
+        """Whether ``when`` is too close to a scheduled post."""
+        x = when.timestamp()
+        i = bisect_right(self.starts, x) - 1
+        return i >= 0 and self.starts[i] < x < self.ends[i]
+
+
+@dataclass
+class Cadence:
+    """When posts may go out: local times on some weekdays, in one time zone."""
+    tz: ZoneInfo
+    times: List[time]
+    days: Set[int] = field(default_factory=lambda: set(range(7)))
+    min_gap: timedelta = timedelta(minutes=60)
+
+    @classmethod
+    def parse(cls, tz: str, times: Iterable[str], days: Iterable[str], min_gap_minutes: float) -> "Cadence":
+        """Build a cadence from a time zone name, "HH:MM" times and weekday abbreviations.
+
+        Raises:
+            ValueError: If any part can't be parsed
+        """
+        try:
+            zone = ZoneInfo(tz)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown time zone {tz!r}; use an IANA name such as 'Europe/Prague' or 'UTC'")
+        parsed_times = []
+        for value in times:
+            try:
+                parsed_times.append(time.fromisoformat(value.strip()))
+            except ValueError:
+                raise ValueError(f"Posting time {value!r} is not in HH:MM format")
+        parsed_days = set()
+        for value in days:
+            name = value.strip().lower()[:3]
+            if name not in WEEKDAYS:
+                raise ValueError(f"Unknown weekday {value!r}; use {', '.join(WEEKDAYS)}")
+            parsed_days.add(WEEKDAYS.index(name))
+        if not parsed_times or not parsed_days:
+            raise ValueError("The cadence needs at least one posting time and one weekday")
+        return cls(tz=zone, times=sorted(set(parsed_times)), days=parsed_days,
+                   min_gap=timedelta(minutes=max(0.0, min_gap_minutes)))
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "Cadence":
+        return cls.parse(settings.schedule_timezone, settings.schedule_times.split(","),
+                         settings.schedule_days.split(","), settings.schedule_min_gap_minutes)
+
+    def slots(self, start: datetime) -> Iterator[datetime]:
+        """Posting slots at or after ``start``, in order, as UTC datetimes.
+
+        Local times skipped by a daylight saving change are left out.
+        """
+        first_day: date = start.astimezone(self.tz).date()
+        for offset in range(MAX_PLAN_DAYS):
+            day = first_day + timedelta(days=offset)
+            if day.weekday() not in self.days:
+                continue
+            for posting_time in self.times:
+                local = datetime.combine(day, posting_time, tzinfo=self.tz)
+                slot = local.astimezone(timezone.utc)
+                if slot.astimezone(self.tz).replace(tzinfo=None) != local.replace(tzinfo=None):
+                    continue
+                if slot >= start:
+                    yield slot
+
+
+@dataclass
+class PlannedDraft:
+    """One draft of a plan, with the date it was given."""
+    index: int
+    request: CreateDraftRequest
+    slot: datetime
+    pinned: bool = False
+
+
+def plan_schedule(requests: List[CreateDraftRequest], scheduled: Iterable[datetime],
+                  cadence: Cadence, start: Optional[datetime] = None) -> List[PlannedDraft]:
+    """Give every draft without an explicit date the next free slot of ``cadence``.
+
+    Drafts that already have an ISO ``schedule_date`` keep it, and the other
+    drafts keep ``cadence.min_gap`` away from them as from ``scheduled``.
+    Drafts are given slots in order, so the plan follows the batch order.
+
+    Args:
+        requests: The drafts to plan
+        scheduled: When posts are already scheduled
+        cadence: Allowed posting times
+        start: Earliest slot to use. Defaults to now.
+
+    Returns:
+        The drafts in the order given, with ``schedule_date`` set
+
+    Raises:
+        ValueError: If a schedule date can't be parsed, or there aren't enough
+                    free slots in the next ``MAX_PLAN_DAYS`` days
+    """
+    start = start or datetime.now(timezone.utc)
+    pinned = {
+        i: to_utc(request.schedule_date)
+        for i, request in enumerate(requests)
+        if request.schedule_date and request.schedule_date != NEXT_FREE_SLOT
+    }
+    index = IntervalIndex([*scheduled, *pinned.values()], cadence.min_gap)
+    slots = cadence.slots(start)
+    planned: List[PlannedDraft] = []
+    last: Optional[datetime] = None
+    for i, request in enumerate(requests):
+        if i in pinned:
+            planned.append(PlannedDraft(index=i, request=request, slot=pinned[i], pinned=True))
+            continue
+        for slot in slots:
+            if not index.blocks(slot) and (last is None or slot - last >= cadence.min_gap):
+                break
+        else:
+            found = sum(not p.pinned for p in planned)
+            raise ValueError(
+                f"Only {found} free slot(s) in the next {MAX_PLAN_DAYS} days; "
+                "add posting times or weekdays, or lower the minimum gap"
+            )
+        last = slot
+        planned.append(PlannedDraft(
+            index=i, request=request.model_copy(update={"schedule_date": format_utc(slot)}), slot=slot
+        ))
+    return planned
@@ -0,0 +1,305 @@
+"""Local validation of drafts before they are sent to the Typefully API.
+
+Splits content into tweets, counts characters the way X does and checks
+the schedule date, so malformed drafts are rejected without a network
+round trip. Tweets over the standard length only get a warning, since
+X Premium accounts and LinkedIn accept longer posts, and a schedule date
+that can't be read locally is left for the API to judge. Character weights follow X's twitter-text (v3) rules: most
+Latin, Greek, Cyrillic, Hebrew, Arabic and Indic characters count once,
+CJK and other characters count twice, every URL counts as 23 and every
+emoji, including multi-code-point sequences, counts as 2.
+"""
+
+import re
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from .types import CreateDraftRequest
+
+# Separates tweets of a thread in ``content``
+TWEET_SEPARATOR = "\n\n\n\n"
+
+MAX_TWEET_LENGTH = 280
+URL_LENGTH = 23
+EMOJI_WEIGHT = 2
+
+# Code point ranges weighted 1; everything else is weighted 2
+LIGHT_RANGES: Tuple[Tuple[int, int], ...] = (
+    (0x0000, 0x10FF),
+    (0x2000, 0x200D),
+    (0x2010, 0x201F),
+    (0x2032, 0x2037),
+)
+
+# Code points that start an emoji presentation
+EMOJI_RANGES: Tuple[Tuple[int, int], ...] = (
+    (0x1F000, 0x1FAFF),
+    (0x2600, 0x27BF),
+    (0x2300, 0x23FF),
+    (0x2B00, 0x2BFF),
+)
+
+ZWJ = 0x200D
+KEYCAP = 0x20E3
+REGIONAL_INDICATORS = (0x1F1E6, 0x1F1FF)
+# Variation selectors, skin tone modifiers and tag characters extend the preceding emoji
+EMOJI_MODIFIERS: Tuple[Tuple[int, int], ...] = (
+    (0xFE00, 0xFE0F),
+    (0x1F3FB, 0x1F3FF),
+    (0xE0020, 0xE007F),
+    (KEYCAP, KEYCAP),
+)
+
+COMMON_TLDS = (
+    "com|org|net|io|co|dev|app|ai|me|xyz|info|biz|edu|gov|so|sh|gg|tv|ly|to|"
+    "uk|us|de|fr|es|it|nl|eu|ca|au|in|jp|cn|br|ru|ch|se|no|cz|pl"
+)
+URL_PATTERN = re.compile(
+    r"(?:https?://|www\.)[^\s<>\"]+"
+    rf"|\b(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+(?:{COMMON_TLDS})\b(?:/[^\s<>\"]*)?",
+    re.IGNORECASE,
+)
+TRAILING_PUNCTUATION = ".,:;!?)]}'\""
+
+SENTENCE_BREAK = re.compile(r"(?<=[.!?…])\s+")
+
+# ISO 8601 dates and times in extended or basic format. Before Python 3.11,
+# datetime.fromisoformat rejects many of them: "Z", fractions that aren't 3
+# or 6 digits, offsets without a colon and the basic format (20240115T103000Z)
+ISO_DATETIME = re.compile(
+    r"(\d{4})-?(\d{2})-?(\d{2})"
+    r"(?:[T ](\d{2})(?::?(\d{2})(?::?(\d{2})(?:[.,](\d+))?)?)?)?"
+    r"\s*(Z|[+-]\d{2}(?::?\d{2})?)?",
+    re.IGNORECASE,
+)
+
+
+def _in_ranges(cp: int, ranges: Tuple[Tuple[int, int], ...]) -> bool:
+    for low, high in ranges:
+        if low <= cp <= high:
+            return True
+    return False
+
+
+def _emoji_end(text: str, i: int) -> int:
+    """If an emoji sequence starts at ``i``, the index just past it; otherwise ``i``."""
+    n = len(text)
+    cp = ord(text[i])
+    is_keycap_base = text[i] in "0123456789#*" and i + 1 < n and ord(text[i + 1]) in (0xFE0F, KEYCAP)
+    if not (_in_ranges(cp, EMOJI_RANGES) or is_keycap_base):
+        return i
+    j = i + 1
+    if REGIONAL_INDICATORS[0] <= cp <= REGIONAL_INDICATORS[1]:
+        # Flags are pairs of regional indicators
+        if j < n and REGIONAL_INDICATORS[0] <= ord(text[j]) <= REGIONAL_INDICATORS[1]:
+            j += 1
+        return j
+    while j < n:
+        next_cp = ord(text[j])
+        if _in_ranges(next_cp, EMOJI_MODIFIERS):
+            j += 1
+        elif next_cp == ZWJ and j + 1 < n:
+            j += 2
+        else:
+            break
+    return j
+
+
+def _text_weight(text: str) -> int:
+    total = 0
+    i = 0
+    n = len(text)
+    while i < n:
+        end = _emoji_end(text, i)
+        if end > i:
+            total += EMOJI_WEIGHT
+            i = end
+            continue
+        total += 1 if _in_ranges(ord(text[i]), LIGHT_RANGES) else 2
+        i += 1
+    return total
+
+
+def find_urls(text: str) -> List[Tuple[int, int]]:
+    """Spans of the URLs in ``text``, without trailing punctuation."""
+    spans = []
+    for match in URL_PATTERN.finditer(text):
+        start, end = match.span()
+        while end > start and text[end - 1] in TRAILING_PUNCTUATION:
+            end -= 1
+        spans.append((start, end))
+    return spans
+
+
+def weighted_length(text: str) -> int:
+    """Length of ``text`` as X counts it towards the tweet limit."""
+    text = unicodedata.normalize("NFC", text)
+    total = 0
+    position = 0
+    for start, end in find_urls(text):
+        total += _text_weight(text[position:start]) + URL_LENGTH
+        position = end
+    return total + _text_weight(text[position:])
+
+
+def _pack(pieces: List[str], joiner: str, max_length: int) -> List[str]:
+    """Greedily join ``pieces`` into chunks of at most ``max_length``."""
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        candidate = f"{current}{joiner}{piece}" if current else piece
+        if current and weighted_length(candidate) > max_length:
+            chunks.append(current)
+            current = piece
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_long(text: str, max_length: int) -> List[str]:
+    """Split one over-long tweet at paragraphs, then sentences, then words."""
+    if weighted_length(text) <= max_length:
+        return [text]
+    for pattern, joiner in ((re.compile(r"\n\s*\n"), "\n\n"), (SENTENCE_BREAK, " "), (re.compile(r"\s+"), " ")):
+        pieces = [piece.strip() for piece in pattern.split(text) if piece.strip()]
+        if len(pieces) > 1:
+            chunks: List[str] = []
+            for chunk in _pack(pieces, joiner, max_length):
+                chunks.extend(_split_long(chunk, max_length))
+            return chunks
+    # A single unbreakable word; leave it for validation to report
+    return [text]
+
+
+def split_tweets(content: str, threadify: bool = False, max_length: int = MAX_TWEET_LENGTH) -> List[str]:
+    """Split draft content into tweets.
+
+    Tweets are separated by four newlines. With ``threadify``, tweets over
+    ``max_length`` are split further at paragraph, sentence and word
+    boundaries, approximating Typefully's own threadify.
+    """
+    tweets = [tweet.strip() for tweet in content.split(TWEET_SEPARATOR)]
+    if threadify and max_length:
+        tweets = [chunk for tweet in tweets for chunk in _split_long(tweet, max_length)]
+    return tweets
+
+
+def _parse_iso8601(text: str) -> Optional[datetime]:
+    """Parse an ISO 8601 date and time without ``fromisoformat``, or None if it isn't one."""
+    match = ISO_DATETIME.fullmatch(text)
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    tz = None
+    if offset and offset.upper() == "Z":
+        tz = timezone.utc
+    elif offset:
+        digits = offset[1:].replace(":", "")
+        delta = timedelta(hours=int(digits[:2]), minutes=int(digits[2:] or 0))
+        tz = timezone(-delta if offset[0] == "-" else delta)
+    try:
+        return datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0),
+                        int((fraction or "")[:6].ljust(6, "0")), tzinfo=tz)
+    except ValueError:
+        return None
+
+
+def parse_schedule_date(value: str) -> datetime:
+    """Parse an ISO 8601 schedule date. The result is naive if ``value`` has no offset.
+
+    Raises:
+        ValueError: If ``value`` isn't an ISO 8601 date and time
+    """
+    text = value.strip()
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00").replace("z", "+00:00"))
+    except ValueError:
+        parsed = _parse_iso8601(text)
+    if parsed is None:
+        raise ValueError(f"schedule_date {value!r} is not an ISO 8601 date, e.g. 2024-01-15T10:30:00Z, or 'next-free-slot'")
+    return parsed
+
+
+class TweetCheck(BaseModel):
+    """One tweet of a previewed draft."""
+    text: str
+    length: int = Field(..., description="Weighted length as counted by X")
+
+
+class PreflightError(ValueError):
+    """A draft failed local validation."""
+
+    def __init__(self, result: "PreflightResult"):
+        super().__init__("Draft failed validation: " + "; ".join(result.errors))
+        self.result = result
+
+
+class PreflightResult(BaseModel):
+    """Outcome of validating a draft locally."""
+    tweets: List[TweetCheck]
+    max_length: int
+    schedule_date: Optional[str] = Field(None, description="The schedule date normalized to UTC, or 'next-free-slot'")
+    errors: List[str] = Field(default_factory=list)
+    warnings: List[str] = Field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def preflight(request: CreateDraftRequest, max_length: int = MAX_TWEET_LENGTH,
+              now: Optional[datetime] = None) -> PreflightResult:
+    """Validate a draft without calling the API.
+
+    Args:
+        request: The draft to check
+        max_length: Weighted characters per tweet beyond which a tweet gets a warning
+                    (0 to skip the check)
+        now: Current time, for rejecting schedule dates in the past
+
+    Returns:
+        The split tweets with their lengths, and any errors and warnings
+    """
+    errors: List[str] = []
+    warnings: List[str] = []
+    tweets = [
+        TweetCheck(text=text, length=weighted_length(text))
+        for text in split_tweets(request.content, bool(request.threadify), max_length)
+    ]
+
+    if not request.content.strip():
+        errors.append("content is empty")
+    else:
+        for i, tweet in enumerate(tweets, 1):
+            if not tweet.text:
+                errors.append(f"Tweet {i} is empty; check for more than four newlines in a row")
+            elif max_length and tweet.length > max_length:
+                # Not an error: X Premium accounts and LinkedIn accept longer posts
+                warnings.append(f"Tweet {i} is {tweet.length} characters, over the {max_length} limit "
+                                f"of standard X accounts")
+
+    schedule_date = request.schedule_date
+    if schedule_date and schedule_date != "next-free-slot":
+        try:
+            parsed = parse_schedule_date(schedule_date)
+        except ValueError:
+            warnings.append(f"schedule_date {schedule_date!r} could not be read as an ISO 8601 date here, "
+                            f"so it is left for the Typefully API to check")
+        else:
+            naive = parsed.tzinfo is None
+            if naive:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            schedule_date = parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            if naive:
+                warnings.append(f"schedule_date has no time zone and was taken as UTC ({schedule_date})")
+            if parsed < (now or datetime.now(timezone.utc)):
+                errors.append(f"schedule_date {schedule_date} is in the past")
+
+    return PreflightResult(
+        tweets=tweets, max_length=max_length, schedule_date=schedule_date, errors=errors, warnings=warnings
+    )
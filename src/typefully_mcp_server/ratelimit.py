@@ -0,0 +1,169 @@
+"""Client-side rate limiting and retry policy for Typefully API requests."""
+
+import asyncio
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Deque, Optional
+
+
+# Status codes worth retrying. 429 is always safe to retry because the API
+# rejected the request before doing any work.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """Token-bucket limiter shared by every request of a client.
+
+    Tokens refill at ``rate`` per second up to ``burst``. A ``429`` from the
+    API pauses the whole bucket, so concurrent requests back off together
+    instead of each discovering the limit on its own.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """Initialize the limiter.
+
+        Args:
+            rate: Requests per second. 0 disables rate limiting.
+            burst: Maximum number of requests sent back to back. Defaults to
+                   ``rate`` rounded up.
+        """
+        self.rate = rate
+        self.burst = max(1, burst if burst else int(rate + 0.999))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        if self.rate <= 0 and self._paused_until <= time.monotonic():
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                if self.rate <= 0:
+                    return
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is available right now, e.g. for an optional hedged request."""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return False
+        if self.rate <= 0:
+            return True
+        if self._lock.locked():
+            # Others are already waiting for tokens
+            return False
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for ``seconds``, e.g. after a 429."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class RetryBudget:
+    """Caps retries to a fraction of the request rate.
+
+    Every request deposits ``ratio`` tokens (up to ``capacity``) and every
+    retry withdraws one, so a failing API sees at most roughly
+    ``ratio`` extra requests per request instead of a retry storm.
+    """
+
+    def __init__(self, ratio: float = 0.2, capacity: float = 10.0):
+        self.ratio = ratio
+        self.capacity = capacity
+        self._balance = capacity
+
+    def record_request(self) -> None:
+        self._balance = min(self.capacity, self._balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Withdraw one retry, returning False if the budget is exhausted."""
+        if self._balance >= 1:
+            self._balance -= 1
+            return True
+        return False
+
+
+class LatencyWindow:
+    """Latencies of recent requests, for deciding when a request is slow enough to hedge."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        """Initialize the window.
+
+        Args:
+            size: Number of recent latencies kept
+            min_samples: Latencies needed before ``quantile`` answers
+        """
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """The ``q`` quantile of recent latencies, or None until there are enough of them."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RetryPolicy:
+    """Jittered exponential backoff settings."""
+
+    def __init__(self, max_attempts: int = 4, backoff_base: float = 0.5,
+                 backoff_max: float = 30.0, max_retry_after: float = 60.0):
+        """Initialize the policy.
+
+        Args:
+            max_attempts: Total attempts per request, including the first
+            backoff_base: Backoff cap in seconds for the first retry; doubles per attempt
+            backoff_max: Upper bound for any single backoff
+            max_retry_after: Give up instead of waiting if the API asks for a longer pause
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before retry number ``attempt`` (0-based), with full jitter."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
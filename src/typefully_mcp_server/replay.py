@@ -0,0 +1,251 @@
+"""Record Typefully API traffic to a cassette file and replay it offline.
+
+``RecordingTransport`` wraps the client's transport and appends every
+request and its response to a cassette, one JSON object per line. API
+keys and other credentials are redacted: sensitive headers are replaced,
+and their values are scrubbed from URLs and bodies as well.
+
+``ReplayTransport`` serves a cassette back without a network or an API
+key, so the server can be load tested through its real code path.
+Requests are matched by method, path, query, body and conditional
+headers; requests with no exact match (e.g. a new draft's content) get
+a recorded response of the same method and path. Responses to the same
+request are served in recorded order, starting over when they run out.
+Each response is delayed by its recorded latency divided by a speedup
+factor, or not at all with a speedup of 0.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, TextIO, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+REDACTED = "REDACTED"
+SENSITIVE_HEADERS = frozenset({"x-api-key", "authorization", "proxy-authorization", "cookie", "set-cookie"})
+# Request headers that change which response the API sends, so they are part of the match
+MATCH_HEADERS = ("if-none-match", "if-modified-since")
+# Cassettes store the decoded body, so these no longer describe it
+DROPPED_RESPONSE_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+# Parts of a sensitive header value shorter than this (e.g. "Bearer") are not scrubbed from bodies
+MIN_SECRET_LENGTH = 8
+
+RequestKey = Tuple[str, str, str, Optional[str], Tuple[Optional[str], ...]]
+
+
+class CassetteMiss(httpx.RequestError):
+    """A replayed request has no recorded response."""
+
+
+def _canonical_body(content: bytes) -> Optional[str]:
+    """The request body as text, with JSON keys sorted so equal bodies match."""
+    if not content:
+        return None
+    text = content.decode("utf-8", "replace")
+    try:
+        return json.dumps(json.loads(text), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return text
+
+
+def request_key(method: str, path: str, query: str, body: Optional[str],
+                headers: Dict[str, str]) -> RequestKey:
+    return method.upper(), path, query, body, tuple(headers.get(name) for name in MATCH_HEADERS)
+
+
+@dataclass
+class Interaction:
+    """One recorded request and its response."""
+    key: RequestKey
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    elapsed: float
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Interaction":
+        request = data["request"]
+        headers = {name.lower(): value for name, value in request.get("headers", {}).items()}
+        response = data["response"]
+        if "body_base64" in response:
+            body = base64.b64decode(response["body_base64"])
+        else:
+            body = response.get("body", "").encode()
+        return cls(
+            key=request_key(request["method"], request["path"], request.get("query", ""), request.get("body"), headers),
+            status=response["status"],
+            headers=[tuple(pair) for pair in response.get("headers", [])],
+            body=body,
+            elapsed=response.get("elapsed", 0.0),
+        )
+
+
+def load_cassette(path: str) -> List[Interaction]:
+    """Read every interaction in a cassette file.
+
+    A torn last line, left by a recording that was killed mid-write, is skipped.
+
+    Raises:
+        ValueError: If any other line isn't a recorded interaction
+    """
+    with open(os.path.expanduser(path), encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    interactions = []
+    for number, line in enumerate(lines, 1):
+        try:
+            interactions.append(Interaction.from_json(json.loads(line)))
+        except (ValueError, KeyError, TypeError) as e:
+            if number == len(lines) and not line.endswith("\n"):
+                logger.warning(f"Skipping the incomplete last line of cassette {path}")
+                break
+            raise ValueError(f"Cassette {path}, line {number}: not a recorded interaction ({e})")
+    return interactions
+
+
+@dataclass
+class _Scrubber:
+    """Replaces credentials seen in request headers wherever they appear."""
+    secrets: Set[str] = field(default_factory=set)
+
+    def learn(self, headers: Iterable[Tuple[str, str]]) -> None:
+        for name, value in headers:
+            if name.lower() in SENSITIVE_HEADERS and value:
+                self.secrets.add(value)
+                self.secrets.update(part for part in value.split() if len(part) >= MIN_SECRET_LENGTH)
+
+    def __call__(self, text: str) -> str:
+        # Longest first, so a whole header value is replaced before its parts
+        for secret in sorted(self.secrets, key=len, reverse=True):
+            text = text.replace(secret, REDACTED)
+        return text
+
+    def headers(self, headers: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        return [(name, REDACTED if name.lower() in SENSITIVE_HEADERS else self(value)) for name, value in headers]
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Sends requests through ``transport`` and appends each interaction to a cassette."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, path: str):
+        self.transport = transport
+        self.path = os.path.expanduser(path)
+        self.recorded = 0
+        self._file: Optional[TextIO] = None
+        self._scrub = _Scrubber()
+
+    def _write(self, entry: dict) -> None:
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        # One write per line, flushed, so concurrent recorders and crashes leave whole lines
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.recorded += 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        try:
+            # Decoded, so the cassette and the caller get the same body
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        elapsed = time.perf_counter() - started
+
+        scrub = self._scrub
+        scrub.learn(request.headers.multi_items())
+        headers = [(name, value) for name, value in response.headers.multi_items()
+                   if name.lower() not in DROPPED_RESPONSE_HEADERS]
+        try:
+            recorded_body = {"body": scrub(body.decode("utf-8"))}
+        except UnicodeDecodeError:
+            recorded_body = {"body_base64": base64.b64encode(body).decode("ascii")}
+        self._write({
+            "request": {
+                "method": request.method,
+                "path": request.url.path,
+                "query": scrub(request.url.query.decode("ascii", "replace")),
+                "headers": dict(scrub.headers(request.headers.multi_items())),
+                "body": _canonical_body(scrub(request.content.decode("utf-8", "replace")).encode()),
+            },
+            "response": {
+                "status": response.status_code,
+                "headers": scrub.headers(headers),
+                **recorded_body,
+                "elapsed": round(elapsed, 6),
+            },
+        })
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            content=body,
+            request=request,
+            extensions={k: v for k, v in response.extensions.items() if k in ("http_version", "reason_phrase")},
+        )
+
+    async def aclose(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves the responses recorded in a cassette instead of calling the API."""
+
+    def __init__(self, path: str, speedup: float = 1.0):
+        """Load the cassette at ``path``.
+
+        Args:
+            path: Cassette written by ``RecordingTransport``
+            speedup: Recorded latencies are divided by this; 0 replays without delay
+
+        Raises:
+            ValueError: If the cassette is invalid or empty
+        """
+        self.path = path
+        self.speedup = speedup
+        self.replayed = 0
+        self.misses = 0
+        interactions = load_cassette(path)
+        if not interactions:
+            raise ValueError(f"Cassette {path} has no recorded requests")
+        self._exact: Dict[RequestKey, List[Interaction]] = {}
+        self._loose: Dict[Tuple[str, str], List[Interaction]] = {}
+        for interaction in interactions:
+            self._exact.setdefault(interaction.key, []).append(interaction)
+            # Only full responses stand in for other requests; a 304 needs the validators it answered
+            if interaction.status != 304:
+                self._loose.setdefault(interaction.key[:2], []).append(interaction)
+        self._served: Counter = Counter()
+
+    def _next(self, request: httpx.Request) -> Interaction:
+        key = request_key(request.method, request.url.path, request.url.query.decode("ascii", "replace"),
+                          _canonical_body(request.content), dict(request.headers))
+        candidates = self._exact.get(key)
+        if candidates is None:
+            key = key[:2]
+            candidates = self._loose.get(key)
+        if not candidates:
+            self.misses += 1
+            raise CassetteMiss(f"No recorded response for {request.method} {request.url.path} in {self.path}",
+                               request=request)
+        served = self._served[key]
+        self._served[key] = served + 1
+        return candidates[served % len(candidates)]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        interaction = self._next(request)
+        if self.speedup > 0 and interaction.elapsed > 0:
+            await asyncio.sleep(interaction.elapsed / self.speedup)
+        self.replayed += 1
+        return httpx.Response(interaction.status, headers=interaction.headers, content=interaction.body,
+                              request=request)
@@ -0,0 +1,70 @@
+"""Tool input schemas generated from the request models in ``types.py``.
+
+The models are what the tools parse their arguments with, so generating
+the schemas from them keeps the two from drifting apart. The generated
+schemas are trimmed to what MCP clients need: no titles, and optional
+fields are plain typed properties rather than ``anyOf`` with null, as in
+hand-written schemas.
+
+Schemas are generated and their validators compiled once, at import; the
+server validates each call's arguments with the compiled validator
+instead of the SDK's per-call ``jsonschema.validate``, which rebuilds a
+validator from the schema every time.
+"""
+
+from typing import Any, Dict, Mapping, Optional, Type
+
+from jsonschema.validators import validator_for
+from pydantic import BaseModel
+from pydantic.json_schema import GenerateJsonSchema, JsonSchemaValue
+from pydantic_core import core_schema
+
+
+class ToolSchemaGenerator(GenerateJsonSchema):
+    """JSON schema generator for tool inputs."""
+
+    def nullable_schema(self, schema: core_schema.NullableSchema) -> JsonSchemaValue:
+        # Leave out null: clients omit optional arguments instead
+        return self.generate_inner(schema["schema"])
+
+    def default_schema(self, schema: core_schema.WithDefaultSchema) -> JsonSchemaValue:
+        if schema.get("default") is None:
+            return self.generate_inner(schema["schema"])
+        return super().default_schema(schema)
+
+    def field_title_should_be_set(self, schema) -> bool:
+        return False
+
+
+def input_schema(model: Type[BaseModel], defaults: Optional[Mapping[str, Any]] = None,
+                 **properties: Dict[str, Any]) -> Dict[str, Any]:
+    """The input schema of a tool whose arguments are parsed with ``model``.
+
+    Args:
+        model: The request model
+        defaults: Defaults of the model's optional fields taken from settings,
+                  added to their properties
+        **properties: Extra properties the tool accepts beside the model's fields,
+                      e.g. ``account``
+
+    Returns:
+        A JSON schema with fields by name, not alias
+    """
+    schema = model.model_json_schema(by_alias=False, schema_generator=ToolSchemaGenerator)
+    schema.pop("title", None)
+    schema.pop("description", None)
+    for name, value in (defaults or {}).items():
+        schema["properties"][name]["default"] = value
+    schema["properties"].update(properties)
+    return schema
+
+
+def compile_validator(schema: Mapping[str, Any]):
+    """A validator for ``schema``, built once and reused for every call.
+
+    Like ``jsonschema.validate``, it checks the schema itself once and
+    doesn't check formats.
+    """
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
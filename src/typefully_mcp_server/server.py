@@ -1,13 +1,15 @@
 """MCP server for Typefully API integration."""
 
+import argparse
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from contextlib import asynccontextmanager, contextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 
 from mcp.server import Server
-from mcp.server.models import InitializationOptions
-from mcp.server.lowlevel import NotificationOptions
 from mcp.types import (
     Tool,
     TextContent,
@@ -17,198 +19,1189 @@ from mcp.types import (
 )
 from pydantic import AnyUrl
 
-from .client import TypefullyClient
-from .types import CreateDraftRequest, Draft
+from . import __version__
+from .archive import DraftArchive, DraftVersion
+from .analytics import DIMENSIONS, TIME_DIMENSIONS, DraftStats, draft_stats
+from .accounts import ALL_ACCOUNTS, AccountRegistry, merge_drafts
+from .client import ClientPool, SharedClient
+from .config import Settings
+from .deadline import DeadlineExceeded, deadline, within_deadline
+from .formatting import format_draft_list, format_preview
+from .metrics import metrics
+from .outbox import OUTBOX_STATUSES, SENT, Outbox, OutboxEntry, OutboxWorker
+from .planner import WEEKDAYS, Cadence, PlannedDraft, format_utc, plan_schedule, to_utc
+from .preflight import PreflightError, preflight
+from .schemas import compile_validator, input_schema
+from .similarity import DuplicateDraftError, DuplicateMatch, NearDuplicateIndex
+from .store import DraftStore
+from .sync import PUBLISHED, SCHEDULED, DraftSync
+from .templates import Templates
+from .types import BatchItemResult, CreateDraftRequest, Draft, GetDraftsRequest
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+settings = Settings.from_env()
+metrics.configure(
+    enabled=settings.metrics or bool(settings.metrics_textfile) or settings.metrics_otel,
+    otel=settings.metrics_otel,
+)
+
+# One pooled API client for the whole process, opened on the first tool call
+shared_client = SharedClient(settings)
+
+# Named accounts from TYPEFULLY_ACCOUNTS_FILE, each with its own pool and rate limit
+accounts = AccountRegistry.from_settings(settings, shared_client)
+
+# HTTP sessions may send their own key in this header instead of using the server's
+API_KEY_HEADER = "X-Typefully-Api-Key"
+session_clients = ClientPool(settings)
+
+# Local mirror of every draft the client sees, for search without API calls
+draft_store = DraftStore(settings.store_path or settings.data_path("drafts.sqlite3"))
+
+# Append-only history of every version of those drafts, beyond the API's recent window (TYPEFULLY_ARCHIVE)
+draft_archive = DraftArchive(settings.archive_path or settings.data_path("drafts.archive"))
+
+# Near-duplicate index over the same drafts, seeded from the store in the background
+draft_index = NearDuplicateIndex()
+_draft_index_seeded = False
+
+
+def seed_draft_index() -> None:
+    """Index the drafts stored by earlier runs. Runs in a worker thread."""
+    try:
+        started = time.perf_counter()
+        indexed = draft_index.add(draft_store.all())
+        logger.info(f"Indexed {indexed} stored draft(s) for duplicate detection in {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        logger.warning(f"Failed to index stored drafts for duplicate detection: {e}")
+
+
+def find_duplicates(request: CreateDraftRequest, account: str) -> List[DuplicateMatch]:
+    """Drafts of ``account`` that a new draft nearly duplicates, unless the check is off."""
+    if settings.duplicate_check == "off":
+        return []
+    with metrics.phase("duplicate_check"):
+        return draft_index.check(request.content, settings.duplicate_threshold, account)
+
+
+def refuse_duplicates(request: CreateDraftRequest, account: str) -> None:
+    """Client validator for TYPEFULLY_DUPLICATE_CHECK=block."""
+    matches = find_duplicates(request, account)
+    if matches:
+        metrics.count("duplicates_refused")
+        raise DuplicateDraftError(matches)
+
+
+def duplicate_warnings(request: CreateDraftRequest, account: str) -> str:
+    """Warning lines for TYPEFULLY_DUPLICATE_CHECK=warn."""
+    if settings.duplicate_check != "warn":
+        return ""
+    return "".join(f"⚠️ Possible duplicate: {match.describe()}\n" for match in find_duplicates(request, account))
+
+
+for account_name, account_client in accounts.clients.items():
+    account_client.observers.append(partial(draft_store.upsert, account=account_name))
+    account_client.observers.append(partial(draft_index.add, account=account_name))
+    if settings.archive:
+        account_client.observers.append(partial(draft_archive.append, account=account_name))
+    if settings.duplicate_check == "block":
+        account_client.validators.append(partial(refuse_duplicates, account=account_name))
+
+# Optional background poller for the default account; read tools are served from its snapshots while fresh
+draft_sync = DraftSync(accounts.default_client, settings.sync_interval, settings.sync_max_staleness,
+                       on_removed=partial(draft_store.mark_removed, account=accounts.default_account))
+
+
+def on_outbox_sent(entry: OutboxEntry, draft: Draft) -> None:
+    if entry.account == accounts.default_account:
+        draft_sync.invalidate(SCHEDULED)
+
+
+# Optional durable queue for create_draft, drained in the background (TYPEFULLY_OUTBOX)
+outbox = Outbox(settings.outbox_path or settings.data_path("outbox.sqlite3"))
+outbox_worker = OutboxWorker(outbox, accounts.get, settings, on_sent=on_outbox_sent)
+
+
+class InflightCalls:
+    """Tool calls currently running, so a shutdown can let them finish."""
+    
+    def __init__(self):
+        self.count = 0
+        self.draining = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+    
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        self.count += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self.count -= 1
+            if not self.count:
+                self._idle.set()
+    
+    async def drain(self, timeout: float) -> bool:
+        """Refuse new calls and wait up to ``timeout`` seconds for running ones.
+        
+        Returns:
+            True if every call finished in time
+        """
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+inflight = InflightCalls()
+
+# Sessions inside server_lifespan; over HTTP many run at once and share one set of resources
+_lifespan_sessions = 0
+_exporter: Optional[asyncio.Task] = None
+
+
+@asynccontextmanager
+async def server_lifespan(server: Server) -> AsyncIterator[Dict[str, Any]]:
+    """Start the background sync with the first session, and close the shared
+    API clients and the local draft index when the last one ends."""
+    global _lifespan_sessions, _exporter, _draft_index_seeded
+    _lifespan_sessions += 1
+    if _lifespan_sessions == 1:
+        draft_sync.start()
+        if settings.duplicate_check != "off" and not _draft_index_seeded:
+            _draft_index_seeded = True
+            asyncio.get_running_loop().run_in_executor(None, seed_draft_index)
+        if settings.outbox:
+            outbox_worker.start()
+        if settings.metrics_textfile:
+            _exporter = asyncio.create_task(
+                metrics.export_periodically(settings.metrics_textfile, settings.metrics_export_interval, stats_gauges)
+            )
+    try:
+        yield {}
+    finally:
+        _lifespan_sessions -= 1
+        if not _lifespan_sessions:
+            if _exporter is not None:
+                exporter, _exporter = _exporter, None
+                exporter.cancel()
+                await asyncio.gather(exporter, return_exceptions=True)
+            await asyncio.gather(draft_sync.stop(), outbox_worker.stop())
+            await asyncio.gather(accounts.aclose(), session_clients.aclose())
+            draft_store.close()
+            draft_archive.close()
+            outbox.close()
+
+
 # Create the MCP server instance
-app = Server("typefully-mcp-server")
+app = Server("typefully-mcp-server", version=__version__, lifespan=server_lifespan)
 
 
-@app.list_tools()
-async def list_tools() -> List[Tool]:
-    """List available tools for Typefully integration."""
-    return [
-        Tool(
-            name="create_draft",
-            description="Create a new draft in Typefully with optional scheduling",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "content": {
-                        "type": "string",
-                        "description": "The content of the draft. Use 4 consecutive newlines to split into multiple tweets."
-                    },
-                    "threadify": {
-                        "type": "boolean",
-                        "description": "Automatically split content into multiple tweets",
-                        "default": False
-                    },
-                    "share": {
-                        "type": "boolean",
-                        "description": "If true, returned payload will include a share_url",
-                        "default": False
-                    },
-                    "schedule_date": {
-                        "type": "string",
-                        "description": "ISO formatted date (e.g.:2022-06-13T11:13:31.662Z) or 'next-free-slot'",
-                        "oneOf": [
-                            {"type": "string", "format": "date-time"},
-                            {"type": "string", "enum": ["next-free-slot"]}
-                        ]
-                    },
-                    "auto_retweet_enabled": {
-                        "type": "boolean",
-                        "description": "Enable AutoRT for this post",
-                        "default": False
-                    },
-                    "auto_plug_enabled": {
-                        "type": "boolean",
-                        "description": "Enable AutoPlug for this post",
-                        "default": False
-                    }
-                },
-                "required": ["content"]
+# Generated from the request model the tools parse their arguments with
+CREATE_DRAFT_SCHEMA = input_schema(CreateDraftRequest)
+
+
+ACCOUNT_PROPERTY = {
+    "type": "string",
+    "description": f"Account to use: {', '.join(accounts.names)} (default {accounts.default_account})"
+}
+
+# Accepted by every tool
+TIMEOUT_PROPERTY = {
+    "type": "number",
+    "description": f"Seconds this call may take end to end, including retries (default {settings.tool_timeout:g}, 0 for no limit)",
+    "minimum": 0
+}
+
+
+LIST_DRAFTS_SCHEMA = input_schema(
+    GetDraftsRequest,
+    defaults={"limit": settings.list_page_size, "format": "full", "max_chars": settings.output_max_chars},
+    account={
+        "type": "string",
+        "description": f"Account to read: {', '.join(accounts.names)} (default {accounts.default_account}), "
+                       f"or '{ALL_ACCOUNTS}' to read every account concurrently and merge the results"
+    },
+)
+
+
+# Built once at import; list_tools is called often and the tools never change
+TOOLS: Tuple[Tool, ...] = (
+    Tool(
+        name="create_draft",
+        description="Create a new draft in Typefully with optional scheduling",
+        inputSchema=input_schema(CreateDraftRequest, account=ACCOUNT_PROPERTY)
+    ),
+    Tool(
+        name="create_drafts",
+        description="Create many drafts in Typefully in one call. Failed drafts are reported individually without aborting the batch.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "drafts": {
+                    "type": "array",
+                    "description": "The drafts to create, each with the same fields as create_draft",
+                    "items": CREATE_DRAFT_SCHEMA,
+                    "minItems": 1
+                },
+                "max_concurrency": {
+                    "type": "integer",
+                    "description": "Maximum number of drafts submitted at once",
+                    "minimum": 1
+                },
+                "account": ACCOUNT_PROPERTY
+            },
+            "required": ["drafts"]
+        }
+    ),
+    Tool(
+        name="preview_draft",
+        description="Split a draft into tweets, count characters the way X does and check its schedule date, without calling the Typefully API. create_draft runs the same checks.",
+        inputSchema=CREATE_DRAFT_SCHEMA
+    ),
+    Tool(
+        name="plan_schedule",
+        description="Assign explicit schedule dates to a batch of drafts, spread over a posting cadence and around the posts already scheduled. Previews the plan unless create is true.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "drafts": {
+                    "type": "array",
+                    "description": "The drafts to plan, each with the same fields as create_draft. Drafts with an ISO schedule_date keep it.",
+                    "items": CREATE_DRAFT_SCHEMA,
+                    "minItems": 1
+                },
+                "count": {
+                    "type": "integer",
+                    "description": "Instead of drafts, list this many upcoming free slots",
+                    "minimum": 1,
+                    "maximum": 500
+                },
+                "timezone": {
+                    "type": "string",
+                    "description": f"IANA time zone of the posting times (default {settings.schedule_timezone})"
+                },
+                "times": {
+                    "type": "array",
+                    "description": f"Local posting times as HH:MM (default {settings.schedule_times})",
+                    "items": {"type": "string"}
+                },
+                "days": {
+                    "type": "array",
+                    "description": f"Weekdays to post on (default {settings.schedule_days})",
+                    "items": {"type": "string", "enum": list(WEEKDAYS)}
+                },
+                "min_gap_minutes": {
+                    "type": "number",
+                    "description": f"Minimum minutes between posts (default {settings.schedule_min_gap_minutes:g})",
+                    "minimum": 0
+                },
+                "start": {
+                    "type": "string",
+                    "description": "Earliest ISO date to schedule at (default now)"
+                },
+                "create": {
+                    "type": "boolean",
+                    "description": "Create the drafts with the planned dates instead of only previewing them",
+                    "default": False
+                },
+                "account": ACCOUNT_PROPERTY
             }
-        ),
-        Tool(
-            name="get_scheduled_drafts",
-            description="Get recently scheduled drafts from Typefully with full thread viewing links",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "content_filter": {
-                        "type": "string",
-                        "description": "Filter drafts to only include tweets or threads",
-                        "enum": ["threads", "tweets"]
-                    }
+        }
+    ),
+    Tool(
+        name="get_scheduled_drafts",
+        description="Get recently scheduled drafts from Typefully with full thread viewing links",
+        inputSchema=LIST_DRAFTS_SCHEMA
+    ),
+    Tool(
+        name="get_published_drafts",
+        description="Get recently published drafts from Typefully",
+        inputSchema=LIST_DRAFTS_SCHEMA
+    ),
+    Tool(
+        name="search_drafts",
+        description="Search drafts already seen by this server (scheduled, published or created) by text and date, without calling the Typefully API",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Words that must all appear in the draft"
+                },
+                "status": {
+                    "type": "string",
+                    "description": "Only include drafts with this status. Drafts unscheduled or deleted in Typefully are only found with \"removed\".",
+                    "enum": ["scheduled", "published", "draft", "removed"]
+                },
+                "since": {
+                    "type": "string",
+                    "description": "Only drafts scheduled/published at or after this ISO date"
+                },
+                "until": {
+                    "type": "string",
+                    "description": "Only drafts scheduled/published before this ISO date"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of results",
+                    "default": 20,
+                    "minimum": 1,
+                    "maximum": 200
+                },
+                "account": {
+                    "type": "string",
+                    "description": f"Account to search: {', '.join(accounts.names)} (default {accounts.default_account}), or '{ALL_ACCOUNTS}' for all"
                 }
             }
-        ),
-        Tool(
-            name="get_published_drafts",
-            description="Get recently published drafts from Typefully",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "content_filter": {
-                        "type": "string",
-                        "description": "Filter drafts to only include tweets or threads",
-                        "enum": ["threads", "tweets"]
-                    }
+        }
+    ),
+    Tool(
+        name="get_draft_history",
+        description="Look up drafts in the local archive of every draft this server has seen, including ones too old for the Typefully API's recent lists, or show every archived version of one draft",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "id": {
+                    "type": "integer",
+                    "description": "Show every archived version of this draft, oldest first"
+                },
+                "query": {
+                    "type": "string",
+                    "description": "Words that must all appear in the draft"
+                },
+                "status": {
+                    "type": "string",
+                    "description": "Only include drafts with this status",
+                    "enum": ["scheduled", "published", "draft"]
+                },
+                "since": {
+                    "type": "string",
+                    "description": "Only drafts scheduled/published at or after this ISO date"
+                },
+                "until": {
+                    "type": "string",
+                    "description": "Only drafts scheduled/published before this ISO date"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of results",
+                    "default": 20,
+                    "minimum": 1,
+                    "maximum": 200
+                },
+                "account": {
+                    "type": "string",
+                    "description": f"Account to search: {', '.join(accounts.names)} (default {accounts.default_account}), or '{ALL_ACCOUNTS}' for all"
                 }
             }
+        }
+    ),
+    Tool(
+        name="draft_stats",
+        description="Count drafts and tweets by kind (thread or tweet), length, platform, hour, weekday, day, week or month, computed from the local draft index without calling the Typefully API",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "group_by": {
+                    "type": "array",
+                    "description": "Up to three groupings, e.g. [\"week\", \"kind\"] for threads vs single tweets per week. Time groupings use the published date, or the scheduled date for scheduled drafts.",
+                    "items": {"type": "string", "enum": list(DIMENSIONS)},
+                    "default": ["kind"],
+                    "maxItems": 3
+                },
+                "status": {
+                    "type": "string",
+                    "description": "Which drafts to count (default published). \"all\" leaves out removed drafts.",
+                    "enum": ["published", "scheduled", "draft", "removed", "all"]
+                },
+                "since": {
+                    "type": "string",
+                    "description": "Only drafts scheduled/published at or after this ISO date"
+                },
+                "until": {
+                    "type": "string",
+                    "description": "Only drafts scheduled/published before this ISO date"
+                },
+                "timezone": {
+                    "type": "string",
+                    "description": f"IANA time zone for the time groupings (default {settings.schedule_timezone})"
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Read the scheduled and published lists from Typefully first, so recent drafts are counted",
+                    "default": False
+                },
+                "account": {
+                    "type": "string",
+                    "description": f"Account to count: {', '.join(accounts.names)} (default {accounts.default_account}), or '{ALL_ACCOUNTS}' for all"
+                }
+            }
+        }
+    ),
+    Tool(
+        name="outbox_status",
+        description="Show drafts queued in the local outbox and whether they have been sent to Typefully",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "id": {
+                    "type": "integer",
+                    "description": "Show only this outbox entry"
+                },
+                "status": {
+                    "type": "string",
+                    "description": "Only include entries with this status",
+                    "enum": list(OUTBOX_STATUSES)
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of entries",
+                    "default": 20,
+                    "minimum": 1,
+                    "maximum": 200
+                }
+            }
+        }
+    ),
+    Tool(
+        name="get_server_stats",
+        description="Show this server's cache, retry and sync counters, and per-phase timings of recent tool calls when metrics are enabled",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    )
+)
+for _tool in TOOLS:
+    # Copied, since some tools share a schema that also describes the items of create_drafts
+    _tool.inputSchema = {**_tool.inputSchema, "properties": {**_tool.inputSchema["properties"], "timeout": TIMEOUT_PROPERTY}}
+
+# Compiled once; the SDK's own validation rebuilds a validator from the schema on every call
+TOOL_VALIDATORS = {tool.name: compile_validator(tool.inputSchema) for tool in TOOLS}
+
+# Templates for the drafts in list responses, with any overrides from TYPEFULLY_TEMPLATES_FILE
+templates = Templates.from_settings(settings)
+
+
+@app.list_tools()
+async def list_tools() -> List[Tool]:
+    """List available tools for Typefully integration."""
+    return list(TOOLS)
+
+
+def validate_arguments(name: str, arguments: Dict[str, Any]) -> Optional[str]:
+    """Check a tool call's arguments against the tool's input schema.
+
+    Returns:
+        What is wrong with the arguments, or None if they are valid
+    """
+    validator = TOOL_VALIDATORS.get(name)
+    if validator is None:
+        return None
+    error = next(validator.iter_errors(arguments), None)
+    return None if error is None else error.message
+
+
+def session_api_key() -> Optional[str]:
+    """The API key the HTTP client sent with the current request, if any."""
+    try:
+        request = app.request_context.request
+    except LookupError:
+        return None
+    headers = getattr(request, "headers", None)
+    return headers.get(API_KEY_HEADER) if headers is not None else None
+
+
+async def get_client(api_key: Optional[str] = None, account: Optional[str] = None):
+    """The pooled client for a session's ``api_key``, or for a configured account."""
+    if api_key:
+        if account:
+            raise ValueError("'account' can't be combined with a session API key")
+        return await session_clients.get(api_key)
+    return await accounts.get(account)
+
+
+def uses_default_account(api_key: Optional[str], account: Optional[str]) -> bool:
+    """Whether a call is for the account covered by the background sync."""
+    return not api_key and accounts.resolve(account) == accounts.default_account
+
+
+async def fetch_drafts(kind: str, content_filter: Optional[str] = None,
+                       api_key: Optional[str] = None, account: Optional[str] = None) -> List[Draft]:
+    """Get a draft list from the sync snapshot if it is fresh, otherwise from the API.
+    
+    Snapshots only cover the default account, so other accounts and sessions
+    with their own API key always go to the API.
+    """
+    synced = uses_default_account(api_key, account)
+    if synced:
+        drafts = draft_sync.lookup(kind, content_filter)
+        if drafts is not None:
+            return drafts
+    
+    client = await get_client(api_key, account)
+    requested_at = time.monotonic()
+    if kind == SCHEDULED:
+        drafts = await client.get_scheduled_drafts(content_filter)
+    else:
+        drafts = await client.get_published_drafts(content_filter)
+    if content_filter is None and synced:
+        # A full listing: also diffed with background sync off, to notice removed drafts.
+        # Ignored if a newer request has already updated the snapshot.
+        draft_sync.update(kind, drafts, requested_at)
+    return drafts
+
+
+ProgressReporter = Callable[[float, Optional[float], str], Awaitable[None]]
+
+
+def progress_reporter() -> Optional[ProgressReporter]:
+    """A function sending MCP progress notifications for the current tool call.
+    
+    Returns None unless the client asked for progress by sending a
+    ``progressToken`` with the request.
+    """
+    try:
+        ctx = app.request_context
+    except LookupError:
+        return None
+    token = ctx.meta.progressToken if ctx.meta else None
+    if token is None:
+        return None
+    
+    async def report(progress: float, total: Optional[float], message: str) -> None:
+        try:
+            await ctx.session.send_progress_notification(
+                token, progress, total=total, message=message, related_request_id=ctx.request_id
+            )
+        except Exception as e:
+            logger.warning(f"Failed to send progress notification: {e}")
+    
+    return report
+
+
+async def fetch_all_accounts(kind: str, content_filter: Optional[str] = None,
+                             report: Optional[ProgressReporter] = None) -> tuple:
+    """Read a draft list from every account concurrently.
+    
+    Args:
+        kind: SCHEDULED or PUBLISHED
+        content_filter: Optional filter for "threads" or "tweets"
+        report: Sent each account's drafts (or error) as soon as they arrive
+    
+    Returns:
+        The merged drafts, labelled with their account, and the errors of
+        accounts that couldn't be read, keyed by account name
+    """
+    done = 0
+    
+    async def on_done(name: str, drafts: Optional[List[Draft]], error: Optional[Exception]) -> None:
+        nonlocal done
+        done += 1
+        if error is not None:
+            message = f"❌ {name}: {describe_error(error).splitlines()[0]}"
+        else:
+            message = f"{name}: {len(drafts)} {kind} draft(s)"
+            if drafts:
+                message += "\n" + format_preview(drafts, templates=templates)
+        await report(done, len(accounts.names), message)
+    
+    results, errors = await accounts.gather(
+        lambda name: fetch_drafts(kind, content_filter, account=name), on_done if report is not None else None
+    )
+    for name, error in errors.items():
+        logger.warning(f"Failed to read {kind} drafts of account '{name}': {error}")
+    return merge_drafts(results, kind), errors
+
+
+def stats_gauges() -> Dict[str, float]:
+    """Point-in-time values reported alongside the metrics counters."""
+    gauges: Dict[str, float] = {
+        "sync_polls": draft_sync.polls,
+        "sync_errors": draft_sync.errors,
+        "sync_stale_lists": draft_sync.stale,
+        "inflight_calls": inflight.count,
+        "session_clients": len(session_clients),
+        "session_clients_evicted": session_clients.evicted,
+        "accounts": len(accounts.names),
+    }
+    if settings.outbox:
+        for status, count in outbox.counts().items():
+            gauges[f"outbox_{status}"] = count
+    client = accounts.default_client.current
+    if client is not None:
+        gauges["client_retries"] = client.retries
+        gauges["client_coalesced"] = client.coalesced
+        gauges["client_hedges"] = client.hedges
+        for name, value in client.cache.stats.as_dict().items():
+            gauges[f"cache_{name}"] = value
+        gauges["cache_entries"] = len(client.cache)
+    return gauges
+
+
+def format_server_stats() -> str:
+    """Render the get_server_stats report."""
+    lines = ["📊 **Server stats**", ""]
+    for name, shared in accounts.clients.items():
+        label = f"API client ({name})" if len(accounts.clients) > 1 else "API client"
+        client = shared.current
+        if client is None:
+            lines.append(f"{label}: not opened yet")
+            continue
+        cache = client.cache.stats
+        hedges = f", {client.hedges} hedged reads" if settings.hedge_reads else ""
+        lines.append(f"{label}: open, {client.retries} retries, {client.coalesced} coalesced reads{hedges}")
+        lines.append(
+            f"Response cache: {len(client.cache)} entries, {cache.hits} hits, {cache.misses} misses, "
+            f"{cache.revalidations} revalidations, {cache.evictions} evictions"
         )
-    ]
+    if draft_sync.enabled:
+        ages = ", ".join(f"{kind} {snapshot.age:.0f}s old" for kind, snapshot in draft_sync.snapshots.items())
+        lines.append(f"Background sync: every {draft_sync.interval:g}s, {draft_sync.polls} polls, "
+                     f"{draft_sync.errors} errors{', ' + ages if ages else ''}")
+    else:
+        lines.append("Background sync: disabled")
+    lines.append(f"Tool calls running: {inflight.count}; clients for session API keys: {len(session_clients)} "
+                 f"open, {session_clients.evicted} closed")
+    if settings.archive:
+        lines.append(f"Draft archive: {len(draft_archive)} drafts, {draft_archive.versions} versions, "
+                     f"{draft_archive.size / 1024:.0f} KiB")
+    if settings.outbox:
+        counts = outbox.counts()
+        lines.append(f"Outbox: {', '.join(f'{count} {name}' for name, count in counts.items())}; "
+                     f"this process sent {outbox_worker.sent}, retried {outbox_worker.retried}, failed {outbox_worker.failed}")
+    lines.append("")
+    if metrics.enabled:
+        lines.append("```")
+        lines.append(metrics.summary())
+        lines.append("```")
+    else:
+        lines.append("Per-phase timings are disabled. Set TYPEFULLY_METRICS=1 to record them.")
+    return "\n".join(lines)
 
 
-@app.call_tool()
+@app.call_tool(validate_input=False)
 async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     """Handle tool calls for Typefully operations."""
+    if inflight.draining:
+        return [TextContent(type="text", text="❌ Error: The server is shutting down; try again shortly")]
+    problem = validate_arguments(name, arguments)
+    if problem is not None:
+        return [TextContent(type="text", text=f"❌ Error: Input validation error: {problem}")]
+    timeout = arguments.get("timeout")
+    # Keeps a session API key's client from being closed while the call uses it
+    api_key = session_api_key()
+    with inflight.track(), session_clients.hold(api_key), deadline(settings.tool_timeout if timeout is None else timeout):
+        started = time.perf_counter()
+        try:
+            # Backstop for waits the client doesn't bound itself; cancels the call when time is up
+            result = await within_deadline(dispatch_tool(name, arguments))
+        except DeadlineExceeded as e:
+            result = [TextContent(type="text", text=f"❌ Error: {e}")]
+        except asyncio.CancelledError:
+            # E.g. the MCP client sent notifications/cancelled; in-flight API requests are cancelled with us
+            logger.info(f"Tool call {name} was cancelled after {time.perf_counter() - started:.2f}s")
+            metrics.count("tool_calls", tool=name, outcome="cancelled")
+            raise
+        if not metrics.enabled:
+            return result
+        metrics.observe(f"tool:{name}", time.perf_counter() - started)
+        metrics.count("tool_calls", tool=name, outcome="error" if result[0].text.startswith("❌") else "ok")
+        return result
+
+
+async def dispatch_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Run one tool and format its response."""
     try:
-        async with TypefullyClient() as client:
-            if name == "create_draft":
-                # Create the draft request
-                request = CreateDraftRequest(**arguments)
-                draft = await client.create_draft(request)
-                
-                # Format the response
-                result = f"✅ Draft created successfully!\n\n"
-                result += f"**Draft ID:** {draft.id}\n"
-                result += f"**First tweet:** {draft.text_first_tweet[:100]}...\n" if len(draft.text_first_tweet) > 100 else f"**First tweet:** {draft.text_first_tweet}\n"
-                result += f"**Number of tweets:** {draft.num_tweets}\n"
-                
-                if draft.scheduled_date:
-                    result += f"**Scheduled for:** {draft.scheduled_date}\n"
-                
-                if draft.share_url:
-                    result += f"**Share URL:** {draft.share_url}\n"
-                
-                result += f"\n**View draft:** https://typefully.com/?d={draft.id}"
-                
-                return [TextContent(type="text", text=result)]
+        if name == "get_server_stats":
+            return [TextContent(type="text", text=format_server_stats())]
+        
+        api_key = session_api_key()
+        account = arguments.get("account")
+        
+        if name == "search_drafts":
+            if api_key:
+                raise ValueError("search_drafts only covers the server's configured accounts and is not available with a session API key")
+            drafts = draft_store.search(
+                query=arguments.get("query"),
+                status=arguments.get("status"),
+                since=arguments.get("since"),
+                until=arguments.get("until"),
+                limit=arguments.get("limit", 20),
+                account=None if account == ALL_ACCOUNTS else accounts.resolve(account),
+            )
+            if not drafts:
+                if not len(draft_store):
+                    return [TextContent(type="text", text="The local draft index is empty. Call get_scheduled_drafts or get_published_drafts first to populate it.")]
+                return [TextContent(type="text", text="No matching drafts found in the local index.")]
             
-            elif name == "get_scheduled_drafts":
-                content_filter = arguments.get("content_filter")
-                drafts = await client.get_scheduled_drafts(content_filter)
-                
-                if not drafts:
-                    return [TextContent(type="text", text="No scheduled drafts found.")]
-                
-                result = f"📅 Found {len(drafts)} scheduled draft(s):\n\n"
-                
-                for i, draft in enumerate(drafts, 1):
-                    result += f"**{i}. Draft ID {draft.id}**\n"
-                    result += f"   First tweet: {draft.text_first_tweet}\n"
-                    result += f"   Total tweets: {draft.num_tweets}\n"
-                    if draft.scheduled_date:
-                        result += f"   Scheduled: {draft.scheduled_date}\n"
-                    
-                    # Enhanced viewing options
-                    if draft.num_tweets > 1:
-                        result += f"   🧵 **View full thread:** https://typefully.com/?d={draft.id}\n"
-                    else:
-                        result += f"   📝 **View tweet:** https://typefully.com/?d={draft.id}\n"
-                    result += "\n"
-                
-                # Add helpful note for threads
-                thread_count = sum(1 for draft in drafts if draft.num_tweets > 1)
-                if thread_count > 0:
-                    result += f"\n💡 **Note:** Found {thread_count} thread(s). Click the links above to view the full content on Typefully."
-                
-                return [TextContent(type="text", text=result)]
+            lines = [f"🔎 Found {len(drafts)} matching draft(s) in the local index:", ""]
+            for i, draft in enumerate(drafts, 1):
+                first_tweet = draft.text_first_tweet[:80] + "..." if len(draft.text_first_tweet) > 80 else draft.text_first_tweet
+                lines.append(f"**{i}. Draft ID {draft.id}**")
+                if account == ALL_ACCOUNTS:
+                    lines.append(f"   Account: {draft.account}")
+                lines.append(f"   First tweet: {first_tweet}")
+                if draft.published_on:
+                    lines.append(f"   Published: {draft.published_on}")
+                elif draft.scheduled_date:
+                    lines.append(f"   Scheduled: {draft.scheduled_date}")
+                lines.append(f"   View: https://typefully.com/?d={draft.id}")
+            return [TextContent(type="text", text="\n".join(lines))]
+        
+        if name == "get_draft_history":
+            if api_key:
+                raise ValueError("get_draft_history only covers the server's configured accounts and is not available with a session API key")
+            if not settings.archive:
+                raise ValueError("The draft archive is disabled. Set TYPEFULLY_ARCHIVE=true to keep drafts beyond the API's recent lists.")
+            with metrics.phase("archive"):
+                if arguments.get("id") is not None:
+                    result = format_draft_history(draft_archive.history(arguments["id"]), arguments["id"])
+                else:
+                    versions = draft_archive.query(
+                        text=arguments.get("query"),
+                        status=arguments.get("status"),
+                        since=arguments.get("since"),
+                        until=arguments.get("until"),
+                        account=None if account == ALL_ACCOUNTS else accounts.resolve(account),
+                        limit=arguments.get("limit", 20),
+                    )
+                    result = format_archived_drafts(versions, show_account=account == ALL_ACCOUNTS)
+            return [TextContent(type="text", text=result)]
+        
+        if name in ("get_scheduled_drafts", "get_published_drafts"):
+            kind = SCHEDULED if name == "get_scheduled_drafts" else PUBLISHED
+            request = GetDraftsRequest(**arguments)
+            errors: Dict[str, Exception] = {}
+            if account == ALL_ACCOUNTS and not api_key:
+                drafts, errors = await fetch_all_accounts(kind, request.content_filter, progress_reporter())
+                if errors and len(errors) == len(accounts.names):
+                    raise next(iter(errors.values()))
+            else:
+                drafts = await fetch_drafts(kind, request.content_filter, api_key, account)
+            warnings = "".join(
+                f"⚠️ Could not read account '{name}': {describe_error(e).splitlines()[0]}\n" for name, e in errors.items()
+            )
             
-            elif name == "get_published_drafts":
-                content_filter = arguments.get("content_filter")
-                drafts = await client.get_published_drafts(content_filter)
-                
-                if not drafts:
-                    return [TextContent(type="text", text="No published drafts found.")]
-                
-                result = f"✅ Found {len(drafts)} published draft(s):\n\n"
-                
-                for i, draft in enumerate(drafts, 1):
-                    result += f"**{i}. Draft ID {draft.id}**\n"
-                    result += f"   First tweet: {draft.text_first_tweet[:80]}...\n" if len(draft.text_first_tweet) > 80 else f"   First tweet: {draft.text_first_tweet}\n"
-                    result += f"   Tweets: {draft.num_tweets}\n"
-                    if draft.published_on:
-                        result += f"   Published: {draft.published_on}\n"
-                    if draft.twitter_url:
-                        result += f"   Twitter: {draft.twitter_url}\n"
-                    if draft.linkedin_url:
-                        result += f"   LinkedIn: {draft.linkedin_url}\n"
-                    result += "\n"
-                
-                return [TextContent(type="text", text=result)]
+            if not drafts:
+                return [TextContent(type="text", text=f"{warnings}No {kind} drafts found.")]
+            
+            with metrics.phase("format"):
+                result = format_draft_list(
+                    drafts,
+                    kind,
+                    cursor=request.cursor,
+                    limit=settings.list_page_size if request.limit is None else request.limit,
+                    output_format=request.format or "full",
+                    max_chars=settings.output_max_chars if request.max_chars is None else request.max_chars,
+                    templates=templates,
+                )
+            return [TextContent(type="text", text=warnings + result)]
+        
+        if name == "draft_stats":
+            if api_key:
+                raise ValueError("draft_stats only covers the server's configured accounts and is not available with a session API key")
+            if arguments.get("refresh"):
+                names = accounts.names if account == ALL_ACCOUNTS else [accounts.resolve(account)]
+                for kind in (SCHEDULED, PUBLISHED):
+                    await asyncio.gather(*(fetch_drafts(kind, account=name) for name in names))
+            status = arguments.get("status", "published")
+            timezone_name = arguments.get("timezone") or settings.schedule_timezone
+            with metrics.phase("aggregate"):
+                stats = draft_stats(
+                    draft_store,
+                    arguments.get("group_by") or ["kind"],
+                    tz=timezone_name,
+                    status=None if status == "all" else status,
+                    since=arguments.get("since"),
+                    until=arguments.get("until"),
+                    account=None if account == ALL_ACCOUNTS else accounts.resolve(account),
+                )
+            return [TextContent(type="text", text=format_draft_stats(stats, status, timezone_name))]
+        
+        if name == "outbox_status":
+            if api_key:
+                raise ValueError("outbox_status only covers the server's configured accounts and is not available with a session API key")
+            return [TextContent(type="text", text=format_outbox_status(
+                arguments.get("id"), arguments.get("status"), arguments.get("limit", 20)
+            ))]
+        
+        if name == "create_draft" and settings.outbox and not api_key:
+            if account == ALL_ACCOUNTS:
+                raise ValueError(f"account '{ALL_ACCOUNTS}' is only supported by the read tools")
+            return [TextContent(type="text", text=queue_draft(CreateDraftRequest(**arguments), accounts.resolve(account)))]
+        
+        if name == "preview_draft":
+            return [TextContent(type="text", text=format_preview_draft(CreateDraftRequest(**arguments)))]
+        
+        if account == ALL_ACCOUNTS:
+            raise ValueError(f"account '{ALL_ACCOUNTS}' is only supported by the read tools")
+        if name == "plan_schedule":
+            return [TextContent(type="text", text=await plan_drafts(arguments, api_key, account))]
+        
+        client = await get_client(api_key, account)
+
+        if name == "create_draft":
+            # Create the draft request
+            request = CreateDraftRequest(**arguments)
+            # Checked before creating, as the new draft joins the index once created
+            warnings = "" if api_key else duplicate_warnings(request, accounts.resolve(account))
+            draft = await client.create_draft(request)
+            if uses_default_account(api_key, account):
+                draft_sync.invalidate(SCHEDULED)
+            
+            # Format the response
+            result = f"{warnings}\n" if warnings else ""
+            result += f"✅ Draft created successfully!\n\n"
+            result += f"**Draft ID:** {draft.id}\n"
+            result += f"**First tweet:** {draft.text_first_tweet[:100]}...\n" if len(draft.text_first_tweet) > 100 else f"**First tweet:** {draft.text_first_tweet}\n"
+            result += f"**Number of tweets:** {draft.num_tweets}\n"
+            
+            if draft.scheduled_date:
+                result += f"**Scheduled for:** {draft.scheduled_date}\n"
+            
+            if draft.share_url:
+                result += f"**Share URL:** {draft.share_url}\n"
+            
+            result += f"\n**View draft:** https://typefully.com/?d={draft.id}"
+            
+            return [TextContent(type="text", text=result)]
+        
+        elif name == "create_drafts":
+            requests = [CreateDraftRequest(**item) for item in arguments["drafts"]]
+            warnings = {} if api_key else {
+                i: duplicate_warnings(request, accounts.resolve(account)) for i, request in enumerate(requests)
+            }
+            
+            def item_lines(item: BatchItemResult) -> List[str]:
+                lines = format_batch_item(item)
+                if warnings.get(item.index):
+                    lines.extend(f"   {line}" for line in warnings[item.index].splitlines())
+                return lines
+            
+            report = progress_reporter()
+            done = 0
+            
+            async def on_result(item: BatchItemResult) -> None:
+                nonlocal done
+                done += 1
+                await report(done, len(requests), "\n".join(item_lines(item)))
+            
+            batch = await client.create_drafts(
+                requests, arguments.get("max_concurrency"), on_result if report is not None else None
+            )
+            if uses_default_account(api_key, account):
+                draft_sync.invalidate(SCHEDULED)
+            
+            succeeded = len(batch.succeeded)
+            lines = [
+                f"{'✅' if succeeded == len(batch.results) else '⚠️'} Created {succeeded} of {len(batch.results)} draft(s) "
+                f"in {batch.elapsed:.2f}s (concurrency {batch.max_concurrency})",
+                "",
+            ]
+            for item in batch.results:
+                lines.extend(item_lines(item))
+            
+            return [TextContent(type="text", text="\n".join(lines))]
+        
+        else:
+            return [TextContent(type="text", text=f"Unknown tool: {name}")]
             
-            else:
-                return [TextContent(type="text", text=f"Unknown tool: {name}")]
-                
     except Exception as e:
         logger.error(f"Error calling tool {name}: {str(e)}")
-        return [TextContent(type="text", text=f"❌ Error: {str(e)}")]
+        return [TextContent(type="text", text=f"❌ Error: {describe_error(e)}")]
 
 
-if __name__ == "__main__":
-    import asyncio
+async def plan_drafts(arguments: Dict[str, Any], api_key: Optional[str], account: Optional[str]) -> str:
+    """Run plan_schedule: plan the drafts, then preview or create them."""
+    cadence = Cadence.parse(
+        arguments.get("timezone") or settings.schedule_timezone,
+        arguments.get("times") or settings.schedule_times.split(","),
+        arguments.get("days") or settings.schedule_days.split(","),
+        arguments.get("min_gap_minutes", settings.schedule_min_gap_minutes),
+    )
+    if arguments.get("drafts"):
+        requests = [CreateDraftRequest(**item) for item in arguments["drafts"]]
+    elif arguments.get("count"):
+        if arguments.get("create"):
+            raise ValueError("create needs drafts, not a count")
+        requests = [CreateDraftRequest(content="") for _ in range(arguments["count"])]
+    else:
+        raise ValueError("Pass either drafts or count")
+    start = to_utc(arguments["start"]) if arguments.get("start") else None
+    
+    existing = await fetch_drafts(SCHEDULED, None, api_key, account)
+    scheduled = []
+    for draft in existing:
+        if draft.scheduled_date:
+            try:
+                scheduled.append(to_utc(draft.scheduled_date))
+            except ValueError:
+                logger.warning(f"Ignoring unparseable schedule date {draft.scheduled_date!r} of draft {draft.id}")
+    with metrics.phase("plan"):
+        planned = plan_schedule(requests, scheduled, cadence, start)
+    
+    lines = [
+        f"🗓️ Planned {len(planned)} {'draft' if arguments.get('drafts') else 'slot'}(s) in {cadence.tz.key} "
+        f"around {len(scheduled)} scheduled post(s), at least {cadence.min_gap.total_seconds() / 60:g} minutes apart:",
+        "",
+    ]
+    lines.extend(format_planned_draft(item, cadence, bool(arguments.get("drafts"))) for item in planned)
+    if not arguments.get("create"):
+        if arguments.get("drafts"):
+            lines.extend(["", "Nothing was created. Call plan_schedule again with create=true, or pass these dates to create_drafts."])
+        return "\n".join(lines)
+    
+    client = await get_client(api_key, account)
+    batch = await client.create_drafts([item.request for item in planned])
+    if uses_default_account(api_key, account):
+        draft_sync.invalidate(SCHEDULED)
+    lines.extend(["", f"{'✅' if len(batch.succeeded) == len(batch.results) else '⚠️'} Created {len(batch.succeeded)} "
+                      f"of {len(batch.results)} draft(s) in {batch.elapsed:.2f}s", ""])
+    for item in batch.results:
+        lines.extend(format_batch_item(item))
+    return "\n".join(lines)
+
+
+def format_planned_draft(item: PlannedDraft, cadence: Cadence, with_content: bool) -> str:
+    """One line of a plan: local time, UTC date and the start of the draft."""
+    local = item.slot.astimezone(cadence.tz).strftime("%a %Y-%m-%d %H:%M %Z")
+    line = f"**{item.index + 1}.** {local} → {format_utc(item.slot)}"
+    if item.pinned:
+        line += " (kept)"
+    if with_content:
+        first_tweet = item.request.content.strip().split("\n")[0]
+        line += f": {first_tweet[:60] + '...' if len(first_tweet) > 60 else first_tweet}"
+    return line
+
+
+# Rows shown by draft_stats; the totals still cover every group
+STATS_MAX_ROWS = 200
+
+
+def format_draft_stats(stats: DraftStats, status: str, timezone_name: str) -> str:
+    """Render the draft_stats report as a Markdown table."""
+    label = "Drafts" if status == "all" else f"{status.capitalize()} drafts"
+    if not stats.drafts:
+        if not len(draft_store):
+            return "The local draft index is empty. Call draft_stats with refresh=true, or get_scheduled_drafts / get_published_drafts first, to populate it."
+        return f"No {label.lower()} match in the local index."
+    timed = any(name in TIME_DIMENSIONS for name in stats.group_by)
+    lines = [
+        f"📈 **{label}** by {' and '.join(stats.group_by)}{f' ({timezone_name})' if timed else ''}: "
+        f"{stats.drafts:,} draft(s), {stats.tweets:,} tweet(s)",
+        "",
+        "| " + " | ".join(stats.group_by) + " | drafts | tweets | share |",
+        "|" + "---|" * (len(stats.group_by) + 3),
+    ]
+    for group in stats.groups[:STATS_MAX_ROWS]:
+        lines.append(
+            "| " + " | ".join(group.key) + f" | {group.drafts:,} | {group.tweets:,} | {group.drafts / stats.drafts:.1%} |"
+        )
+    if len(stats.groups) > STATS_MAX_ROWS:
+        lines.append("")
+        lines.append(f"… and {len(stats.groups) - STATS_MAX_ROWS} more group(s); narrow the date range or use a coarser grouping")
+    return "\n".join(lines)
+
+
+# Draft fields compared between archived versions
+HISTORY_FIELDS = ("text", "text_first_tweet", "num_tweets", "scheduled_date", "published_on",
+                  "share_url", "twitter_url", "linkedin_url")
+
+
+def format_observed_at(observed_at: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(observed_at))
+
+
+def format_draft_history(versions: List[DraftVersion], draft_id: int) -> str:
+    """Render every archived version of one draft."""
+    if not versions:
+        return f"Draft ID {draft_id} is not in the archive."
+    lines = [f"🗄️ Draft ID {draft_id}: {len(versions)} archived version(s)", ""]
+    previous: Optional[Draft] = None
+    for version in versions:
+        draft = version.draft
+        lines.append(f"**Version {version.version}** (seen {format_observed_at(version.observed_at)})")
+        if previous is not None:
+            changed = [field for field in HISTORY_FIELDS if getattr(draft, field) != getattr(previous, field)]
+            lines.append(f"   Changed: {', '.join(changed) if changed else 'account'}")
+        if draft.published_on:
+            lines.append(f"   Published: {draft.published_on}")
+        elif draft.scheduled_date:
+            lines.append(f"   Scheduled: {draft.scheduled_date}")
+        first_tweet = draft.text_first_tweet[:80] + "..." if len(draft.text_first_tweet) > 80 else draft.text_first_tweet
+        lines.append(f"   Tweets: {draft.num_tweets}; first tweet: {first_tweet}")
+        previous = draft
+    lines.append("")
+    lines.append(f"View: https://typefully.com/?d={draft_id}")
+    return "\n".join(lines)
+
+
+def format_archived_drafts(versions: List[DraftVersion], show_account: bool = False) -> str:
+    """Render the latest archived version of each matching draft."""
+    if not versions:
+        if not len(draft_archive):
+            return "The draft archive is empty. Drafts are archived as the server reads or creates them."
+        return "No matching drafts found in the archive."
+    lines = [f"🗄️ Found {len(versions)} matching draft(s) in the archive:", ""]
+    for i, version in enumerate(versions, 1):
+        draft = version.draft
+        first_tweet = draft.text_first_tweet[:80] + "..." if len(draft.text_first_tweet) > 80 else draft.text_first_tweet
+        lines.append(f"**{i}. Draft ID {draft.id}**")
+        if show_account:
+            lines.append(f"   Account: {version.account}")
+        lines.append(f"   First tweet: {first_tweet}")
+        if draft.published_on:
+            lines.append(f"   Published: {draft.published_on}")
+        elif draft.scheduled_date:
+            lines.append(f"   Scheduled: {draft.scheduled_date}")
+        lines.append(f"   Versions: {version.version}, last seen {format_observed_at(version.observed_at)}")
+        lines.append(f"   View: https://typefully.com/?d={draft.id}")
+    return "\n".join(lines)
+
+
+def queue_draft(request: CreateDraftRequest, account: str) -> str:
+    """Validate a draft and add it to the outbox for the background worker to send."""
+    if settings.preflight:
+        checked = preflight(request, settings.tweet_max_length)
+        if not checked.ok:
+            raise PreflightError(checked)
+    if settings.duplicate_check == "block":
+        refuse_duplicates(request, account)
+    warnings = duplicate_warnings(request, account)
+    entry, queued = outbox.enqueue(request, account)
+    outbox_worker.wake()
+    if not queued:
+        return f"📮 An identical draft is already in the outbox; it was not queued again.\n\n{format_outbox_entry(entry)}"
+    if warnings:
+        warnings += "\n"
+    first_tweet = request.content.strip().split("\n")[0]
+    first_tweet = first_tweet[:100] + "..." if len(first_tweet) > 100 else first_tweet
+    result = f"{warnings}📮 Draft queued as outbox entry #{entry.id}\n\n"
+    result += f"**First tweet:** {first_tweet}\n"
+    if len(accounts.names) > 1:
+        result += f"**Account:** {account}\n"
+    if request.schedule_date:
+        result += f"**Schedule date:** {request.schedule_date}\n"
+    result += "\nIt will be created in the background, retrying while the Typefully API is unavailable. Check on it with outbox_status."
+    return result
+
+
+def format_outbox_entry(entry: OutboxEntry) -> str:
+    """Describe one outbox entry."""
+    icons = {"pending": "⏳", "sending": "📤", "sent": "✅", "failed": "❌"}
+    line = f"**#{entry.id}** {icons.get(entry.status, '')} {entry.status}"
+    if len(accounts.names) > 1:
+        line += f" ({entry.account})"
+    if entry.status == SENT:
+        line += f" as draft {entry.draft_id}" if entry.draft_id else ", unconfirmed"
+    elif entry.attempts:
+        line += f" after {entry.attempts} attempt(s)"
+    if entry.status == "pending" and entry.attempts:
+        line += f", next try in {max(0, entry.next_attempt_at - time.time()):.0f}s"
+    first_tweet = entry.request.content.strip().split("\n")[0]
+    lines = [line, f"   First tweet: {first_tweet[:80] + '...' if len(first_tweet) > 80 else first_tweet}"]
+    queued = datetime.fromtimestamp(entry.created_at).astimezone().strftime("%Y-%m-%d %H:%M:%S %Z")
+    lines.append(f"   Queued: {queued}")
+    if entry.last_error and (entry.status != SENT or not entry.draft_id):
+        lines.append(f"   Last error: {entry.last_error}")
+    if entry.draft_id:
+        lines.append(f"   View: https://typefully.com/?d={entry.draft_id}")
+    return "\n".join(lines)
+
+
+def format_outbox_status(entry_id: Optional[int] = None, status: Optional[str] = None, limit: int = 20) -> str:
+    """Render the outbox_status report."""
+    if entry_id is not None:
+        entry = outbox.get(entry_id)
+        if entry is None:
+            raise ValueError(f"No outbox entry #{entry_id}")
+        return format_outbox_entry(entry)
+    counts = outbox.counts()
+    lines = ["📮 **Outbox**: " + ", ".join(f"{count} {name}" for name, count in counts.items())]
+    if not settings.outbox:
+        lines.append("⚠️ The outbox is disabled, so create_draft sends drafts directly. Set TYPEFULLY_OUTBOX=1 to queue them.")
+    entries = outbox.list(status, limit)
+    if entries:
+        lines.append("")
+        lines.extend(format_outbox_entry(entry) for entry in entries)
+    return "\n".join(lines)
+
+
+def format_preview_draft(request: CreateDraftRequest) -> str:
+    """Describe how a draft would be split and whether it passes validation."""
+    checked = preflight(request, settings.tweet_max_length)
+    limit = f"/{checked.max_length}" if checked.max_length else ""
+    lines = [
+        f"{'✅ Draft is valid' if checked.ok else '❌ Draft would be rejected'}: "
+        f"{len(checked.tweets)} tweet(s){' after threadify' if request.threadify else ''}",
+        "",
+    ]
+    for i, tweet in enumerate(checked.tweets, 1):
+        over = " ⚠️" if checked.max_length and tweet.length > checked.max_length else ""
+        lines.append(f"**{i}.** ({tweet.length}{limit}){over} {tweet.text}")
+    if checked.schedule_date:
+        lines.extend(["", f"**Scheduled for:** {checked.schedule_date}"])
+    if checked.errors:
+        lines.extend(["", *(f"❌ {error}" for error in checked.errors)])
+    if checked.warnings:
+        lines.extend(["", *(f"⚠️ {warning}" for warning in checked.warnings)])
+    return "\n".join(lines)
+
+
+def format_batch_item(item: BatchItemResult) -> List[str]:
+    """Lines describing one draft of a create_drafts batch."""
+    if not item.ok:
+        return [f"**{item.index + 1}.** ❌ {item.error.splitlines()[0]}"]
+    draft = item.draft
+    first_tweet = draft.text_first_tweet[:80] + "..." if len(draft.text_first_tweet) > 80 else draft.text_first_tweet
+    lines = [f"**{item.index + 1}.** ✅ Draft ID {draft.id}: {first_tweet}"]
+    if draft.scheduled_date:
+        lines.append(f"   Scheduled: {draft.scheduled_date}")
+    lines.append(f"   View: https://typefully.com/?d={draft.id}")
+    return lines
+
+
+def describe_error(e: Exception) -> str:
+    """Turn an exception from a tool call into a message for the agent."""
+    response = getattr(e, "response", None)
+    if response is not None and response.status_code == 429:
+        retry_after = response.headers.get("Retry-After")
+        message = "Rate limited by the Typefully API after retrying"
+        return f"{message}; try again in {retry_after}s" if retry_after else message
+    return str(e)
+
+
+async def run_stdio() -> None:
+    """Serve the MCP protocol over stdin/stdout until the client disconnects."""
     from mcp.server.stdio import stdio_server
     
-    async def main():
-        async with stdio_server() as (read_stream, write_stream):
-            await app.run(
-                read_stream,
-                write_stream,
-                InitializationOptions(
-                    server_name="typefully-mcp-server",
-                    server_version="0.1.0",
-                    capabilities=app.get_capabilities(
-                        notification_options=NotificationOptions(),
-                        experimental_capabilities={},
-                    ),
-                ),
-            )
+    async with stdio_server() as (read_stream, write_stream):
+        await app.run(read_stream, write_stream, app.create_initialization_options())
+
+
+def main() -> None:
+    """Entry point for the ``typefully-mcp`` console script."""
+    parser = argparse.ArgumentParser(description="Typefully MCP server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default=settings.transport,
+                        help="stdio (default) serves one client; http serves Streamable HTTP and SSE to many")
+    parser.add_argument("--host", default=settings.http_host, help="Interface for the HTTP transport")
+    parser.add_argument("--port", type=int, default=settings.http_port, help="Port for the HTTP transport")
+    args = parser.parse_args()
     
-    asyncio.run(main()) 
\ No newline at end of file
+    if args.transport == "http":
+        from .http_server import run_http
+        asyncio.run(run_http(args.host, args.port))
+    else:
+        asyncio.run(run_stdio())
+
+
+if __name__ == "__main__":
+    main()
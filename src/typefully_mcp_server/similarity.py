@@ -0,0 +1,226 @@
+"""In-memory near-duplicate index over draft texts.
+
+Each text is reduced to character 5-gram shingles (after lowercasing,
+replacing URLs and dropping punctuation) and summarized by a 64-value
+MinHash signature. The signature uses one-permutation hashing: every
+shingle is hashed once and kept as the minimum of one of 64 bins, and
+empty bins borrow from the next non-empty one (densification by
+rotation), so a signature costs one pass over the shingles rather than
+64. Signatures are split into 16 bands of 4 for locality-sensitive
+hashing, so a lookup only compares against drafts that share a band, and
+pairs with a Jaccard similarity of 0.8 are found with near certainty.
+"""
+
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .preflight import TWEET_SEPARATOR
+from .store import DEFAULT_ACCOUNT, draft_status
+from .types import Draft
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Low bits of a shingle hash pick its bin, the rest are its value
+BIN_BITS = NUM_PERM.bit_length() - 1
+HASH_MASK = (1 << 64) - 1
+EMPTY_BIN = 1 << 64
+# Bounds on the work per lookup when many drafts are alike: ids read per
+# matching bucket, and candidates (those sharing the most bands) verified
+MAX_BUCKET_SCAN = 64
+MAX_CANDIDATES = 64
+# Added per bin skipped when an empty bin borrows a value, so borrowed values stay distinct
+ROTATION_OFFSET = 1 << 58
+
+URL = re.compile(r"https?://\S+|www\.\S+", re.IGNORECASE)
+NON_WORD = re.compile(r"[^\w\s]+")
+WHITESPACE = re.compile(r"\s+")
+
+Signature = Tuple[int, ...]
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase ``text``, replace links and strip punctuation, so trivial edits don't matter."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = URL.sub(" url ", text)
+    text = NON_WORD.sub(" ", text)
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """64-bit hashes of the overlapping character ``size``-grams of the normalized text."""
+    text = normalize_text(text)
+    if len(text) <= size:
+        return {hash(text) & HASH_MASK} if text else set()
+    return {hash(text[i:i + size]) & HASH_MASK for i in range(len(text) - size + 1)}
+
+
+def draft_text(draft: Draft) -> str:
+    """The fullest text known for a draft; list responses may only carry the first tweet."""
+    return draft.text or draft.text_first_tweet
+
+
+@dataclass
+class DuplicateMatch:
+    """An existing draft similar to the one being checked."""
+    draft: Draft
+    account: str
+    similarity: float
+
+    def describe(self) -> str:
+        status = draft_status(self.draft)
+        when = self.draft.published_on or self.draft.scheduled_date
+        first_tweet = self.draft.text_first_tweet.strip().split("\n")[0]
+        first_tweet = first_tweet[:60] + "..." if len(first_tweet) > 60 else first_tweet
+        where = f" in account '{self.account}'" if self.account != DEFAULT_ACCOUNT else ""
+        return (f"{self.similarity:.0%} similar to {status} draft {self.draft.id}{where}"
+                f"{f' ({when})' if when else ''}: {first_tweet}")
+
+
+class DuplicateDraftError(ValueError):
+    """A draft was refused because it nearly duplicates an existing one."""
+
+    def __init__(self, matches: List[DuplicateMatch]):
+        super().__init__("Draft is a near-duplicate of an existing draft: " + "; ".join(m.describe() for m in matches))
+        self.matches = matches
+
+
+class NearDuplicateIndex:
+    """MinHash / LSH index of every draft the server has seen.
+
+    Updated incrementally as drafts are observed; a draft whose text hasn't
+    changed since it was last indexed is skipped.
+    """
+
+    def __init__(self):
+        # Held while the index changes or is read; signatures are computed outside it
+        self._lock = threading.Lock()
+        self._signatures: Dict[int, Signature] = {}
+        self._drafts: Dict[int, Draft] = {}
+        self._accounts: Dict[int, str] = {}
+        self._texts: Dict[int, str] = {}
+        self._buckets: List[Dict[Signature, Set[int]]] = [{} for _ in range(BANDS)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> Optional[Signature]:
+        """MinHash signature of ``text``, or None if it has no words."""
+        hashes = shingle_hashes(text)
+        if not hashes:
+            return None
+        low = NUM_PERM - 1
+        # Within a bin the low bits are equal, so the smallest hash has the smallest value;
+        # written largest first, each bin ends up holding its minimum
+        minimums = {h & low: h >> BIN_BITS for h in sorted(hashes, reverse=True)}
+        bins = [minimums.get(i, EMPTY_BIN) for i in range(NUM_PERM)]
+        for i in range(NUM_PERM):
+            if bins[i] == EMPTY_BIN:
+                for distance in range(1, NUM_PERM):
+                    borrowed = bins[(i + distance) % NUM_PERM]
+                    if borrowed < EMPTY_BIN and borrowed < ROTATION_OFFSET:
+                        bins[i] = borrowed + distance * ROTATION_OFFSET
+                        break
+        return tuple(bins)
+
+    @staticmethod
+    def _bands(signature: Signature) -> Iterable[Tuple[int, Signature]]:
+        for band in range(BANDS):
+            yield band, signature[band * ROWS:(band + 1) * ROWS]
+
+    def _remove(self, draft_id: int) -> None:
+        signature = self._signatures.pop(draft_id, None)
+        if signature is None:
+            return
+        for band, key in self._bands(signature):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(draft_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def add(self, drafts: Iterable[Draft], account: Optional[str] = None) -> int:
+        """Index drafts by id, replacing older versions.
+
+        Args:
+            drafts: Drafts as returned by the API or the local store
+            account: Account the drafts belong to; by default their ``account`` label
+
+        Returns:
+            The number of drafts (re)indexed
+        """
+        indexed = 0
+        for draft in drafts:
+            text = draft_text(draft)
+            changed = self._texts.get(draft.id) != text
+            signature = self.signature(text) if changed else None
+            with self._lock:
+                self._drafts[draft.id] = draft
+                self._accounts[draft.id] = account or draft.account or DEFAULT_ACCOUNT
+                if not changed:
+                    continue
+                self._remove(draft.id)
+                self._texts[draft.id] = text
+                if signature is None:
+                    continue
+                self._signatures[draft.id] = signature
+                for band, key in self._bands(signature):
+                    self._buckets[band].setdefault(key, set()).add(draft.id)
+            indexed += 1
+        return indexed
+
+    def query(self, text: str, threshold: float = 0.8, account: Optional[str] = None,
+              first_tweet_only: bool = False) -> List[DuplicateMatch]:
+        """Indexed drafts whose estimated Jaccard similarity to ``text`` is at least ``threshold``.
+
+        Args:
+            text: Text of the draft being checked
+            threshold: Minimum similarity, from 0 to 1
+            account: Only compare against this account's drafts
+            first_tweet_only: Only compare against drafts whose full text isn't known
+
+        Returns:
+            The most similar drafts first
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return []
+        matches = []
+        with self._lock:
+            shared_bands: Counter = Counter()
+            for band, key in self._bands(signature):
+                shared_bands.update(islice(self._buckets[band].get(key, ()), MAX_BUCKET_SCAN))
+            for draft_id, _ in shared_bands.most_common(MAX_CANDIDATES):
+                draft = self._drafts[draft_id]
+                if account and self._accounts[draft_id] != account:
+                    continue
+                if first_tweet_only and draft.text:
+                    continue
+                other = self._signatures[draft_id]
+                similarity = sum(a == b for a, b in zip(signature, other)) / NUM_PERM
+                if similarity >= threshold:
+                    matches.append(DuplicateMatch(draft=draft, account=self._accounts[draft_id], similarity=similarity))
+        matches.sort(key=lambda match: match.similarity, reverse=True)
+        return matches
+
+    def check(self, content: str, threshold: float = 0.8, account: Optional[str] = None,
+              limit: int = 3) -> List[DuplicateMatch]:
+        """Drafts similar to the content of a new draft.
+
+        Drafts only known by their first tweet are compared with the new
+        draft's first tweet.
+        """
+        matches = {match.draft.id: match for match in self.query(content, threshold, account)}
+        first_tweet = content.strip().split(TWEET_SEPARATOR)[0]
+        if first_tweet != content.strip():
+            for match in self.query(first_tweet, threshold, account, first_tweet_only=True):
+                if match.draft.id not in matches or matches[match.draft.id].similarity < match.similarity:
+                    matches[match.draft.id] = match
+        return sorted(matches.values(), key=lambda match: match.similarity, reverse=True)[:limit]
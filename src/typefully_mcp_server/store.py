@@ -0,0 +1,370 @@
+"""Local SQLite mirror of Typefully drafts with full-text search."""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .types import Draft
+
+# The account backed by the server's own key (environment, key file or keychain)
+DEFAULT_ACCOUNT = "default"
+
+# Status of a draft that left the scheduled list without being published:
+# unscheduled or deleted upstream. Left out of searches and statistics.
+REMOVED = "removed"
+
+logger = logging.getLogger(__name__)
+
+DRAFT_COLUMNS = [
+    "id", "text", "text_first_tweet", "num_tweets", "scheduled_date",
+    "published_on", "share_url", "twitter_url", "linkedin_url",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    id INTEGER PRIMARY KEY,
+    text TEXT,
+    text_first_tweet TEXT NOT NULL,
+    num_tweets INTEGER NOT NULL,
+    scheduled_date TEXT,
+    published_on TEXT,
+    share_url TEXT,
+    twitter_url TEXT,
+    linkedin_url TEXT,
+    status TEXT NOT NULL,
+    sort_date TEXT,
+    updated_at REAL NOT NULL,
+    account TEXT NOT NULL DEFAULT 'default'
+);
+CREATE INDEX IF NOT EXISTS drafts_status_date ON drafts (status, sort_date);
+CREATE INDEX IF NOT EXISTS drafts_sort_date ON drafts (sort_date);
+"""
+
+# Indexes on columns added after the first release, created once the column exists
+MIGRATIONS = """
+CREATE INDEX IF NOT EXISTS drafts_account_date ON drafts (account, sort_date);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS drafts_fts USING fts5(
+    text, text_first_tweet, content='drafts', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS drafts_ai AFTER INSERT ON drafts BEGIN
+    INSERT INTO drafts_fts (rowid, text, text_first_tweet)
+    VALUES (new.id, new.text, new.text_first_tweet);
+END;
+CREATE TRIGGER IF NOT EXISTS drafts_ad AFTER DELETE ON drafts BEGIN
+    INSERT INTO drafts_fts (drafts_fts, rowid, text, text_first_tweet)
+    VALUES ('delete', old.id, old.text, old.text_first_tweet);
+END;
+CREATE TRIGGER IF NOT EXISTS drafts_au AFTER UPDATE ON drafts BEGIN
+    INSERT INTO drafts_fts (drafts_fts, rowid, text, text_first_tweet)
+    VALUES ('delete', old.id, old.text, old.text_first_tweet);
+    INSERT INTO drafts_fts (rowid, text, text_first_tweet)
+    VALUES (new.id, new.text, new.text_first_tweet);
+END;
+"""
+
+# Fields from the latest observation win, but a missing value (e.g. ``text``,
+# which the list endpoints may omit) never erases one we already have.
+UPSERT = f"""
+INSERT INTO drafts ({", ".join(DRAFT_COLUMNS)}, status, sort_date, account, updated_at)
+VALUES ({", ".join("?" for _ in DRAFT_COLUMNS)}, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    text = COALESCE(excluded.text, drafts.text),
+    text_first_tweet = excluded.text_first_tweet,
+    num_tweets = excluded.num_tweets,
+    scheduled_date = COALESCE(excluded.scheduled_date, drafts.scheduled_date),
+    published_on = COALESCE(excluded.published_on, drafts.published_on),
+    share_url = COALESCE(excluded.share_url, drafts.share_url),
+    twitter_url = COALESCE(excluded.twitter_url, drafts.twitter_url),
+    linkedin_url = COALESCE(excluded.linkedin_url, drafts.linkedin_url),
+    status = CASE WHEN drafts.status = 'published' THEN drafts.status ELSE excluded.status END,
+    sort_date = CASE WHEN drafts.status = 'published' THEN drafts.sort_date ELSE excluded.sort_date END,
+    account = excluded.account,
+    updated_at = excluded.updated_at
+"""
+
+
+# SQL for each column draft statistics can be grouped by
+GROUP_EXPRESSIONS = {
+    "kind": "CASE WHEN d.num_tweets > 1 THEN 'thread' ELSE 'tweet' END",
+    "num_tweets": "d.num_tweets",
+    "platform": (
+        "CASE WHEN d.twitter_url IS NOT NULL AND d.linkedin_url IS NOT NULL THEN 'x+linkedin' "
+        "WHEN d.linkedin_url IS NOT NULL THEN 'linkedin' WHEN d.twitter_url IS NOT NULL THEN 'x' ELSE 'none' END"
+    ),
+    "status": "d.status",
+    "account": "d.account",
+}
+
+# SQL for each local-time grouping of ``sort_date``; ``{local}`` is a date/time
+# modifier shifting it from UTC. Weeks are ISO weeks, named after their Thursday.
+LOCAL_TIME_EXPRESSIONS = {
+    "hour": "strftime('%H:00', d.sort_date, {local})",
+    "weekday": "strftime('%w', d.sort_date, {local})",
+    "day": "date(d.sort_date, {local})",
+    "week": (
+        "strftime('%Y', d.sort_date, {local}, '-3 days', 'weekday 4') || '-W' || "
+        "printf('%02d', (strftime('%j', d.sort_date, {local}, '-3 days', 'weekday 4') - 1) / 7 + 1)"
+    ),
+    "month": "strftime('%Y-%m', d.sort_date, {local})",
+}
+
+
+def normalize_date(value: Optional[str]) -> Optional[str]:
+    """Normalize an ISO date to a sortable UTC ``YYYY-MM-DDTHH:MM:SSZ`` string.
+
+    Naive dates are taken to be UTC. Unparseable values are returned as-is.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def draft_status(draft: Draft) -> str:
+    """Classify a draft as "published", "scheduled" or "draft"."""
+    if draft.published_on:
+        return "published"
+    if draft.scheduled_date:
+        return "scheduled"
+    return "draft"
+
+
+def fts_query(query: str) -> str:
+    """Quote every term so user input can't be parsed as FTS5 syntax."""
+    terms = query.split()
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+class DraftStore:
+    """SQLite mirror of every draft the server has seen.
+
+    Drafts are upserted by ``id`` from list responses and newly created
+    drafts, and can then be searched by text and date without an API call.
+    Uses an FTS5 index when SQLite supports it and falls back to ``LIKE``.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """Initialize the store. The database is opened on first use.
+
+        Args:
+            path: SQLite database file, or ":memory:" for a per-process index
+        """
+        self.path = path
+        self.has_fts = False
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Last row written per id, so re-observing an unchanged draft is free
+        self._written: Dict[int, tuple] = {}
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path != ":memory:":
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(drafts)")}
+        if "account" not in columns:
+            conn.execute(f"ALTER TABLE drafts ADD COLUMN account TEXT NOT NULL DEFAULT '{DEFAULT_ACCOUNT}'")
+        conn.executescript(MIGRATIONS)
+        try:
+            conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite FTS5 unavailable, falling back to LIKE search: {e}")
+        return conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self._written.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM drafts").fetchone()[0]
+
+    def upsert(self, drafts: Iterable[Draft], account: str = DEFAULT_ACCOUNT) -> int:
+        """Insert or update drafts by id, skipping drafts that haven't changed.
+
+        Args:
+            drafts: Drafts as returned by the API
+            account: Name of the account the drafts belong to
+
+        Returns:
+            The number of drafts written
+        """
+        now = time.time()
+        rows = []
+        for draft in drafts:
+            status = draft_status(draft)
+            sort_date = normalize_date(draft.published_on if status == "published" else draft.scheduled_date)
+            row = tuple(getattr(draft, column) for column in DRAFT_COLUMNS) + (status, sort_date, account)
+            if self._written.get(draft.id) != row:
+                rows.append(row)
+        if not rows:
+            return 0
+        with self._lock, self.conn:
+            self.conn.executemany(UPSERT, [row + (now,) for row in rows])
+            for row in rows:
+                self._written[row[0]] = row
+        return len(rows)
+
+    def mark_removed(self, draft_ids: Iterable[int], account: str = DEFAULT_ACCOUNT) -> int:
+        """Mark scheduled drafts that dropped out of a full scheduled listing as removed.
+
+        Drafts that were published instead are marked published again when
+        they appear in the published list, and any draft seen again is
+        written with its current status.
+
+        Args:
+            draft_ids: Ids missing from the latest scheduled list
+            account: Name of the account the drafts belong to
+
+        Returns:
+            The number of drafts marked
+        """
+        ids = list(draft_ids)
+        if not ids:
+            return 0
+        now = time.time()
+        with self._lock, self.conn:
+            cursor = self.conn.executemany(
+                "UPDATE drafts SET status = ?, updated_at = ? WHERE id = ? AND account = ? AND status = 'scheduled'",
+                [(REMOVED, now, draft_id, account) for draft_id in ids],
+            )
+            for draft_id in ids:
+                # So an unchanged draft that comes back is written again
+                self._written.pop(draft_id, None)
+        return cursor.rowcount
+
+    def get(self, draft_id: int) -> Optional[Draft]:
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(DRAFT_COLUMNS)}, account FROM drafts WHERE id = ?", (draft_id,)
+            ).fetchone()
+        return Draft(**dict(row)) if row else None
+
+    def all(self) -> List[Draft]:
+        """Every stored draft."""
+        with self._lock:
+            rows = self.conn.execute(f"SELECT {', '.join(DRAFT_COLUMNS)}, account FROM drafts").fetchall()
+        return [Draft(**dict(row)) for row in rows]
+
+    @staticmethod
+    def _filters(status: Optional[str], since: Optional[str], until: Optional[str],
+                 account: Optional[str]) -> Tuple[str, list]:
+        where, params = [], []
+        if account:
+            where.append("d.account = ?")
+            params.append(account)
+        where.append("d.status = ?" if status else "d.status != ?")
+        params.append(status or REMOVED)
+        if since:
+            where.append("d.sort_date >= ?")
+            params.append(normalize_date(since))
+        if until:
+            where.append("d.sort_date < ?")
+            params.append(normalize_date(until))
+        return (" WHERE " + " AND ".join(where) if where else ""), params
+
+    def date_range(self, status: Optional[str] = None, since: Optional[str] = None,
+                   until: Optional[str] = None, account: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """Earliest and latest normalized scheduled/published date of the matching drafts."""
+        where, params = self._filters(status, since, until, account)
+        where += (" AND" if where else " WHERE") + " d.sort_date LIKE '____-__-__T__:__:__Z'"
+        with self._lock:
+            row = self.conn.execute(f"SELECT MIN(d.sort_date), MAX(d.sort_date) FROM drafts d{where}", params).fetchone()
+        return row[0], row[1]
+
+    def aggregate(self, group_by: List[str], status: Optional[str] = None,
+                  since: Optional[str] = None, until: Optional[str] = None,
+                  account: Optional[str] = None, utc_offsets: Sequence[Tuple[str, int]] = ()) -> List[tuple]:
+        """Count drafts and tweets per group, in SQL.
+
+        Args:
+            group_by: Keys of ``GROUP_EXPRESSIONS`` or ``LOCAL_TIME_EXPRESSIONS``
+            status: Only "scheduled", "published", "draft" or "removed" drafts.
+                    Removed drafts are left out if None.
+            since: Only drafts scheduled/published at or after this ISO date
+            until: Only drafts scheduled/published before this ISO date
+            account: Only drafts of this account; all accounts if None
+            utc_offsets: ``(from, minutes)`` pairs, oldest first, giving the local
+                         time zone's UTC offset from each normalized date on
+
+        Returns:
+            One ``(*group values, drafts, tweets)`` tuple per group
+        """
+        where, params = self._filters(status, since, until, account)
+        local = "'+0 minutes'"
+        if utc_offsets:
+            # Built from dates we normalized and integers, so safe to inline
+            cases = " ".join(
+                f"WHEN d.sort_date >= '{start}' THEN '{minutes:+d} minutes'" for start, minutes in reversed(utc_offsets[1:])
+            )
+            local = f"CASE {cases} ELSE '{utc_offsets[0][1]:+d} minutes' END" if cases else f"'{utc_offsets[0][1]:+d} minutes'"
+        columns = [
+            f"{GROUP_EXPRESSIONS[name] if name in GROUP_EXPRESSIONS else LOCAL_TIME_EXPRESSIONS[name].format(local=local)} AS {name}"
+            for name in group_by
+        ]
+        sql = f"SELECT {', '.join(columns + ['COUNT(*)', 'SUM(d.num_tweets)'])} FROM drafts d{where}"
+        if group_by:
+            sql += f" GROUP BY {', '.join(group_by)}"
+        with self._lock:
+            return [tuple(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def search(self, query: Optional[str] = None, status: Optional[str] = None,
+               since: Optional[str] = None, until: Optional[str] = None,
+               limit: int = 20, account: Optional[str] = None) -> List[Draft]:
+        """Search the local index.
+
+        Args:
+            query: Words that must all appear in the draft text
+            status: Only "scheduled", "published", "draft" or "removed" drafts.
+                    Removed drafts are left out if None.
+            since: Only drafts scheduled/published at or after this ISO date
+            until: Only drafts scheduled/published before this ISO date
+            limit: Maximum number of results
+            account: Only drafts of this account; all accounts if None
+
+        Returns:
+            Matching drafts, best text match first, then most recent first
+        """
+        conn = self.conn
+        columns = ", ".join(f"d.{column}" for column in DRAFT_COLUMNS + ["account"])
+        where, params = self._filters(status, since, until, account)
+        joins, order = "", ["d.sort_date DESC", "d.id DESC"]
+        if query and query.strip():
+            if self.has_fts:
+                joins = " JOIN drafts_fts ON drafts_fts.rowid = d.id"
+                where += " AND drafts_fts MATCH ?"
+                params.append(fts_query(query))
+                order.insert(0, "drafts_fts.rank")
+            else:
+                for term in query.split():
+                    where += " AND (COALESCE(d.text, '') || ' ' || d.text_first_tweet) LIKE ?"
+                    params.append(f"%{term}%")
+        sql = f"SELECT {columns} FROM drafts d{joins}{where} ORDER BY {', '.join(order)} LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = conn.execute(sql, params).fetchall()
+        return [Draft(**dict(row)) for row in rows]
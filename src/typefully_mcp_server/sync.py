@@ -0,0 +1,195 @@
+"""Background sync of the scheduled and published draft lists."""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from .client import SharedClient
+from .types import Draft
+
+logger = logging.getLogger(__name__)
+
+SCHEDULED = "scheduled"
+PUBLISHED = "published"
+
+
+def filter_drafts(drafts: List[Draft], content_filter: Optional[str]) -> List[Draft]:
+    """Apply the API's ``content_filter`` to an unfiltered draft list."""
+    if content_filter == "threads":
+        return [draft for draft in drafts if draft.num_tweets > 1]
+    if content_filter == "tweets":
+        return [draft for draft in drafts if draft.num_tweets <= 1]
+    return list(drafts)
+
+
+@dataclass
+class SnapshotDiff:
+    """What changed between two snapshots, by ``Draft.id``."""
+    added: List[int] = field(default_factory=list)
+    changed: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+@dataclass
+class Snapshot:
+    """The last known unfiltered contents of one draft list.
+
+    ``requested_at`` is when the request for the list was started, so a
+    response to an older request can be told apart from a newer one.
+    """
+    drafts: List[Draft]
+    by_id: Dict[int, Draft]
+    fetched_at: float
+    requested_at: float
+
+    @classmethod
+    def of(cls, drafts: List[Draft], requested_at: Optional[float] = None) -> "Snapshot":
+        now = time.monotonic()
+        return cls(drafts=list(drafts), by_id={draft.id: draft for draft in drafts}, fetched_at=now,
+                   requested_at=now if requested_at is None else requested_at)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def diff(self, other: "Snapshot") -> SnapshotDiff:
+        """Compare ``other`` (newer) against this snapshot."""
+        result = SnapshotDiff()
+        for draft_id, draft in other.by_id.items():
+            previous = self.by_id.get(draft_id)
+            if previous is None:
+                result.added.append(draft_id)
+            elif previous != draft:
+                result.changed.append(draft_id)
+        result.removed = [draft_id for draft_id in self.by_id if draft_id not in other.by_id]
+        return result
+
+
+class DraftSync:
+    """Periodically polls the draft lists and keeps in-memory snapshots.
+
+    Read tools are served from a snapshot while it is younger than
+    ``max_staleness``; otherwise they fall back to the API. Polls revalidate
+    through the client's response cache, so an unchanged list costs a
+    ``304`` and changed drafts reach the observers (e.g. the local store).
+    Drafts that drop out of the scheduled list are passed to ``on_removed``;
+    drafts dropping out of the published list have only aged out of it.
+    Lists requested before the current snapshot was are ignored: they may
+    predate drafts the snapshot already has.
+    """
+
+    def __init__(self, shared_client: SharedClient, interval: float, max_staleness: Optional[float] = None,
+                 on_removed: Optional[Callable[[List[int]], None]] = None):
+        """Initialize the sync.
+
+        Args:
+            shared_client: The client to poll through
+            interval: Seconds between polls. 0 disables background polling.
+            max_staleness: Oldest snapshot, in seconds, that may be served to
+                           tool calls. Defaults to twice the interval.
+            on_removed: Called with the ids of drafts that left the scheduled list
+        """
+        self.shared_client = shared_client
+        self.on_removed = on_removed
+        self.interval = interval
+        self.max_staleness = max_staleness or 2 * interval
+        self.snapshots: Dict[str, Snapshot] = {}
+        self.polls = 0
+        self.errors = 0
+        self.stale = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def lookup(self, kind: str, content_filter: Optional[str] = None) -> Optional[List[Draft]]:
+        """Return the drafts from a fresh enough snapshot, or None."""
+        snapshot = self.snapshots.get(kind)
+        if not self.enabled or snapshot is None or snapshot.age > self.max_staleness:
+            return None
+        return filter_drafts(snapshot.drafts, content_filter)
+
+    def update(self, kind: str, drafts: List[Draft], requested_at: Optional[float] = None) -> SnapshotDiff:
+        """Replace a snapshot with a freshly fetched, unfiltered list.
+
+        Args:
+            kind: ``SCHEDULED`` or ``PUBLISHED``
+            drafts: The full list
+            requested_at: ``time.monotonic()`` when the list was requested. Defaults to now.
+        """
+        old = self.snapshots.get(kind)
+        if old is not None and requested_at is not None and requested_at < old.requested_at:
+            self.stale += 1
+            return SnapshotDiff()
+        new = Snapshot.of(drafts, requested_at)
+        self.snapshots[kind] = new
+        if old is None:
+            return SnapshotDiff(added=list(new.by_id))
+        diff = old.diff(new)
+        if kind == SCHEDULED and diff.removed and self.on_removed is not None:
+            try:
+                self.on_removed(diff.removed)
+            except Exception as e:
+                logger.warning(f"Recording removed drafts failed: {e}")
+        return diff
+
+    def invalidate(self, kind: str) -> None:
+        """Stop serving a snapshot and poll again soon, e.g. after creating a draft.
+
+        The snapshot is kept so the next poll can still be diffed against it.
+        """
+        snapshot = self.snapshots.get(kind)
+        if snapshot is not None:
+            snapshot.fetched_at = float("-inf")
+        self._wake.set()
+
+    async def poll_once(self) -> Dict[str, SnapshotDiff]:
+        """Fetch both lists and update the snapshots."""
+        client = await self.shared_client.get()
+        diffs = {}
+        for kind, fetch in ((SCHEDULED, client.get_scheduled_drafts), (PUBLISHED, client.get_published_drafts)):
+            requested_at = time.monotonic()
+            diffs[kind] = self.update(kind, await fetch(refresh=True), requested_at)
+        self.polls += 1
+        for kind, diff in diffs.items():
+            if diff:
+                logger.info(
+                    f"Sync {kind}: {len(diff.added)} added, {len(diff.changed)} changed, {len(diff.removed)} removed"
+                )
+        return diffs
+
+    async def run(self) -> None:
+        """Poll until cancelled."""
+        while True:
+            self._wake.clear()
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Draft sync failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self.run(), name="typefully-draft-sync")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,201 @@
+"""Response templates for the drafts in list tool responses.
+
+Each draft is rendered from a ``str.format`` template over its fields.
+Templates are checked once, when the server starts: field names must be
+known, and format specs must work for sample drafts. A line whose fields
+are all empty for a draft (no schedule date, no LinkedIn URL, ...) is
+left out.
+
+Any template can be replaced from a JSON file (TYPEFULLY_TEMPLATES_FILE)
+mapping template names to format strings, e.g. to drop the emoji::
+
+    {"compact": "{index}. {date} | {first_tweet_line}\\n"}
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from string import Formatter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import Settings
+from .types import Draft
+
+
+def shorten(text: str, width: int) -> str:
+    return text[:width] + "..." if len(text) > width else text
+
+
+def draft_url(draft: Draft) -> str:
+    return f"https://typefully.com/?d={draft.id}"
+
+
+@dataclass(frozen=True)
+class TemplateField:
+    """A value templates can use, computed from the draft."""
+    value: Callable[[Draft], Any]
+    description: str
+    # Whether the value can be empty, which leaves out lines that only have empty fields
+    optional: bool = False
+
+
+FIELDS: Dict[str, TemplateField] = {
+    "id": TemplateField(lambda draft: draft.id, "Draft ID"),
+    "text_first_tweet": TemplateField(lambda draft: draft.text_first_tweet, "First tweet"),
+    "first_tweet_short": TemplateField(lambda draft: shorten(draft.text_first_tweet, 80),
+                                       "First tweet, cut to 80 characters"),
+    "first_tweet_line": TemplateField(lambda draft: shorten(" ".join(draft.text_first_tweet.split()), 60),
+                                      "First tweet on one line, cut to 60 characters"),
+    "num_tweets": TemplateField(lambda draft: draft.num_tweets, "Number of tweets"),
+    "url": TemplateField(draft_url, "Link to the draft on Typefully"),
+    "date": TemplateField(lambda draft: draft.published_on or draft.scheduled_date or "-",
+                          "Published or scheduled date, or '-'"),
+    "scheduled_date": TemplateField(lambda draft: draft.scheduled_date, "Scheduled date", optional=True),
+    "published_on": TemplateField(lambda draft: draft.published_on, "Published date", optional=True),
+    "thread_url": TemplateField(lambda draft: draft_url(draft) if draft.num_tweets > 1 else None,
+                                "Link to the draft, for threads only", optional=True),
+    "tweet_url": TemplateField(lambda draft: draft_url(draft) if draft.num_tweets <= 1 else None,
+                               "Link to the draft, for single tweets only", optional=True),
+    "share_url": TemplateField(lambda draft: draft.share_url, "Public share link", optional=True),
+    "twitter_url": TemplateField(lambda draft: draft.twitter_url, "Link to the published tweet", optional=True),
+    "linkedin_url": TemplateField(lambda draft: draft.linkedin_url, "Link to the LinkedIn post", optional=True),
+    "account": TemplateField(lambda draft: draft.account, "Account, when reading several", optional=True),
+    "account_suffix": TemplateField(lambda draft: f" ({draft.account})" if draft.account else "",
+                                    "' (account)' when reading several accounts", optional=True),
+    "account_prefix": TemplateField(lambda draft: f"{draft.account} | " if draft.account else "",
+                                    "'account | ' when reading several accounts", optional=True),
+}
+# Position of the draft in the list, starting at 1; passed in rather than computed
+INDEX = "index"
+
+DEFAULT_TEMPLATES: Dict[str, str] = {
+    # get_scheduled_drafts, format "full"
+    "scheduled": (
+        "**{index}. Draft ID {id}**{account_suffix}\n"
+        "   First tweet: {text_first_tweet}\n"
+        "   Total tweets: {num_tweets}\n"
+        "   Scheduled: {scheduled_date}\n"
+        "   🧵 **View full thread:** {thread_url}\n"
+        "   📝 **View tweet:** {tweet_url}\n"
+        "\n"
+    ),
+    # get_published_drafts, format "full"
+    "published": (
+        "**{index}. Draft ID {id}**{account_suffix}\n"
+        "   First tweet: {first_tweet_short}\n"
+        "   Tweets: {num_tweets}\n"
+        "   Published: {published_on}\n"
+        "   Twitter: {twitter_url}\n"
+        "   LinkedIn: {linkedin_url}\n"
+        "\n"
+    ),
+    # Both list tools with format "compact", and progress messages
+    "compact": "{index}. #{id} | {account_prefix}{date} | {num_tweets} tweet(s) | {first_tweet_line}\n",
+}
+
+# Rendered when checking, so a bad format spec fails at startup rather than in a tool call
+SAMPLE_DRAFTS = (
+    Draft(id=1, text_first_tweet="Sample tweet", num_tweets=2, scheduled_date="2024-01-01T09:00:00Z",
+          published_on="2024-01-01T09:00:00Z", share_url="https://typefully.com/t/sample",
+          twitter_url="https://x.com/i/status/1", linkedin_url="https://www.linkedin.com/feed/", account="sample"),
+    Draft(id=2, text_first_tweet="Sample tweet", num_tweets=1),
+)
+
+
+class Template:
+    """A checked draft template."""
+
+    def __init__(self, name: str, source: str):
+        """Check ``source`` and split it into runs of lines.
+
+        Each run is rendered with ``str.format_map`` over the fields the
+        template uses, each computed once per draft. A run of lines whose
+        fields are all optional is left out when they are all empty.
+
+        Raises:
+            ValueError: If the template can't be parsed, uses an unknown field
+                        or has a format spec its field's values don't support
+        """
+        self.name = name
+        self.source = source
+        # (optional fields, text) per run of lines; runs without optional fields are always shown
+        self._runs: List[Tuple[Tuple[str, ...], str]] = []
+        always: List[str] = []
+        used: Dict[str, None] = {}
+        for line in source.splitlines(keepends=True):
+            names = self._line_fields(line)
+            used.update(dict.fromkeys(names))
+            if not names or any(n == INDEX or not FIELDS[n].optional for n in names):
+                always.append(line)
+                continue
+            if always:
+                self._runs.append(((), "".join(always)))
+                always = []
+            self._runs.append((names, line))
+        if always:
+            self._runs.append(((), "".join(always)))
+        self._fields = tuple((n, FIELDS[n].value) for n in used if n != INDEX)
+        try:
+            for sample in SAMPLE_DRAFTS:
+                self.render(1, sample)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Template '{name}' can't render a draft: {e}")
+
+    def _line_fields(self, line: str) -> Tuple[str, ...]:
+        """The fields used by one template line."""
+        try:
+            parsed = list(Formatter().parse(line))
+        except ValueError as e:
+            raise ValueError(f"Template '{self.name}' is not a valid format string: {e}")
+        names = []
+        for _, name, spec, _ in parsed:
+            if name is None:
+                continue
+            if name != INDEX and name not in FIELDS:
+                raise ValueError(
+                    f"Template '{self.name}' uses unknown field {{{name}}}; "
+                    f"available: {', '.join([INDEX, *FIELDS])}"
+                )
+            if "{" in spec:
+                raise ValueError(f"Template '{self.name}' has an unsupported format spec: {{{name}:{spec}}}")
+            names.append(name)
+        return tuple(dict.fromkeys(names))
+
+    def render(self, index: int, draft: Draft) -> str:
+        values = {name: value(draft) for name, value in self._fields}
+        values[INDEX] = index
+        return "".join(
+            text.format_map(values) for optional, text in self._runs
+            if not optional or any(values[n] is not None and values[n] != "" for n in optional)
+        )
+
+
+def load_templates(path: str) -> Dict[str, str]:
+    """Read the templates file: a JSON object of template names and format strings."""
+    with open(os.path.expanduser(path)) as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not all(isinstance(v, str) for v in data.values()):
+        raise ValueError(f"Templates file {path} must contain a JSON object of template names and format strings")
+    return data
+
+
+class Templates:
+    """The checked templates, defaults replaced by any overrides."""
+
+    def __init__(self, overrides: Optional[Dict[str, str]] = None):
+        overrides = overrides or {}
+        unknown = set(overrides) - set(DEFAULT_TEMPLATES)
+        if unknown:
+            raise ValueError(
+                f"Unknown template(s) {', '.join(sorted(unknown))}; use {', '.join(DEFAULT_TEMPLATES)}"
+            )
+        self._templates = {
+            name: Template(name, overrides.get(name, source)) for name, source in DEFAULT_TEMPLATES.items()
+        }
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "Templates":
+        return cls(load_templates(settings.templates_file) if settings.templates_file else None)
+
+    def __getitem__(self, name: str) -> Template:
+        return self._templates[name]
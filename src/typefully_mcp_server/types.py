@@ -1,8 +1,8 @@
 """Type definitions for Typefully API."""
 
 from datetime import datetime
-from typing import Optional, Literal, Union
-from pydantic import BaseModel, Field
+from typing import List, Optional, Literal, Union
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class Draft(BaseModel):
@@ -16,6 +16,13 @@ class Draft(BaseModel):
     share_url: Optional[str] = None
     twitter_url: Optional[str] = None
     linkedin_url: Optional[str] = None
+    account: Optional[str] = Field(None, description="Account the draft belongs to, when reading from several")
+
+
+# Validates a whole list response straight from the raw bytes: pydantic-core
+# parses the JSON itself, so no intermediate dicts are built and fields the
+# model doesn't declare are skipped without being turned into Python objects.
+DRAFT_LIST_ADAPTER = TypeAdapter(List[Draft])
 
 
 class CreateDraftRequest(BaseModel):
@@ -35,9 +42,51 @@ class CreateDraftRequest(BaseModel):
         populate_by_name = True
 
 
+# Output formats of the draft list tools
+ListFormat = Literal["full", "compact", "json"]
+
+
 class GetDraftsRequest(BaseModel):
     """Request model for getting drafts."""
     content_filter: Optional[Literal["threads", "tweets"]] = Field(
         None,
         description="Filter drafts to only include tweets or threads"
-    ) 
\ No newline at end of file
+    )
+    limit: Optional[int] = Field(None, ge=0, description="Maximum number of drafts to return (0 for all)")
+    cursor: Optional[str] = Field(None, description="Continue from a previous response's cursor")
+    format: Optional[ListFormat] = Field(
+        None,
+        description="'full' (default), 'compact' (one line per draft) or 'json'"
+    )
+    max_chars: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Character budget for the response, roughly 4 characters per token (0 for no limit)"
+    )
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of one draft in a batch create."""
+    index: int
+    draft: Optional[Draft] = None
+    error: Optional[str] = None
+    elapsed: float = Field(0.0, description="Seconds spent on this item, including time waiting for a slot")
+
+    @property
+    def ok(self) -> bool:
+        return self.draft is not None
+
+
+class BatchCreateResult(BaseModel):
+    """Outcome of a batch create."""
+    results: List[BatchItemResult]
+    elapsed: float = Field(0.0, description="Wall-clock seconds for the whole batch")
+    max_concurrency: int
+
+    @property
+    def succeeded(self) -> List[BatchItemResult]:
+        return [item for item in self.results if item.ok]
+
+    @property
+    def failed(self) -> List[BatchItemResult]:
+        return [item for item in self.results if not item.ok]
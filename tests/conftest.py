@@ -0,0 +1,38 @@
+"""Shared fixtures: the server, talking to the mock Typefully API from benchmarks/mock_api.py."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+# Read when the server module is imported
+os.environ.setdefault("TYPEFULLY_API_KEY", "test-key")
+os.environ.setdefault("TYPEFULLY_STORE_PATH", ":memory:")
+os.environ.setdefault("TYPEFULLY_DATA_DIR", tempfile.mkdtemp(prefix="typefully-tests-"))
+
+from mock_api import MockConfig, MockTypefullyAPI  # noqa: E402
+
+MOCK_BASE_URL = "http://mock.typefully.local/v1"
+
+
+@pytest.fixture
+def mock_api() -> MockTypefullyAPI:
+    return MockTypefullyAPI(MockConfig(latency_ms=0, jitter_ms=0, drafts=10))
+
+
+@pytest.fixture
+def server(mock_api):
+    """The server module, its clients pointed at the mock API."""
+    from typefully_mcp_server import server
+
+    settings = server.settings.model_copy(update={
+        "base_url": MOCK_BASE_URL, "retry_backoff_base": 0.01, "cache_ttl_scheduled": 0.0, "cache_ttl_published": 0.0,
+    })
+    server.accounts.configure(settings, transport=httpx.ASGITransport(app=mock_api.app))
+    server.draft_sync.snapshots.clear()
+    yield server
+    server.accounts.configure(server.settings)
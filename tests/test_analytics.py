@@ -0,0 +1,78 @@
+"""Tests for counting stored drafts with one GROUP BY, in a local time zone."""
+
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from typefully_mcp_server.analytics import draft_stats, utc_offsets
+from typefully_mcp_server.store import DraftStore
+from typefully_mcp_server.types import Draft
+
+
+def draft(draft_id: int, num_tweets: int = 1, **fields) -> Draft:
+    return Draft(id=draft_id, text_first_tweet=f"Draft {draft_id}", num_tweets=num_tweets, **fields)
+
+
+@pytest.fixture
+def store() -> DraftStore:
+    store = DraftStore()
+    store.upsert([
+        # Around the spring and autumn daylight saving changes in Prague
+        draft(1, scheduled_date="2030-03-30T08:00:00Z"),
+        draft(2, 3, scheduled_date="2030-03-31T08:00:00Z"),
+        draft(3, published_on="2030-10-27T00:30:00Z", twitter_url="https://x.com/a/status/3"),
+        draft(4, 2, published_on="2030-10-27T01:30:00Z", twitter_url="https://x.com/a/status/4"),
+        draft(5),
+    ])
+    store.upsert([draft(6, 2, scheduled_date="2030-03-30T08:00:00Z")], account="work")
+    return store
+
+
+def test_utc_offsets():
+    zone = ZoneInfo("Europe/Prague")
+    start, end = datetime(2030, 3, 1, tzinfo=timezone.utc), datetime(2030, 11, 1, tzinfo=timezone.utc)
+    assert utc_offsets(zone, start, end) == [
+        (start, 60),
+        (datetime(2030, 3, 31, 1, 0, tzinfo=timezone.utc), 120),
+        (datetime(2030, 10, 27, 1, 0, tzinfo=timezone.utc), 60),
+    ]
+    assert utc_offsets(ZoneInfo("UTC"), start, end) == [(start, 0)]
+
+
+def test_group_by_columns(store):
+    stats = draft_stats(store, ["kind", "status"])
+    assert [(group.key, group.drafts, group.tweets) for group in stats.groups] == [
+        (("thread", "published"), 1, 2),
+        (("thread", "scheduled"), 2, 5),
+        (("tweet", "draft"), 1, 1),
+        (("tweet", "published"), 1, 1),
+        (("tweet", "scheduled"), 1, 1),
+    ]
+    assert (stats.drafts, stats.tweets) == (6, 10)
+    by_account = draft_stats(store, ["account"], status="scheduled", account="work")
+    assert [(group.key, group.drafts) for group in by_account.groups] == [(("work",), 1)]
+
+
+def test_hours_follow_daylight_saving(store):
+    stats = draft_stats(store, ["hour"], tz="Europe/Prague")
+    # 08:00 UTC is 09:00 in winter and 10:00 in summer; both 02:30s of the autumn change count as 02:00
+    assert [(group.key, group.drafts) for group in stats.groups] == [
+        (("02:00",), 2), (("09:00",), 2), (("10:00",), 1), (("undated",), 1),
+    ]
+    utc = draft_stats(store, ["hour"])
+    assert [group.key for group in utc.groups] == [("00:00",), ("01:00",), ("08:00",), ("undated",)]
+
+
+def test_weekdays_and_weeks(store):
+    stats = draft_stats(store, ["weekday"], tz="Europe/Prague", since="2030-03-01", until="2030-04-01")
+    assert [(group.key, group.drafts) for group in stats.groups] == [(("Sat",), 2), (("Sun",), 1)]
+    weeks = draft_stats(store, ["week"], tz="Europe/Prague", status="published")
+    assert [group.key for group in weeks.groups] == [("2030-W43",)]
+
+
+def test_invalid_arguments(store):
+    with pytest.raises(ValueError, match="Can't group by 'colour'"):
+        draft_stats(store, ["colour"])
+    with pytest.raises(ValueError, match="Unknown time zone"):
+        draft_stats(store, ["hour"], tz="Mars/Olympus")
@@ -0,0 +1,98 @@
+"""Tests for the draft archive shared between server processes."""
+
+import multiprocessing
+import sys
+
+import pytest
+
+from typefully_mcp_server.archive import DraftArchive
+from typefully_mcp_server.types import Draft
+
+
+def draft(id: int, text: str, scheduled_date: str = "2024-01-15T10:30:00Z") -> Draft:
+    return Draft(id=id, text=text, text_first_tweet=text, num_tweets=1, scheduled_date=scheduled_date)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "drafts.archive")
+
+
+def test_versions_and_dedup(path):
+    archive = DraftArchive(path)
+    assert archive.append([draft(1, "hello"), draft(2, "world")]) == 2
+    assert archive.append([draft(1, "hello")]) == 0
+    assert archive.append([draft(1, "hello again")]) == 1
+    assert [v.draft.text for v in archive.history(1)] == ["hello", "hello again"]
+    assert archive.latest(2).draft.text == "world"
+    assert archive.versions == 3
+
+
+def test_text_kept_when_missing_from_listing(path):
+    archive = DraftArchive(path)
+    archive.append([draft(1, "full text")])
+    listed = draft(1, "full text").model_copy(update={"text": None})
+    assert archive.append([listed]) == 0
+    changed = listed.model_copy(update={"scheduled_date": "2024-02-01T10:30:00Z"})
+    assert archive.append([changed]) == 1
+    assert archive.latest(1).draft.text == "full text"
+
+
+def test_interleaved_appends_from_two_instances(path):
+    a, b = DraftArchive(path), DraftArchive(path)
+    a.append([draft(1, "hello a")])
+    b.append([draft(2, "hello b")])
+    a.append([draft(3, "hello c")])
+    b.append([draft(1, "hello a, edited")])
+
+    for archive in (a, b, DraftArchive(path)):
+        assert archive.history(3)[0].draft.text == "hello c"
+        assert [v.draft.text for v in archive.history(1)] == ["hello a", "hello a, edited"]
+        assert {v.draft.id for v in archive.query()} == {1, 2, 3}
+        assert archive.versions == 4
+
+
+def test_append_dedupes_against_other_instances(path):
+    a, b = DraftArchive(path), DraftArchive(path)
+    assert len(b) == 0
+    a.append([draft(1, "hello")])
+    # b hasn't seen draft 1 yet, but indexes a's block before writing
+    assert b.append([draft(1, "hello")]) == 0
+    assert len(a.history(1)) == 1
+
+
+def test_reopen_truncates_torn_tail(path):
+    archive = DraftArchive(path)
+    archive.append([draft(1, "hello")])
+    size = archive.size
+    archive.close()
+    with open(path, "ab") as f:
+        f.write(b"TFA1 torn block")
+
+    reopened = DraftArchive(path)
+    assert reopened.latest(1).draft.text == "hello"
+    assert reopened.size == size
+    reopened.append([draft(2, "world")])
+    assert {v.draft.id for v in DraftArchive(path).query()} == {1, 2}
+
+
+def _append_many(path: str, worker: int, count: int) -> None:
+    archive = DraftArchive(path)
+    for i in range(count):
+        archive.append([draft(worker * 1000 + i, f"worker {worker} draft {i}")])
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="archive locking needs fcntl")
+def test_concurrent_processes(path):
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_append_many, args=(path, worker, 20)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+
+    archive = DraftArchive(path)
+    assert len(archive) == 80
+    assert archive.versions == 80
+    assert archive.latest(3019).draft.text == "worker 3 draft 19"
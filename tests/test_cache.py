@@ -0,0 +1,79 @@
+"""Tests for the response cache of the list endpoints."""
+
+import asyncio
+
+import httpx
+
+from typefully_mcp_server.cache import ResponseCache
+from typefully_mcp_server.client import TypefullyClient
+from typefully_mcp_server.config import Settings
+from typefully_mcp_server.types import CreateDraftRequest
+
+from conftest import MOCK_BASE_URL
+
+
+def test_ttl_and_validators(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("typefully_mcp_server.cache.time.monotonic", lambda: now[0])
+    cache = ResponseCache(ttls={"/a/": 10.0})
+    cache.set(("/a/", None), ["a"], etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    entry = cache.get(("/a/", None))
+    assert entry.fresh
+    now[0] += 11
+    # Stale entries are kept, to be revalidated
+    assert not cache.get(("/a/", None)).fresh
+    assert entry.validators() == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    cache.refresh(("/a/", None))
+    assert entry.fresh
+    assert cache.stats.revalidations == 1
+    # Paths without a TTL aren't cached
+    cache.set(("/b/", None), ["b"])
+    assert cache.get(("/b/", None)) is None
+
+
+def test_lru_eviction_and_invalidation():
+    cache = ResponseCache(default_ttl=60.0, max_entries=2)
+    cache.set(("/a/", 1), 1)
+    cache.set(("/a/", 2), 2)
+    cache.get(("/a/", 1))
+    cache.set(("/b/", 3), 3)
+    assert cache.get(("/a/", 2)) is None
+    assert cache.stats.evictions == 1
+    cache.invalidate("/a/")
+    assert len(cache) == 1 and cache.stats.invalidations == 1
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def client_for(mock_api, **settings) -> TypefullyClient:
+    settings = Settings(base_url=MOCK_BASE_URL, **settings)
+    return TypefullyClient(api_key="test-key", settings=settings, transport=httpx.ASGITransport(app=mock_api.app))
+
+
+def test_client_serves_fresh_lists_from_cache(mock_api):
+    async def run():
+        async with client_for(mock_api) as client:
+            first = await client.get_scheduled_drafts()
+            second = await client.get_scheduled_drafts()
+            assert first == second
+            assert mock_api.requests == 1
+            assert client.cache.stats.hits == 1
+            # Creating a draft drops the cached scheduled list
+            await client.create_draft(CreateDraftRequest(content="New"))
+            await client.get_scheduled_drafts()
+            assert mock_api.requests == 3
+    asyncio.run(run())
+
+
+def test_client_revalidates_stale_lists(mock_api):
+    async def run():
+        async with client_for(mock_api, cache_ttl_scheduled=60.0) as client:
+            first = await client.get_scheduled_drafts()
+            # refresh=True revalidates even a fresh entry; the mock answers 304
+            assert await client.get_scheduled_drafts(refresh=True) == first
+            assert mock_api.requests == 2
+            assert client.cache.stats.revalidations == 1
+            mock_api.lists["scheduled"] = mock_api._encode([])
+            assert await client.get_scheduled_drafts(refresh=True) == []
+            assert client.cache.stats.revalidations == 1
+    asyncio.run(run())
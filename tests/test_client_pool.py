@@ -0,0 +1,61 @@
+"""Tests for the pool of clients for session API keys."""
+
+import asyncio
+
+import httpx
+
+from typefully_mcp_server.client import ClientPool
+from typefully_mcp_server.config import Settings
+
+from conftest import MOCK_BASE_URL
+
+
+def pool(mock_api, **settings) -> ClientPool:
+    return ClientPool(Settings(base_url=MOCK_BASE_URL, **settings), httpx.ASGITransport(app=mock_api.app))
+
+
+def test_least_recently_used_closed_over_limit(mock_api):
+    async def run():
+        clients = pool(mock_api, session_clients_max=2)
+        a = await clients.get("key-a")
+        await clients.get("key-b")
+        await clients.get("key-a")
+        await clients.get("key-c")
+        assert len(clients) == 2
+        assert clients.evicted == 1
+        assert a.client is not None
+        assert "key-b" not in clients._clients
+        # Reopened on its next use
+        b = await clients.get("key-b")
+        assert b.client is not None
+        assert len(clients) == 2
+        await clients.aclose()
+    asyncio.run(run())
+
+
+def test_idle_clients_closed(mock_api, monkeypatch):
+    async def run():
+        clients = pool(mock_api, session_client_idle_ttl=60)
+        a = await clients.get("key-a")
+        now = clients._last_used["key-a"]
+        monkeypatch.setattr("typefully_mcp_server.client.time.monotonic", lambda: now + 61)
+        await clients.get("key-b")
+        assert list(clients._clients) == ["key-b"]
+        assert a.client is None
+        await clients.aclose()
+    asyncio.run(run())
+
+
+def test_held_clients_stay_open(mock_api):
+    async def run():
+        clients = pool(mock_api, session_clients_max=1)
+        with clients.hold("key-a"):
+            a = await clients.get("key-a")
+            await clients.get("key-b")
+            assert a.client is not None
+            await a.get_scheduled_drafts()
+        await clients.get("key-c")
+        assert list(clients._clients) == ["key-c"]
+        assert a.client is None
+        await clients.aclose()
+    asyncio.run(run())
@@ -0,0 +1,93 @@
+"""Tests for sharing one upstream request between concurrent identical list reads."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from typefully_mcp_server.client import TypefullyClient
+from typefully_mcp_server.config import Settings
+from typefully_mcp_server.types import CreateDraftRequest
+
+from mock_api import MockConfig, MockTypefullyAPI
+from conftest import MOCK_BASE_URL
+
+
+@pytest.fixture
+def slow_api() -> MockTypefullyAPI:
+    return MockTypefullyAPI(MockConfig(latency_ms=50, jitter_ms=0, drafts=5))
+
+
+def client_for(mock_api) -> TypefullyClient:
+    settings = Settings(base_url=MOCK_BASE_URL, cache_ttl_scheduled=0.0)
+    return TypefullyClient(api_key="test-key", settings=settings, transport=httpx.ASGITransport(app=mock_api.app))
+
+
+def test_concurrent_reads_share_one_request(slow_api):
+    async def run():
+        async with client_for(slow_api) as client:
+            results = await asyncio.gather(*(client.get_scheduled_drafts() for _ in range(5)))
+            assert all(result == results[0] for result in results)
+            assert slow_api.requests == 1
+            assert client.coalesced == 4
+            # A different filter is a different request
+            await asyncio.gather(client.get_scheduled_drafts(), client.get_scheduled_drafts("threads"))
+            assert slow_api.requests == 3
+    asyncio.run(run())
+
+
+def test_cancelled_caller_leaves_the_request_to_the_others(slow_api):
+    async def run():
+        async with client_for(slow_api) as client:
+            leaving = asyncio.ensure_future(client.get_scheduled_drafts())
+            staying = asyncio.ensure_future(client.get_scheduled_drafts())
+            await asyncio.sleep(0.01)
+            leaving.cancel()
+            assert len(await staying) == 5
+            assert leaving.cancelled()
+            assert slow_api.requests == 1
+    asyncio.run(run())
+
+
+def test_request_cancelled_once_every_caller_left(slow_api):
+    async def run():
+        async with client_for(slow_api) as client:
+            callers = [asyncio.ensure_future(client.get_scheduled_drafts()) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            [fetch] = client._inflight.values()
+            for caller in callers:
+                caller.cancel()
+            await asyncio.gather(*callers, return_exceptions=True)
+            await asyncio.sleep(0)
+            assert fetch.cancelled()
+            assert not client._inflight
+    asyncio.run(run())
+
+
+def test_read_after_create_does_not_join_an_older_request():
+    scheduled = [[{"id": 1, "text_first_tweet": "Old", "num_tweets": 1}]]
+    gets = []
+
+    async def api(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            scheduled[0] = scheduled[0] + [{"id": 2, "text_first_tweet": "New", "num_tweets": 1}]
+            return httpx.Response(200, json=scheduled[0][-1])
+        drafts = scheduled[0]
+        # The first read is the slowest, so it answers last
+        gets.append(request)
+        await asyncio.sleep(0.1 if len(gets) == 1 else 0.01)
+        return httpx.Response(200, json=drafts)
+
+    async def run():
+        settings = Settings(base_url=MOCK_BASE_URL, cache_ttl_scheduled=60.0)
+        async with TypefullyClient(api_key="test-key", settings=settings, transport=httpx.MockTransport(api)) as client:
+            before = asyncio.ensure_future(client.get_scheduled_drafts())
+            await asyncio.sleep(0.01)
+            await client.create_draft(CreateDraftRequest(content="New"))
+            after = await client.get_scheduled_drafts()
+            assert not before.done()
+            assert [draft.id for draft in await before] == [1]
+            assert [draft.id for draft in after] == [1, 2]
+            # The older request finished last, but isn't cached
+            assert [draft.id for draft in await client.get_scheduled_drafts()] == [1, 2]
+    asyncio.run(run())
@@ -0,0 +1,139 @@
+"""Tests for end-to-end deadlines of tool calls and hedged list reads."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from typefully_mcp_server.client import TypefullyClient
+from typefully_mcp_server.config import Settings
+from typefully_mcp_server.deadline import DeadlineExceeded, deadline, remaining, within_deadline
+
+from conftest import MOCK_BASE_URL
+
+DRAFTS = [{"id": 1, "text_first_tweet": "Hello", "num_tweets": 1}]
+
+
+def test_nested_deadlines_only_shorten():
+    assert remaining() is None
+    with deadline(10):
+        assert 9 < remaining() <= 10
+        with deadline(60):
+            assert remaining() <= 10
+        with deadline(1):
+            assert remaining() <= 1
+        with deadline(0):
+            assert remaining() <= 10
+    assert remaining() is None
+
+
+def test_passed_deadline_raises():
+    async def run():
+        with deadline(0.05):
+            with pytest.raises(DeadlineExceeded, match="Timed out after 0.05s"):
+                await within_deadline(asyncio.sleep(1))
+            with pytest.raises(DeadlineExceeded):
+                remaining()
+            # An awaitable never started once time is up
+            coroutine = asyncio.sleep(1)
+            with pytest.raises(DeadlineExceeded):
+                await within_deadline(coroutine)
+            assert coroutine.cr_frame is None
+    asyncio.run(run())
+
+
+def test_own_timeouts_are_not_deadline_errors():
+    async def fails():
+        raise asyncio.TimeoutError()
+
+    async def run():
+        with deadline(10):
+            with pytest.raises(asyncio.TimeoutError) as raised:
+                await within_deadline(fails())
+            assert not isinstance(raised.value, DeadlineExceeded)
+    asyncio.run(run())
+
+
+def client_for(handler, **settings) -> TypefullyClient:
+    settings = Settings(base_url=MOCK_BASE_URL, retry_backoff_base=0.0, cache_ttl_scheduled=0.0, **settings)
+    return TypefullyClient(api_key="test-key", settings=settings, transport=httpx.MockTransport(handler)).open()
+
+
+def test_client_gives_up_at_the_deadline():
+    async def slow(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(1)
+        return httpx.Response(200, json=DRAFTS)
+
+    async def run():
+        client = client_for(slow)
+        started = time.monotonic()
+        with deadline(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await client.get_scheduled_drafts()
+        assert time.monotonic() - started < 0.5
+    asyncio.run(run())
+
+
+def test_no_retry_that_would_outlast_the_deadline():
+    requests = []
+
+    def unavailable(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(503, headers={"Retry-After": "5"})
+
+    async def run():
+        client = client_for(unavailable)
+        with deadline(1):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.get_scheduled_drafts()
+    asyncio.run(run())
+    assert len(requests) == 1
+
+
+def test_tool_call_timeout(server, mock_api):
+    mock_api.config.latency_ms = 1000
+
+    async def run():
+        async with server.server_lifespan(server.app):
+            return (await server.call_tool("get_scheduled_drafts", {"timeout": 0.05}))[0].text
+    assert asyncio.run(run()).startswith("❌ Error: Timed out after 0.05s")
+
+
+def test_slow_reads_are_hedged():
+    requests = []
+
+    async def first_is_slow(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) == 1:
+            await asyncio.sleep(1)
+            return httpx.Response(200, json=[])
+        return httpx.Response(200, json=DRAFTS)
+
+    async def run():
+        client = client_for(first_is_slow, hedge_reads=True, hedge_min_delay=0.01)
+        for _ in range(client.latency.min_samples):
+            client.latency.record(0.001)
+        started = time.monotonic()
+        drafts = await client.get_scheduled_drafts()
+        assert time.monotonic() - started < 0.5
+        return drafts, client.hedges
+    drafts, hedges = asyncio.run(run())
+    assert [draft.id for draft in drafts] == [1]
+    assert hedges == 1 and len(requests) == 2
+
+
+def test_reads_not_hedged_without_latency_history():
+    requests = []
+
+    async def slowish(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=DRAFTS)
+
+    async def run():
+        client = client_for(slowish, hedge_reads=True, hedge_min_delay=0.01)
+        await client.get_scheduled_drafts()
+        return client.hedges
+    assert asyncio.run(run()) == 0
+    assert len(requests) == 1
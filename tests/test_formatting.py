@@ -0,0 +1,73 @@
+"""Tests for paging the list tools' output and keeping it within a character budget."""
+
+import asyncio
+import json
+
+import pytest
+
+from typefully_mcp_server.formatting import format_draft_list, format_preview, page_bounds
+from typefully_mcp_server.types import Draft
+
+DRAFTS = [Draft(id=i, text_first_tweet=f"Draft {i} " + "x" * 200, num_tweets=1 + i % 2,
+                scheduled_date=f"2030-01-{1 + i:02d}T09:00:00Z") for i in range(10)]
+
+
+def test_page_bounds():
+    assert page_bounds(10, None, None) == (0, 10)
+    assert page_bounds(10, "4", 3) == (4, 7)
+    assert page_bounds(10, "8", 5) == (8, 10)
+    assert page_bounds(10, "20", 5) == (10, 10)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        page_bounds(10, "next", 5)
+
+
+def test_pages_follow_the_cursor():
+    first = format_draft_list(DRAFTS, "scheduled", limit=4)
+    assert first.startswith("📅 Found 10 scheduled draft(s), showing 1-4:")
+    assert "Draft ID 3" in first and "Draft ID 4" not in first
+    assert first.endswith('Call again with cursor="4" for the next page.')
+    last = format_draft_list(DRAFTS, "scheduled", cursor="8", limit=4)
+    assert "showing 9-10" in last
+    assert "cursor=" not in last
+    assert format_draft_list(DRAFTS, "scheduled", cursor="10") == "No more scheduled drafts (total 10)."
+
+
+def test_budget_cuts_the_page_short():
+    page = format_draft_list(DRAFTS, "scheduled", max_chars=1000)
+    assert len(page) <= 1000
+    shown = page.count("Draft ID")
+    assert 0 < shown < 10
+    assert f'cursor="{shown}"' in page
+    # A single draft over the budget is still shown, cut off
+    tiny = format_draft_list(DRAFTS, "scheduled", output_format="compact", max_chars=220)
+    assert "#0 |" in tiny and "…\n" in tiny
+    assert 'cursor="1"' in tiny
+
+
+def test_compact_and_json_formats():
+    compact = format_draft_list(DRAFTS[:2], "scheduled", output_format="compact")
+    assert compact.splitlines()[1].startswith("1. #0 | 2030-01-01T09:00:00Z | 1 tweet(s) | Draft 0 x")
+    page = json.loads(format_draft_list(DRAFTS, "scheduled", limit=3, output_format="json"))
+    assert (page["total"], page["offset"], page["next_cursor"]) == (10, 0, "3")
+    assert [draft["id"] for draft in page["drafts"]] == [0, 1, 2]
+    budgeted = json.loads(format_draft_list(DRAFTS, "scheduled", output_format="json", max_chars=600))
+    assert 0 < len(budgeted["drafts"]) < 10
+    with pytest.raises(ValueError, match="Unknown format"):
+        format_draft_list(DRAFTS, "scheduled", output_format="yaml")
+
+
+def test_preview():
+    preview = format_preview(DRAFTS, limit=3)
+    assert len(preview.splitlines()) == 4
+    assert preview.endswith("… and 7 more")
+
+
+def test_list_tool_pages(server):
+    async def run():
+        async with server.server_lifespan(server.app):
+            first = await server.call_tool("get_scheduled_drafts", {"limit": 4, "format": "compact"})
+            second = await server.call_tool("get_scheduled_drafts", {"limit": 4, "cursor": "4", "format": "compact"})
+            return first[0].text, second[0].text
+    first, second = asyncio.run(run())
+    assert "showing 1-4" in first and 'cursor="4"' in first
+    assert "showing 5-8" in second and 'cursor="8"' in second
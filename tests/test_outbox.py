@@ -0,0 +1,217 @@
+"""Tests for the outbox: claiming entries, classifying send failures and resending safely."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from typefully_mcp_server.client import TypefullyClient
+from typefully_mcp_server.config import Settings
+from typefully_mcp_server.outbox import (
+    CLAIM_LEASE, FAILED, PENDING, SENDING, SENT, Outbox, OutboxWorker, classify_error, same_instant,
+)
+from typefully_mcp_server.preflight import PreflightError, preflight
+from typefully_mcp_server.similarity import DuplicateDraftError
+from typefully_mcp_server.types import CreateDraftRequest
+
+from conftest import MOCK_BASE_URL
+
+
+def draft(content: str) -> CreateDraftRequest:
+    return CreateDraftRequest(content=content)
+
+
+def status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", f"{MOCK_BASE_URL}/drafts/")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status, request=request))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "outbox.sqlite3")
+
+
+def test_claim_due_entries_once(path):
+    outbox = Outbox(path)
+    for i in range(3):
+        outbox.enqueue(draft(f"Draft {i}"), now=100.0)
+    outbox.enqueue(draft("Later"), now=500.0)
+
+    first = outbox.claim(2, "worker-a", now=200.0)
+    assert [entry.id for entry in first] == [1, 2]
+    assert all(entry.status == SENDING and entry.attempts == 1 for entry in first)
+    # A second process sharing the file gets the rest
+    second = Outbox(path).claim(10, "worker-b", now=200.0)
+    assert [entry.id for entry in second] == [3]
+    assert outbox.claim(10, "worker-a", now=200.0) == []
+
+
+def test_claim_takes_over_expired_lease(path):
+    outbox = Outbox(path)
+    outbox.enqueue(draft("Draft"), now=100.0)
+    assert len(outbox.claim(1, "crashed", now=100.0)) == 1
+    assert outbox.claim(1, "worker", now=100.0 + CLAIM_LEASE - 1) == []
+    [entry] = outbox.claim(1, "worker", now=100.0 + CLAIM_LEASE + 1)
+    assert entry.maybe_sent
+    assert entry.attempts == 2
+
+
+def test_duplicates_not_queued_twice(path):
+    outbox = Outbox(path)
+    entry, queued = outbox.enqueue(draft("Same"), now=100.0)
+    again, queued_again = outbox.enqueue(draft("Same"), now=200.0)
+    assert queued and not queued_again
+    assert again.id == entry.id
+
+
+@pytest.mark.parametrize("error, retryable, maybe_sent", [
+    (PreflightError(preflight(draft(" "))), False, False),
+    (DuplicateDraftError([]), False, False),
+    (status_error(400), False, False),
+    (status_error(422), False, False),
+    (status_error(429), True, False),
+    (status_error(503), True, True),
+    (httpx.ConnectError("refused"), True, False),
+    (httpx.ReadTimeout("slow"), True, True),
+    (ValueError("unexpected"), True, True),
+])
+def test_classify_error(error, retryable, maybe_sent):
+    assert classify_error(error) == (retryable, maybe_sent)
+
+
+def worker_for(outbox: Outbox, transport: httpx.AsyncBaseTransport) -> OutboxWorker:
+    settings = Settings(base_url=MOCK_BASE_URL, outbox_backoff_base=0.0, retry_backoff_base=0.0)
+    client = TypefullyClient(api_key="test-key", settings=settings, transport=transport).open()
+
+    async def get_client(account: str) -> TypefullyClient:
+        return client
+    return OutboxWorker(outbox, get_client, settings)
+
+
+def test_worker_sends_drafts(mock_api):
+    outbox = Outbox()
+    entry, _ = outbox.enqueue(draft("Hello"))
+    worker = worker_for(outbox, httpx.ASGITransport(app=mock_api.app))
+    assert asyncio.run(worker.drain_once()) == 1
+    sent = outbox.get(entry.id)
+    assert sent.status == SENT
+    assert sent.draft_id == 3_000_000
+
+
+def test_unreadable_response_is_sent_unconfirmed():
+    outbox = Outbox()
+    entry, _ = outbox.enqueue(draft("Hello"))
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b"<html>"))
+    worker = worker_for(outbox, transport)
+    asyncio.run(worker.drain_once())
+    sent = outbox.get(entry.id)
+    assert sent.status == SENT
+    assert sent.draft_id is None
+    assert "created" in sent.last_error
+    assert outbox.claim(10, "worker") == []
+
+
+def test_rejected_draft_fails_and_server_error_retries():
+    statuses = iter([400, 503])
+    outbox = Outbox()
+    rejected, _ = outbox.enqueue(draft("Rejected"))
+    transport = httpx.MockTransport(lambda request: httpx.Response(next(statuses), json={"detail": "no"}))
+    worker = worker_for(outbox, transport)
+    asyncio.run(worker.drain_once())
+    assert outbox.get(rejected.id).status == FAILED
+
+    retried, _ = outbox.enqueue(draft("Retried"))
+    asyncio.run(worker.drain_once())
+    entry = outbox.get(retried.id)
+    assert entry.status == PENDING
+    assert entry.maybe_sent
+
+
+class FakeAPI:
+    """Serves a fixed scheduled list and records the drafts posted."""
+
+    def __init__(self, scheduled, status: int = 200):
+        self.scheduled = scheduled
+        self.status = status
+        self.posted = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            return httpx.Response(200, json=self.scheduled)
+        self.posted.append(request)
+        if self.status != 200:
+            return httpx.Response(self.status, json={"detail": "schedule_date is in the past"})
+        return httpx.Response(200, json={"id": 99, "text_first_tweet": "Posted", "num_tweets": 1})
+
+
+def interrupted(outbox: Outbox, request: CreateDraftRequest) -> int:
+    """Queue a draft and leave it as a crashed worker would."""
+    entry, _ = outbox.enqueue(request, now=0.0)
+    outbox.claim(1, "crashed", now=0.0)
+    outbox.claim(1, "worker", now=CLAIM_LEASE + 1)
+    outbox.retry_later(entry.id, -1.0, "Interrupted", maybe_sent=True)
+    return entry.id
+
+
+def scheduled_draft(id: int, first_tweet: str, date: str) -> dict:
+    return {"id": id, "text_first_tweet": first_tweet, "num_tweets": 2, "scheduled_date": date}
+
+
+@pytest.mark.parametrize("a, b, same", [
+    ("2030-01-01T09:00:00Z", "2030-01-01T09:00:00.000Z", True),
+    ("2030-01-01T10:00:00+01:00", "2030-01-01T09:00:00Z", True),
+    ("2030-01-01T09:00:00", "2030-01-01T09:00:00Z", True),
+    ("2030-01-01T09:00:00Z", "2030-01-01T09:01:00Z", False),
+    ("2030-01-01T09:00:00Z", None, False),
+])
+def test_same_instant(a, b, same):
+    assert same_instant(a, b) == same
+
+
+def test_interrupted_draft_found_by_exact_match():
+    outbox = Outbox()
+    request = CreateDraftRequest(content="Launch day\n\n\n\nDetails", schedule_date="2030-01-01T10:00:00+01:00")
+    entry_id = interrupted(outbox, request)
+    api = FakeAPI([scheduled_draft(7, "Launch day", "2030-01-01T09:00:00Z")])
+    asyncio.run(worker_for(outbox, httpx.MockTransport(api)).drain_once())
+    entry = outbox.get(entry_id)
+    assert (entry.status, entry.draft_id) == (SENT, 7)
+    assert api.posted == []
+
+
+@pytest.mark.parametrize("first_tweet, date", [
+    ("Launch", "2030-01-01T09:00:00Z"),  # Only a prefix of the queued first tweet
+    ("Launch day", "2030-01-02T09:00:00Z"),  # Another date
+])
+def test_similar_draft_not_taken_for_interrupted_one(first_tweet, date):
+    outbox = Outbox()
+    request = CreateDraftRequest(content="Launch day\n\n\n\nDetails", schedule_date="2030-01-01T09:00:00Z")
+    entry_id = interrupted(outbox, request)
+    api = FakeAPI([scheduled_draft(7, first_tweet, date)])
+    asyncio.run(worker_for(outbox, httpx.MockTransport(api)).drain_once())
+    entry = outbox.get(entry_id)
+    assert (entry.status, entry.draft_id) == (SENT, 99)
+    assert len(api.posted) == 1
+
+
+def test_next_free_slot_match_left_unconfirmed():
+    outbox = Outbox()
+    entry_id = interrupted(outbox, CreateDraftRequest(content="Launch day", schedule_date="next-free-slot"))
+    api = FakeAPI([scheduled_draft(7, "Launch day", "2030-01-01T09:00:00Z")])
+    asyncio.run(worker_for(outbox, httpx.MockTransport(api)).drain_once())
+    entry = outbox.get(entry_id)
+    assert (entry.status, entry.draft_id) == (SENT, None)
+    assert "draft 7" in entry.last_error
+    assert api.posted == []
+
+
+def test_schedule_date_passed_while_queued():
+    outbox = Outbox()
+    # Passed preflight when queued; the API was down until after the date
+    entry, _ = outbox.enqueue(CreateDraftRequest(content="Late", schedule_date="2020-01-01T09:00:00Z"))
+    api = FakeAPI([], status=400)
+    asyncio.run(worker_for(outbox, httpx.MockTransport(api)).drain_once())
+    failed = outbox.get(entry.id)
+    assert len(api.posted) == 1
+    assert failed.status == FAILED
+    assert failed.last_error.startswith("schedule_date 2020-01-01T09:00:00Z passed while the draft was waiting")
@@ -0,0 +1,90 @@
+"""Tests for planning schedule dates around a cadence and the posts already scheduled."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from typefully_mcp_server.planner import Cadence, IntervalIndex, format_utc, plan_schedule, to_utc
+from typefully_mcp_server.types import CreateDraftRequest
+
+
+def utc(value: str) -> datetime:
+    return to_utc(value)
+
+
+def drafts(n: int, **fields) -> list:
+    return [CreateDraftRequest(content=f"Draft {i}", **fields) for i in range(n)]
+
+
+def test_interval_index_merges_overlapping_ranges():
+    index = IntervalIndex([utc("2030-01-01T10:00:00Z"), utc("2030-01-01T10:30:00Z"), utc("2030-01-01T15:00:00Z")],
+                          timedelta(minutes=60))
+    assert len(index) == 2
+    assert index.blocks(utc("2030-01-01T11:15:00Z"))
+    assert not index.blocks(utc("2030-01-01T11:30:00Z"))
+    assert not index.blocks(utc("2030-01-01T13:00:00Z"))
+    # A slot at exactly a scheduled time is blocked even without a gap
+    assert IntervalIndex([utc("2030-01-01T10:00:00Z")], timedelta(0)).blocks(utc("2030-01-01T10:00:00Z"))
+
+
+def test_slots_follow_local_time_across_daylight_saving():
+    cadence = Cadence.parse("Europe/Prague", ["02:30", "09:00"], ["sun", "mon"], 60)
+    slots = cadence.slots(utc("2030-03-30T00:00:00Z"))
+    # Sunday 31 March: 02:30 doesn't exist, 09:00 is CEST; Monday 1 April is CEST
+    assert [format_utc(next(slots)) for _ in range(3)] == [
+        "2030-03-31T07:00:00Z", "2030-04-01T00:30:00Z", "2030-04-01T07:00:00Z",
+    ]
+
+
+def test_plan_skips_slots_near_scheduled_posts():
+    cadence = Cadence.parse("UTC", ["09:00", "13:00"], ["mon", "tue", "wed", "thu", "fri"], 90)
+    scheduled = [utc("2030-01-07T08:00:00Z"), utc("2030-01-07T13:30:00Z")]
+    planned = plan_schedule(drafts(3), scheduled, cadence, start=utc("2030-01-05T00:00:00Z"))
+    # Saturday and Sunday are skipped, Monday's slots are too close to scheduled posts
+    assert [item.request.schedule_date for item in planned] == [
+        "2030-01-08T09:00:00Z", "2030-01-08T13:00:00Z", "2030-01-09T09:00:00Z",
+    ]
+    assert [item.index for item in planned] == [0, 1, 2]
+
+
+def test_pinned_drafts_keep_their_date_and_block_others():
+    cadence = Cadence.parse("UTC", ["09:00"], ["mon", "tue", "wed", "thu", "fri", "sat", "sun"], 60)
+    requests = drafts(1) + [CreateDraftRequest(content="Pinned", schedule_date="2030-01-01T09:30:00+00:00")] + drafts(1)
+    planned = plan_schedule(requests, [], cadence, start=utc("2030-01-01T00:00:00Z"))
+    assert planned[1].pinned
+    assert planned[1].request.schedule_date == "2030-01-01T09:30:00+00:00"
+    assert [planned[0].request.schedule_date, planned[2].request.schedule_date] == [
+        "2030-01-02T09:00:00Z", "2030-01-03T09:00:00Z",
+    ]
+
+
+def test_not_enough_slots():
+    cadence = Cadence.parse("UTC", ["09:00"], ["mon"], 60 * 24 * 200)
+    with pytest.raises(ValueError, match="Only 2 free slot"):
+        plan_schedule(drafts(3), [], cadence, start=datetime(2030, 1, 1, tzinfo=timezone.utc))
+
+
+@pytest.mark.parametrize("tz, times, days, message", [
+    ("Mars/Olympus", ["09:00"], ["mon"], "Unknown time zone"),
+    ("UTC", ["9am"], ["mon"], "HH:MM"),
+    ("UTC", ["09:00"], ["someday"], "Unknown weekday"),
+    ("UTC", [], ["mon"], "at least one posting time"),
+])
+def test_invalid_cadence(tz, times, days, message):
+    with pytest.raises(ValueError, match=message):
+        Cadence.parse(tz, times, days, 60)
+
+
+def test_plan_schedule_tool(server, mock_api):
+    async def run():
+        async with server.server_lifespan(server.app):
+            return (await server.call_tool("plan_schedule", {
+                "count": 3, "times": ["01:00"], "timezone": "UTC", "start": "2026-01-01T00:00:00Z",
+            }))[0].text
+    text = asyncio.run(run())
+    # The mock's first scheduled draft is at 2026-01-01T00:30:00Z
+    assert "2026-01-01T01:00:00Z" not in text
+    for day in ("02", "03", "04"):
+        assert f"2026-01-{day}T01:00:00Z" in text
+    assert mock_api.requests == 1
@@ -0,0 +1,84 @@
+"""Tests for local draft validation: tweet counting and schedule dates."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from typefully_mcp_server.preflight import _parse_iso8601, parse_schedule_date, preflight, split_tweets, weighted_length
+from typefully_mcp_server.types import CreateDraftRequest
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("text, length", [
+    ("hello", 5),
+    ("Read https://example.com/a/very/long/path/that/goes/on and more", 5 + 23 + 9),
+    ("example.com.", 23 + 1),
+    ("日本語", 6),
+    ("👍", 2),
+    ("👍🏽", 2),
+    ("👨‍👩‍👧", 2),
+    ("🇫🇷", 2),
+    ("café", 4),
+])
+def test_weighted_length(text, length):
+    assert weighted_length(text) == length
+
+
+def test_split_tweets():
+    assert split_tweets("one\n\n\n\ntwo") == ["one", "two"]
+    long = " ".join(f"Sentence number {i} of a long post." for i in range(20))
+    tweets = split_tweets(long, threadify=True)
+    assert len(tweets) > 1
+    assert all(weighted_length(tweet) <= 280 for tweet in tweets)
+
+
+def test_long_tweet_is_a_warning():
+    result = preflight(CreateDraftRequest(content="x" * 300), now=NOW)
+    assert result.ok
+    assert result.warnings == ["Tweet 1 is 300 characters, over the 280 limit of standard X accounts"]
+    assert preflight(CreateDraftRequest(content="x" * 300), max_length=0, now=NOW).warnings == []
+
+
+def test_empty_tweet_is_an_error():
+    result = preflight(CreateDraftRequest(content="one\n\n\n\n\n\n\n\ntwo"), now=NOW)
+    assert not result.ok
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-01-15T10:30:00Z", datetime(2024, 1, 15, 10, 30, tzinfo=timezone.utc)),
+    ("2024-01-15T10:30:00.5Z", datetime(2024, 1, 15, 10, 30, 0, 500000, tzinfo=timezone.utc)),
+    ("2024-01-15T10:30:00,123456789Z", datetime(2024, 1, 15, 10, 30, 0, 123456, tzinfo=timezone.utc)),
+    ("20240115T103000Z", datetime(2024, 1, 15, 10, 30, tzinfo=timezone.utc)),
+    ("2024-01-15T10:30:00+0530", datetime(2024, 1, 15, 10, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))),
+    ("2024-01-15T10:30-05:00", datetime(2024, 1, 15, 10, 30, tzinfo=timezone(-timedelta(hours=5)))),
+    ("2024-01-15 10:30", datetime(2024, 1, 15, 10, 30)),
+])
+def test_parse_schedule_date(value, expected):
+    assert parse_schedule_date(value) == expected
+    # The fallback for what fromisoformat rejects before Python 3.11
+    assert _parse_iso8601(value) == expected
+
+
+@pytest.mark.parametrize("value", ["tomorrow", "2024-13-01T10:00:00Z", "2024-01-15T25:00:00Z"])
+def test_parse_schedule_date_rejects(value):
+    with pytest.raises(ValueError):
+        parse_schedule_date(value)
+
+
+def test_schedule_date_checks():
+    result = preflight(CreateDraftRequest(content="hi", schedule_date="2024-01-15T10:30:00.5+01:00"), now=NOW)
+    assert result.ok
+    assert result.schedule_date == "2024-01-15T09:30:00Z"
+
+    past = preflight(CreateDraftRequest(content="hi", schedule_date="2023-12-31T10:30:00Z"), now=NOW)
+    assert past.errors == ["schedule_date 2023-12-31T10:30:00Z is in the past"]
+
+    # Left for the API to judge
+    unreadable = preflight(CreateDraftRequest(content="hi", schedule_date="next tuesday"), now=NOW)
+    assert unreadable.ok
+    assert unreadable.schedule_date == "next tuesday"
+    assert len(unreadable.warnings) == 1
+
+    naive = preflight(CreateDraftRequest(content="hi", schedule_date="2024-01-15T10:30"), now=NOW)
+    assert naive.ok and "taken as UTC" in naive.warnings[0]
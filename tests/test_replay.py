@@ -0,0 +1,113 @@
+"""Tests for recording API traffic to a cassette and replaying it offline."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from typefully_mcp_server.client import TypefullyClient
+from typefully_mcp_server.config import Settings
+from typefully_mcp_server.replay import REDACTED, CassetteMiss, RecordingTransport, ReplayTransport, load_cassette
+from typefully_mcp_server.types import CreateDraftRequest
+
+from conftest import MOCK_BASE_URL
+
+SECRET = "tf-secret-key-0123456789"
+
+
+def echo(request: httpx.Request) -> httpx.Response:
+    # An API that echoes the key back, so scrubbing bodies and headers is covered
+    return httpx.Response(200, headers={"Set-Cookie": "session=abc"},
+                          json={"key": request.headers["X-API-KEY"], "path": request.url.path})
+
+
+def test_recording_redacts_credentials(tmp_path):
+    cassette = tmp_path / "api.jsonl"
+
+    async def run():
+        transport = RecordingTransport(httpx.MockTransport(echo), str(cassette))
+        async with httpx.AsyncClient(transport=transport, base_url=MOCK_BASE_URL,
+                                     headers={"X-API-KEY": SECRET, "Authorization": f"Bearer {SECRET}"}) as client:
+            response = await client.post("/drafts/", params={"token": SECRET}, json={"content": f"my key is {SECRET}"})
+            # The caller still gets the real response
+            assert response.json()["key"] == SECRET
+        return transport.recorded
+    assert asyncio.run(run()) == 1
+
+    text = cassette.read_text()
+    assert SECRET not in text
+    [entry] = [json.loads(line) for line in text.splitlines()]
+    assert entry["request"]["headers"]["x-api-key"] == REDACTED
+    assert entry["request"]["headers"]["authorization"] == REDACTED
+    assert entry["request"]["query"] == f"token={REDACTED}"
+    assert entry["request"]["body"] == json.dumps({"content": f"my key is {REDACTED}"}, separators=(",", ":"))
+    assert ["set-cookie", REDACTED] in entry["response"]["headers"]
+    assert json.loads(entry["response"]["body"])["key"] == REDACTED
+
+
+def test_record_then_replay_through_the_client(tmp_path, mock_api):
+    cassette = str(tmp_path / "api.jsonl")
+
+    async def record():
+        settings = Settings(base_url=MOCK_BASE_URL, cache_ttl_scheduled=0.0, record_cassette=cassette)
+        async with TypefullyClient(api_key=SECRET, settings=settings,
+                                   transport=httpx.ASGITransport(app=mock_api.app)) as client:
+            drafts = await client.get_scheduled_drafts()
+            created = await client.create_draft(CreateDraftRequest(content="Recorded"))
+            return drafts, created
+
+    async def replay():
+        settings = Settings(base_url=MOCK_BASE_URL, cache_ttl_scheduled=0.0, replay_cassette=cassette, replay_speedup=0)
+        async with TypefullyClient(settings=settings) as client:
+            drafts = await client.get_scheduled_drafts()
+            # New content has no exact match, so the recorded create stands in for it
+            created = await client.create_draft(CreateDraftRequest(content="Something new"))
+            with pytest.raises(CassetteMiss):
+                await client.get_published_drafts()
+            return drafts, created
+
+    recorded, replayed = asyncio.run(record()), asyncio.run(replay())
+    assert replayed == recorded
+    assert mock_api.requests == 2
+    assert SECRET not in open(cassette).read()
+
+
+def interaction(status: int, body: str, **request) -> str:
+    return json.dumps({
+        "request": {"method": "GET", "path": "/v1/drafts/recently-scheduled/", **request},
+        "response": {"status": status, "headers": [], "body": body},
+    }) + "\n"
+
+
+def test_replay_order_and_conditional_requests(tmp_path):
+    cassette = tmp_path / "api.jsonl"
+    cassette.write_text(
+        interaction(200, "[1]") + interaction(200, "[2]")
+        + interaction(304, "", headers={"If-None-Match": '"v1"'})
+    )
+    transport = ReplayTransport(str(cassette), speedup=0)
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport, base_url=MOCK_BASE_URL) as client:
+            bodies = [(await client.get("/drafts/recently-scheduled/")).text for _ in range(3)]
+            revalidated = await client.get("/drafts/recently-scheduled/", headers={"If-None-Match": '"v1"'})
+            # A 304 only answers the validators it was recorded for
+            other = await client.get("/drafts/recently-scheduled/", headers={"If-None-Match": '"v2"'})
+            return bodies, revalidated.status_code, other.status_code
+    bodies, revalidated, other = asyncio.run(run())
+    assert bodies == ["[1]", "[2]", "[1]"]
+    assert (revalidated, other) == (304, 200)
+    assert transport.replayed == 5
+
+
+def test_torn_last_line_skipped(tmp_path):
+    cassette = tmp_path / "api.jsonl"
+    cassette.write_text(interaction(200, "[1]") + interaction(200, "[2]")[:40])
+    assert len(load_cassette(str(cassette))) == 1
+    cassette.write_text(interaction(200, "[1]")[:40] + "\n" + interaction(200, "[2]"))
+    with pytest.raises(ValueError, match="line 1"):
+        load_cassette(str(cassette))
+    cassette.write_text("")
+    with pytest.raises(ValueError, match="no recorded requests"):
+        ReplayTransport(str(cassette))
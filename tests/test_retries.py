@@ -0,0 +1,121 @@
+"""Tests for rate limiting, Retry-After and which requests are retried."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from typefully_mcp_server.client import TypefullyClient
+from typefully_mcp_server.config import Settings
+from typefully_mcp_server.ratelimit import RetryBudget, TokenBucket, parse_retry_after
+from typefully_mcp_server.types import CreateDraftRequest
+
+from conftest import MOCK_BASE_URL
+
+DRAFT = {"id": 1, "text_first_tweet": "Hello", "num_tweets": 1}
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < parse_retry_after(later) <= 30
+    earlier = format_datetime(datetime.now(timezone.utc) - timedelta(seconds=30), usegmt=True)
+    assert parse_retry_after(earlier) == 0.0
+
+
+def test_retry_budget():
+    budget = RetryBudget(ratio=0.5, capacity=1.0)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    budget.record_request()
+    budget.record_request()
+    assert budget.try_spend()
+
+
+def test_token_bucket_pause():
+    async def run():
+        bucket = TokenBucket(rate=0)
+        await bucket.acquire()
+        bucket.pause(0.05)
+        assert not bucket.try_acquire()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await bucket.acquire()
+        assert loop.time() - started >= 0.04
+    asyncio.run(run())
+
+
+class Responses:
+    """Answers requests from a list of responses or exceptions, in order."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def client_for(responses: Responses, **settings) -> TypefullyClient:
+    settings = Settings(base_url=MOCK_BASE_URL, retry_backoff_base=0.0, cache_ttl_scheduled=0.0, **settings)
+    return TypefullyClient(api_key="test-key", settings=settings, transport=httpx.MockTransport(responses)).open()
+
+
+def test_get_retried_after_429_and_5xx():
+    responses = Responses(
+        httpx.Response(429, headers={"Retry-After": "0.01"}),
+        httpx.Response(503),
+        httpx.ReadTimeout("slow"),
+        httpx.Response(200, json=[DRAFT]),
+    )
+    client = client_for(responses)
+    drafts = asyncio.run(client.get_scheduled_drafts())
+    assert [draft.id for draft in drafts] == [1]
+    assert len(responses.requests) == 4
+    assert client.retries == 3
+
+
+def test_long_retry_after_not_waited_for():
+    responses = Responses(httpx.Response(429, headers={"Retry-After": "3600"}))
+    client = client_for(responses)
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.get_scheduled_drafts())
+    assert len(responses.requests) == 1
+
+
+@pytest.mark.parametrize("failure", [httpx.Response(503), httpx.ReadTimeout("slow")])
+def test_post_not_retried_when_it_may_have_been_processed(failure):
+    responses = Responses(failure, httpx.Response(200, json=DRAFT))
+    client = client_for(responses)
+    with pytest.raises((httpx.HTTPStatusError, httpx.ReadTimeout)):
+        asyncio.run(client.create_draft(CreateDraftRequest(content="Hello")))
+    assert len(responses.requests) == 1
+
+
+@pytest.mark.parametrize("failure", [
+    httpx.Response(429, headers={"Retry-After": "0"}),
+    httpx.ConnectError("refused"),
+])
+def test_post_retried_when_not_processed(failure):
+    responses = Responses(failure, httpx.Response(200, json=DRAFT))
+    client = client_for(responses)
+    draft = asyncio.run(client.create_draft(CreateDraftRequest(content="Hello")))
+    assert draft.id == 1
+    assert len(responses.requests) == 2
+
+
+def test_retries_stop_at_max_attempts():
+    responses = Responses(*[httpx.Response(503) for _ in range(3)])
+    client = client_for(responses, retry_max_attempts=3)
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.get_scheduled_drafts())
+    assert len(responses.requests) == 3
@@ -0,0 +1,66 @@
+"""Tests for the tool input schemas generated from the request models."""
+
+import asyncio
+
+import jsonschema
+import pytest
+
+from typefully_mcp_server.schemas import compile_validator, input_schema
+from typefully_mcp_server.types import CreateDraftRequest, GetDraftsRequest
+
+
+def test_generated_schema_is_trimmed():
+    schema = input_schema(CreateDraftRequest, account={"type": "string"})
+    assert "title" not in schema and "description" not in schema
+    assert schema["required"] == ["content"]
+    # Fields by name, not alias; optional fields without null or titles
+    assert "schedule_date" in schema["properties"] and "schedule-date" not in schema["properties"]
+    assert schema["properties"]["threadify"] == {
+        "default": False, "description": "Automatically split content into multiple tweets", "type": "boolean",
+    }
+    assert schema["properties"]["account"] == {"type": "string"}
+
+
+def test_defaults_from_settings():
+    schema = input_schema(GetDraftsRequest, defaults={"limit": 20})
+    assert schema["properties"]["limit"] == {
+        "description": "Maximum number of drafts to return (0 for all)", "minimum": 0, "type": "integer", "default": 20,
+    }
+    assert schema["properties"]["format"]["enum"] == ["full", "compact", "json"]
+
+
+@pytest.mark.parametrize("arguments", [
+    {"limit": 5, "format": "compact"},
+    {},
+    {"limit": -1},
+    {"format": "yaml"},
+    {"content_filter": "replies"},
+    {"cursor": 4},
+])
+def test_compiled_validator_agrees_with_jsonschema(arguments):
+    schema = input_schema(GetDraftsRequest)
+    validator = compile_validator(schema)
+    try:
+        jsonschema.validate(arguments, schema)
+        expected = None
+    except jsonschema.ValidationError as e:
+        expected = e.message
+    error = next(validator.iter_errors(arguments), None)
+    assert (error.message if error else None) == expected
+
+
+def test_invalid_schema_refused():
+    with pytest.raises(jsonschema.SchemaError):
+        compile_validator({"type": "object", "properties": {"limit": {"type": "count"}}})
+
+
+def test_server_validates_arguments(server):
+    assert server.validate_arguments("create_draft", {"content": "Hello", "account": "default"}) is None
+    assert server.validate_arguments("create_draft", {}) == "'content' is a required property"
+    assert server.validate_arguments("get_scheduled_drafts", {"limit": "ten"}) == "'ten' is not of type 'integer'"
+    assert server.validate_arguments("no_such_tool", {"anything": 1}) is None
+
+    async def run():
+        async with server.server_lifespan(server.app):
+            return (await server.call_tool("get_scheduled_drafts", {"format": "yaml"}))[0].text
+    assert asyncio.run(run()).startswith("❌ Error: Input validation error: 'yaml' is not one of")
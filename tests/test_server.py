@@ -0,0 +1,56 @@
+"""Tests for tools/list and call_tool dispatch through the generated input schemas."""
+
+import asyncio
+
+from mcp import types
+
+
+def call(server, name, arguments):
+    async def run():
+        async with server.server_lifespan(server.app):
+            return await server.call_tool(name, arguments)
+    return asyncio.run(run())[0].text
+
+
+def test_tools_list(server):
+    handler = server.app.request_handlers[types.ListToolsRequest]
+    result = asyncio.run(handler(types.ListToolsRequest(method="tools/list")))
+    tools = {tool.name: tool for tool in result.root.tools}
+    assert set(tools) == {tool.name for tool in server.TOOLS}
+    schema = tools["create_draft"].inputSchema
+    assert schema["required"] == ["content"]
+    assert {"content", "schedule_date", "account", "timeout"} <= set(schema["properties"])
+    assert "format" in tools["get_scheduled_drafts"].inputSchema["properties"]
+
+
+def test_generated_schemas_accept_next_free_slot(server):
+    assert server.validate_arguments("create_draft", {"content": "Hello", "schedule_date": "next-free-slot"}) is None
+    assert server.validate_arguments("create_drafts", {"drafts": [{"content": "Hello", "schedule_date": "next-free-slot"}]}) is None
+
+
+def test_invalid_arguments_rejected(server, mock_api):
+    text = call(server, "create_draft", {"threadify": True})
+    assert text.startswith("❌ Error: Input validation error:")
+    assert "'content' is a required property" in text
+    text = call(server, "get_scheduled_drafts", {"limit": -1})
+    assert text.startswith("❌ Error: Input validation error:")
+    assert mock_api.requests == 0
+
+
+def test_create_draft_dispatch(server, mock_api):
+    text = call(server, "create_draft", {"content": "Hello from the tests"})
+    assert not text.startswith("❌"), text
+    assert "3000000" in text
+
+
+def test_list_dispatch(server):
+    text = call(server, "get_scheduled_drafts", {"limit": 3, "format": "compact"})
+    assert not text.startswith("❌"), text
+    assert "#1000000" in text
+
+
+def test_session_keys_cannot_read_local_data(server, monkeypatch):
+    monkeypatch.setattr(server, "session_api_key", lambda: "session-key")
+    for name in ("search_drafts", "draft_stats", "outbox_status"):
+        text = call(server, name, {})
+        assert "not available with a session API key" in text, name
@@ -0,0 +1,81 @@
+"""Tests for finding drafts that nearly duplicate a new one."""
+
+import asyncio
+
+from typefully_mcp_server.similarity import DuplicateDraftError, NearDuplicateIndex, normalize_text
+from typefully_mcp_server.types import Draft
+
+from mock_api import make_draft
+
+TEXT = ("Shipping the new scheduler today: posts now wait for the best slot of the week, "
+        "skip the ones next to other posts, and keep their local time across daylight saving.")
+OTHER = ("Notes from the meetup on Postgres partitioning, vacuum tuning and why we moved "
+         "our analytics tables to daily partitions last spring.")
+
+
+def draft(draft_id: int, text: str, full: bool = True, **fields) -> Draft:
+    return Draft(id=draft_id, text=text if full else None, text_first_tweet=text, num_tweets=1, **fields)
+
+
+def test_normalize_text():
+    assert normalize_text("Hello,  WORLD!! See https://example.com/a?b=1 …") == "hello world see url"
+    assert normalize_text("ｆｕｌｌ width") == "full width"
+
+
+def test_near_duplicates_found_and_others_not():
+    index = NearDuplicateIndex()
+    assert index.add([draft(1, TEXT), draft(2, OTHER)]) == 2
+    edited = TEXT.replace("Shipping", "SHIPPING,").replace("today:", "today!!") + " https://example.com"
+    [match] = index.query(edited)
+    assert match.draft.id == 1 and match.similarity >= 0.8
+    assert index.query(OTHER.replace("spring", "autumn"))[0].draft.id == 2
+    assert index.query("Something else entirely, about gardening and tomatoes.") == []
+    assert index.query("!!!") == []
+
+
+def test_reindexing_replaces_the_old_text():
+    index = NearDuplicateIndex()
+    index.add([draft(1, TEXT)])
+    # Unchanged text isn't indexed again
+    assert index.add([draft(1, TEXT)]) == 0
+    index.add([draft(1, OTHER)])
+    assert len(index) == 1
+    assert index.query(TEXT) == []
+    assert index.query(OTHER)[0].similarity == 1.0
+
+
+def test_check_scopes_by_account_and_matches_first_tweets():
+    index = NearDuplicateIndex()
+    index.add([draft(1, TEXT)], account="work")
+    # Only the first tweet of this draft is known, as in list responses
+    index.add([draft(2, OTHER, full=False)], account="personal")
+    assert [m.draft.id for m in index.check(TEXT, account="work")] == [1]
+    assert index.check(TEXT, account="personal") == []
+    thread = OTHER + "\n\n\n\nA second tweet with more details on the partitioning."
+    [match] = index.check(thread)
+    assert (match.draft.id, match.account) == (2, "personal")
+    assert "in account 'personal'" in match.describe()
+
+
+def test_duplicate_error_describes_matches():
+    index = NearDuplicateIndex()
+    index.add([draft(7, TEXT, scheduled_date="2030-01-01T09:00:00Z")])
+    error = DuplicateDraftError(index.check(TEXT))
+    assert isinstance(error, ValueError)
+    assert "100% similar to scheduled draft 7 (2030-01-01T09:00:00Z): Shipping the new" in str(error)
+
+
+def test_create_draft_warns_about_duplicates(server, mock_api):
+    copied = make_draft(0, mock_api.config, published=False)["text"]
+
+    async def run():
+        async with server.server_lifespan(server.app):
+            # Listing indexes the drafts it returns
+            await server.call_tool("get_scheduled_drafts", {})
+            copy = await server.call_tool("create_draft", {"content": copied})
+            new = await server.call_tool("create_draft", {"content": TEXT})
+            return copy[0].text, new[0].text
+
+    copy, new = asyncio.run(run())
+    assert copy.startswith("⚠️ Possible duplicate: 100% similar to scheduled draft 1000000")
+    assert "Possible duplicate" not in new
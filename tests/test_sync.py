@@ -0,0 +1,94 @@
+"""Tests for draft list snapshots and drafts removed from the scheduled list."""
+
+import asyncio
+import json
+import time
+
+from typefully_mcp_server.store import REMOVED, DraftStore
+from typefully_mcp_server.sync import PUBLISHED, SCHEDULED, DraftSync
+from typefully_mcp_server.types import Draft
+
+
+def scheduled(id: int, text: str = "Scheduled draft") -> Draft:
+    return Draft(id=id, text=text, text_first_tweet=text, num_tweets=1, scheduled_date=f"2026-01-{id:02d}T09:00:00Z")
+
+
+def synced_store():
+    store = DraftStore()
+    sync = DraftSync(shared_client=None, interval=0, on_removed=store.mark_removed)
+    return store, sync
+
+
+def test_diff():
+    _, sync = synced_store()
+    assert sync.update(SCHEDULED, [scheduled(1), scheduled(2)]).added == [1, 2]
+    diff = sync.update(SCHEDULED, [scheduled(2, "Edited"), scheduled(3)])
+    assert (diff.added, diff.changed, diff.removed) == ([3], [2], [1])
+
+
+def test_removed_drafts_leave_search_results():
+    store, sync = synced_store()
+    drafts = [scheduled(1), scheduled(2), scheduled(3)]
+    store.upsert(drafts)
+    sync.update(SCHEDULED, drafts)
+
+    sync.update(SCHEDULED, drafts[1:])
+    assert {draft.id for draft in store.search(status="scheduled")} == {2, 3}
+    assert {draft.id for draft in store.search()} == {2, 3}
+    assert {draft.id for draft in store.search(status=REMOVED)} == {1}
+    assert store.aggregate([], status=None) == [(2, 2)]
+
+    # Scheduled again, unchanged
+    store.upsert(drafts)
+    sync.update(SCHEDULED, drafts)
+    assert {draft.id for draft in store.search(status="scheduled")} == {1, 2, 3}
+
+
+def test_published_drafts_not_marked_removed():
+    store, sync = synced_store()
+    draft = scheduled(1)
+    store.upsert([draft])
+    sync.update(SCHEDULED, [draft])
+    published = draft.model_copy(update={"published_on": "2026-01-01T09:00:00Z"})
+    store.upsert([published])
+    sync.update(SCHEDULED, [])
+    assert [d.id for d in store.search(status="published")] == [1]
+
+    # Published drafts only age out of the published list
+    sync.update(PUBLISHED, [published])
+    sync.update(PUBLISHED, [])
+    assert [d.id for d in store.search(status="published")] == [1]
+
+
+def test_older_lists_ignored():
+    store, sync = synced_store()
+    old = scheduled(1)
+    created = scheduled(2)
+    store.upsert([old, created])
+    before_create = time.monotonic()
+    sync.update(SCHEDULED, [old, created])
+    # A read started before the draft was created answers after the poll that saw it
+    assert not sync.update(SCHEDULED, [old], requested_at=before_create)
+    assert sync.stale == 1
+    assert {draft.id for draft in store.search(status="scheduled")} == {1, 2}
+    assert sync.update(SCHEDULED, [old]).removed == [2]
+
+
+def test_removed_through_the_server(server, mock_api):
+    body, _ = mock_api.lists["scheduled"]
+    first, *rest = json.loads(body)
+
+    async def run():
+        async with server.server_lifespan(server.app):
+            await server.call_tool("get_scheduled_drafts", {})
+            assert len(server.draft_store.search(status="scheduled", limit=100)) == 10
+            # Unscheduled in Typefully
+            mock_api.lists["scheduled"] = mock_api._encode(rest)
+            await server.call_tool("get_scheduled_drafts", {})
+            remaining = {draft.id for draft in server.draft_store.search(status="scheduled", limit=100)}
+            assert remaining == {draft["id"] for draft in rest}
+            result = await server.call_tool("search_drafts", {"query": "Draft 0 about"})
+            assert f"Draft ID {first['id']}" not in result[0].text
+            result = await server.call_tool("search_drafts", {"query": "Draft 0 about", "status": "removed"})
+            assert f"Draft ID {first['id']}" in result[0].text
+    asyncio.run(run())
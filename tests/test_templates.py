@@ -0,0 +1,68 @@
+"""Tests for the response templates of the list tools."""
+
+import json
+
+import pytest
+
+from typefully_mcp_server.templates import Templates, load_templates
+from typefully_mcp_server.types import Draft
+
+THREAD = Draft(id=7, text_first_tweet="A  thread\nabout launches", num_tweets=3, scheduled_date="2030-01-01T09:00:00Z")
+TWEET = Draft(id=8, text_first_tweet="One tweet", num_tweets=1, published_on="2030-01-02T09:00:00Z",
+              twitter_url="https://x.com/i/status/8", account="team")
+
+
+def test_builtin_templates():
+    templates = Templates()
+    assert templates["scheduled"].render(1, THREAD) == (
+        "**1. Draft ID 7**\n"
+        "   First tweet: A  thread\nabout launches\n"
+        "   Total tweets: 3\n"
+        "   Scheduled: 2030-01-01T09:00:00Z\n"
+        "   🧵 **View full thread:** https://typefully.com/?d=7\n"
+        "\n"
+    )
+    # Lines whose fields are all empty are left out
+    assert templates["published"].render(2, TWEET) == (
+        "**2. Draft ID 8** (team)\n"
+        "   First tweet: One tweet\n"
+        "   Tweets: 1\n"
+        "   Published: 2030-01-02T09:00:00Z\n"
+        "   Twitter: https://x.com/i/status/8\n"
+        "\n"
+    )
+    assert templates["compact"].render(3, THREAD) == "3. #7 | 2030-01-01T09:00:00Z | 3 tweet(s) | A thread about launches\n"
+
+
+def test_override():
+    templates = Templates({"compact": "{index:>2}) {{#{id}}} {date:.10} {account_prefix}\n  LinkedIn: {linkedin_url}\n"})
+    assert templates["compact"].render(4, TWEET) == " 4) {#8} 2030-01-02 team | \n"
+    # Other templates keep their built-in text
+    assert templates["scheduled"].source == Templates()["scheduled"].source
+
+
+@pytest.mark.parametrize("source, message", [
+    ("{title}\n", "unknown field {title}"),
+    ("{id.__class__}\n", "unknown field {id.__class__}"),
+    ("{}\n", "unknown field {}"),
+    ("{id:{index}}\n", "unsupported format spec"),
+    ("{num_tweets:%Y}\n", "can't render a draft"),
+    ("{id\n", "not a valid format string"),
+])
+def test_invalid_templates_rejected(source, message):
+    with pytest.raises(ValueError, match=message):
+        Templates({"compact": source})
+
+
+def test_unknown_template_name():
+    with pytest.raises(ValueError, match="Unknown template"):
+        Templates({"drafts": "{id}\n"})
+
+
+def test_load_templates(tmp_path):
+    path = tmp_path / "templates.json"
+    path.write_text(json.dumps({"compact": "{id}\n"}))
+    assert load_templates(str(path)) == {"compact": "{id}\n"}
+    path.write_text(json.dumps({"compact": 1}))
+    with pytest.raises(ValueError, match="JSON object"):
+        load_templates(str(path))